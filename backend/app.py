@@ -2,7 +2,7 @@
 Main Flask application for AI-Powered Opportunity Intelligence System
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS, cross_origin
 import os
 import traceback
@@ -18,6 +18,7 @@ from services.gamification_service import GamificationService
 from services.analytics_service import AnalyticsService
 from services.success_stories_service import SuccessStoriesService
 from services.auth_service import (
+    init_auth_service,
     register_user, 
     login_user, 
     verify_session, 
@@ -48,6 +49,51 @@ chatbot_service = ChatbotService()
 gamification_service = GamificationService(firebase_service)
 analytics_service = AnalyticsService(firebase_service)
 success_stories_service = SuccessStoriesService(firebase_service)
+init_auth_service(firebase_service)
+
+# Serve leaderboards and peer stats from a listener-backed in-process copy of gamification
+if os.getenv('GAMIFICATION_MIRROR', 'true').lower() == 'true':
+    firebase_service.gamification_mirror.start()
+
+# Answer searches from an in-process index of stored opportunities when it has enough matches
+if os.getenv('OPPORTUNITY_INDEX', 'true').lower() == 'true':
+    firebase_service.opportunity_index.start()
+
+# Re-run popular and suggested searches in the background so dashboard clicks hit a warm cache
+if os.getenv('SEARCH_WARMER', 'true').lower() == 'true':
+    opportunity_service.search_warmer.start()
+
+# ============================================================================
+# REQUEST HOOKS
+# ============================================================================
+
+@app.before_request
+def start_datastore_accounting():
+    """Start counting datastore operations for this request"""
+    rule = request.url_rule.rule if request.url_rule else 'unmatched'
+    firebase_service.metrics.start_request(f"{request.method} {rule}")
+
+
+# Registered before flush_buffered_writes so it runs after it (Flask runs
+# after_request hooks in reverse order) and the flushed writes are counted
+@app.after_request
+def report_datastore_ops(response):
+    """Attach the request's datastore operation counts as X-Datastore-Ops"""
+    counts = firebase_service.metrics.finish_request()
+    if counts is not None:
+        response.headers['X-Datastore-Ops'] = firebase_service.metrics.format_header(counts)
+    return response
+
+
+@app.after_request
+def flush_buffered_writes(response):
+    """Commit datastore writes buffered during the request before responding"""
+    try:
+        firebase_service.flush_writes()
+    except Exception as e:
+        print(f"❌ Failed to flush buffered writes: {e}")
+    return response
+
 
 # ============================================================================
 # AUTHENTICATION ENDPOINTS
@@ -273,10 +319,14 @@ def get_profile(profile_id):
     """
     Get profile by ID
     
+    Query params:
+        include_resume: "true" to also return the raw resume_text
+    
     Returns: { profile_id, profile_data, created_at }
     """
     try:
-        profile = profile_service.get_profile(profile_id)
+        include_resume = request.args.get('include_resume', 'false').lower() == 'true'
+        profile = profile_service.get_profile(profile_id, include_resume=include_resume)
         
         if not profile:
             return jsonify({'error': 'Profile not found'}), 404
@@ -296,74 +346,145 @@ def search_opportunities():
     """
     Search for opportunities with filters and pagination
     
+    The first request runs the search and saves its ranked results under a
+    search_id for RESULT_SET_TTL seconds. Later pages (by next_cursor, or by
+    search_id + page) are sliced from the saved results without searching again.
+    
     Expected JSON:
     {
         "query": "AI hackathon India",
         "opportunity_type": "hackathon",  // optional: filter by type
         "year": "2026",  // optional: filter by year
         "page": 1,  // optional: pagination (default 1)
-        "per_page": 10,  // optional: results per page (default 10)
-        "force_refresh": false  // optional: skip cache and force new search
+        "per_page": 10,  // optional: results per page (default 10, max 100)
+        "search_id": "...",  // optional: page through an earlier search
+        "cursor": "...",  // optional: next_cursor from the previous page
+        "force_refresh": false,  // optional: skip cache and force new search
+        "stream": "ndjson",  // optional: "ndjson" or "sse" - stream results as they arrive
+        "profile_id": "..."  // optional: re-rank results by how well they match this profile
     }
     
-    Returns: { opportunities: [...], count, total, page, has_more }
+    Returns: { opportunities: [...], count, total, page, has_more, next_cursor, search_id,
+               expires_in_seconds, from_cache, cache_age_seconds, source }
+    
+    With "stream", the response is a stream of events instead: one "opportunity" event
+    per result as soon as its result page is fetched and scored, then one "done" event
+    with search_id, count, total, skipped counts, source and timings.
     """
     try:
-        data = request.json
+        data = request.json or {}
         
-        if not data or 'query' not in data:
-            return jsonify({'error': 'Query required'}), 400
-        
-        query = data['query']
+        query = data.get('query')
         opportunity_type = data.get('opportunity_type', None)
         year_filter = data.get('year', None)
-        page = data.get('page', 1)
-        per_page = data.get('per_page', 10)
+        per_page = min(max(int(data.get('per_page', 10)), 1), 100)
+        page = max(int(data.get('page', 1)), 1)
+        search_id = data.get('search_id')
         force_refresh = data.get('force_refresh', False)
         
+        # A cursor carries the search_id, position, page size and filters of the next page
+        if data.get('cursor'):
+            search_id, offset, per_page, opportunity_type, year_filter = \
+                opportunity_service.decode_search_cursor(data['cursor'])
+            per_page = min(max(per_page, 1), 100)
+        else:
+            offset = (page - 1) * per_page
+        
+        if not query and not search_id:
+            return jsonify({'error': 'Query required'}), 400
+        
         # Log if force refresh requested
         if force_refresh:
             print("🔄 Force refresh requested - bypassing cache")
         
-        # Search opportunities
-        result = opportunity_service.search_opportunities(query, opportunity_type)
-        all_opportunities = result['opportunities']
-        
-        # Award points for search (if user_id provided)
+        # Results of a new search are re-ranked for the student's profile (no LLM calls)
+        profile = None
+        if data.get('profile_id') and query:
+            stored_profile = profile_service.get_profile(data['profile_id'], fields=['profile'])
+            profile = (stored_profile or {}).get('profile')
+        
+        stream = data.get('stream')
+        if stream and query:
+            if stream is True:
+                stream = 'sse' if 'text/event-stream' in request.headers.get('Accept', '') else 'ndjson'
+            if stream not in ('ndjson', 'sse'):
+                return jsonify({'error': 'stream must be "ndjson" or "sse"'}), 400
+            
+            user_id = data.get('user_id')
+            if user_id:
+                try:
+                    gamification_service.award_points(user_id, 'search_opportunity')
+                except:
+                    pass  # Don't fail request if gamification fails
+            
+            events = opportunity_service.stream_search(
+                query, opportunity_type, year_filter, force_refresh=force_refresh, profile=profile
+            )
+            return Response(
+                stream_with_context(encode_search_events(events, stream)),
+                mimetype='text/event-stream' if stream == 'sse' else 'application/x-ndjson',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+        
+        result = opportunity_service.search_page(
+            query, opportunity_type, year_filter,
+            limit=per_page, offset=offset, search_id=search_id, force_refresh=force_refresh, profile=profile
+        )
+        if result is None:
+            return jsonify({'error': 'Search results expired, please search again'}), 410
+        
+        # Award points for search (if user_id provided); paging through results is not a new search
         user_id = data.get('user_id')
-        if user_id:
+        if user_id and result['new_search']:
             try:
                 gamification_service.award_points(user_id, 'search_opportunity')
             except:
                 pass  # Don't fail request if gamification fails
         
-        # Apply year filter if specified
-        if year_filter:
-            all_opportunities = [
-                opp for opp in all_opportunities 
-                if opp.get('year') == year_filter
-            ]
-        
-        # Calculate pagination
-        total = len(all_opportunities)
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        paginated_opportunities = all_opportunities[start_idx:end_idx]
-        
         return jsonify({
-            'opportunities': paginated_opportunities,
-            'count': len(paginated_opportunities),
-            'total': total,
-            'page': page,
+            'opportunities': result['opportunities'],
+            'count': len(result['opportunities']),
+            'total': result['total'],
+            'page': result['offset'] // per_page + 1,
             'per_page': per_page,
-            'has_more': end_idx < total,
-            'query': result['query']
+            'has_more': result['next_cursor'] is not None,
+            'next_cursor': result['next_cursor'],
+            'search_id': result['search_id'],
+            'expires_in_seconds': result['expires_in_seconds'],
+            'query': result['query'],
+            'from_cache': result['from_cache'],
+            'cache_age_seconds': result['cache_age_seconds'],
+            'source': result['source']
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def encode_search_events(events, stream_format):
+    """
+    Serialize stream_search events as NDJSON lines or Server-Sent Events
+    
+    NDJSON: {"event": "opportunity", "data": {...}} per line
+    SSE:    event: opportunity / data: {...}
+    
+    A failure mid-stream is sent as an "error" event, since the status code is already out.
+    """
+    def encode(name, payload):
+        if stream_format == 'sse':
+            return f"event: {name}\ndata: {app.json.dumps(payload)}\n\n"
+        return app.json.dumps({'event': name, 'data': payload}) + "\n"
+    
+    try:
+        for name, payload in events:
+            yield encode(name, payload)
+    except Exception as e:
+        print(f"❌ Streamed search failed: {e}")
+        yield encode('error', {'error': str(e)})
+
+
 @app.route('/api/opportunities/suggestions/<profile_id>', methods=['GET'])
 def get_personalized_suggestions(profile_id):
     """
@@ -372,8 +493,8 @@ def get_personalized_suggestions(profile_id):
     Returns: { suggestions: [...] }
     """
     try:
-        # Get profile
-        profile = profile_service.get_profile(profile_id)
+        # Get profile (only the structured part is needed)
+        profile = profile_service.get_profile(profile_id, fields=['profile'])
         
         if not profile:
             return jsonify({'error': 'Profile not found'}), 404
@@ -393,16 +514,51 @@ def get_cached_opportunities():
     Get recently cached opportunities
     
     Query params:
-    - limit: number of results (default 20)
+    - limit: number of results (default 20, max 100)
     - type: filter by type
+    - cursor: next_cursor from the previous page
     
-    Returns: { opportunities: [...], count }
+    Returns: { opportunities: [...], count, next_cursor }
     """
     try:
-        limit = int(request.args.get('limit', 20))
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
         opportunity_type = request.args.get('type', None)
+        cursor = request.args.get('cursor', None)
         
-        result = opportunity_service.get_cached_opportunities(limit, opportunity_type)
+        result = opportunity_service.get_cached_opportunities(limit, opportunity_type, cursor)
+        
+        return jsonify(result), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/opportunities/batch', methods=['POST'])
+def get_opportunities_batch():
+    """
+    Get multiple opportunities in one request
+    
+    Expected JSON:
+    {
+        "opportunity_ids": ["id1", "id2", ...],  // up to 500
+        "fields": ["title", "deadline"]  // optional projection
+    }
+    
+    Returns: { opportunities: [...], count, missing: [...] }
+    """
+    try:
+        data = request.json
+        
+        if not data or not isinstance(data.get('opportunity_ids'), list):
+            return jsonify({'error': 'opportunity_ids list required'}), 400
+        
+        opportunity_ids = [str(opp_id) for opp_id in data['opportunity_ids'] if opp_id]
+        if len(opportunity_ids) > 500:
+            return jsonify({'error': 'At most 500 opportunity_ids per request'}), 400
+        
+        result = opportunity_service.get_opportunities(opportunity_ids, data.get('fields'))
         
         return jsonify(result), 200
         
@@ -697,13 +853,13 @@ def update_streak(user_id):
 
 
 @app.route('/api/gamification/leaderboard', methods=['GET'])
-def get_leaderboard():
+async def get_leaderboard():
     """Get global leaderboard with top 10 + current user"""
     try:
         user_id = request.args.get('user_id')  # Optional: to include current user
         top_limit = request.args.get('top', 10, type=int)  # Top N users
         
-        result = gamification_service.get_leaderboard_with_user(top_limit, user_id)
+        result = await gamification_service.get_leaderboard_with_user_async(top_limit, user_id)
         return jsonify(result), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -714,10 +870,10 @@ def get_leaderboard():
 # ============================================================================
 
 @app.route('/api/analytics/<user_id>', methods=['GET'])
-def get_analytics(user_id):
-    """Get comprehensive analytics for user"""
+async def get_analytics(user_id):
+    """Get comprehensive analytics for user (independent reads run concurrently)"""
     try:
-        result = analytics_service.get_user_analytics(user_id)
+        result = await analytics_service.get_user_analytics_async(user_id)
         if result:
             return jsonify(result), 200
         return jsonify({'error': 'No data found'}), 404
@@ -726,10 +882,10 @@ def get_analytics(user_id):
 
 
 @app.route('/api/analytics/leaderboard/<user_id>', methods=['GET'])
-def get_leaderboard_stats(user_id):
+async def get_leaderboard_stats(user_id):
     """Get user's leaderboard position and surrounding users"""
     try:
-        result = analytics_service.get_leaderboard_stats(user_id)
+        result = await analytics_service.get_leaderboard_stats_async(user_id)
         if result:
             return jsonify(result), 200
         return jsonify({'error': 'User not found'}), 404
@@ -757,10 +913,45 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'service': 'Opportunity Intelligence API',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'datastore': firebase_service.backend_name
+    }), 200
+
+
+@app.route('/api/metrics/cache', methods=['GET'])
+def cache_metrics():
+    """Hit-rate counters for the in-process caches and the gamification mirror"""
+    return jsonify({
+        **firebase_service.cache_stats(),
+        'searches': opportunity_service.search_cache.stats(),
+        'search_flights': opportunity_service.search_flights.stats(),
+        'result_sets': opportunity_service.result_sets.stats(),
+        'search_sources': opportunity_service.search_source_stats(),
+        'search_warmer': opportunity_service.search_warmer.stats(),
+        'profile_ranker': opportunity_service.profile_ranker.stats()
     }), 200
 
 
+@app.route('/api/metrics/search_keys', methods=['GET'])
+def search_key_metrics():
+    """Per-key Google Custom Search usage, rate limits and cooldowns for today"""
+    return jsonify(opportunity_service.search_keys.stats()), 200
+
+
+@app.route('/api/metrics/datastore', methods=['GET'])
+def datastore_metrics():
+    """
+    Datastore reads/writes/queries per endpoint since startup
+    
+    Query params:
+        reset: "true" to clear the counters after reading them
+    """
+    report = firebase_service.metrics.snapshot()
+    if request.args.get('reset', 'false').lower() == 'true':
+        firebase_service.metrics.reset()
+    return jsonify({'endpoints': report}), 200
+
+
 @app.route('/api/info', methods=['GET'])
 def info():
     """API information"""
@@ -775,6 +966,7 @@ def info():
             ],
             'opportunities': [
                 'POST /api/opportunities/search',
+                'POST /api/opportunities/batch',
                 'GET /api/opportunities/cached',
                 'GET /api/opportunities/<id>'
             ],
@@ -792,13 +984,13 @@ def info():
 # ============================================================================
 
 @app.route('/api/success-stories', methods=['GET'])
-def get_success_stories():
+async def get_success_stories():
     """Get inspiring success stories from peers"""
     try:
         user_id = request.args.get('user_id')
         limit = int(request.args.get('limit', 5))
         
-        stories = success_stories_service.get_success_stories(user_id, limit)
+        stories = await success_stories_service.get_success_stories_async(user_id, limit)
         
         return jsonify({
             'success': True,
@@ -813,7 +1005,7 @@ def get_success_stories():
 
 
 @app.route('/api/peer-insights', methods=['GET'])
-def get_peer_insights():
+async def get_peer_insights():
     """Get peer comparison and growth insights for healthy competition"""
     try:
         user_id = request.args.get('user_id')
@@ -821,7 +1013,7 @@ def get_peer_insights():
         if not user_id:
             return jsonify({'error': 'user_id is required'}), 400
         
-        insights = success_stories_service.get_peer_growth_insights(user_id)
+        insights = await success_stories_service.get_peer_growth_insights_async(user_id)
         
         return jsonify({
             'success': True,
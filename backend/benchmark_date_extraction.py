@@ -0,0 +1,206 @@
+"""
+Date Extraction Benchmark
+Measure deadline/expiry extraction throughput over a synthetic snippet corpus
+
+Usage:
+    python benchmark_date_extraction.py [--snippets 50000] [--seed 7]
+
+Compares the single-pass scanner (services/date_extraction.py) with the
+previous approach, which searched the same title + snippet with eleven
+deadline patterns and then four expiry patterns per search result.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.date_extraction import scan_dates
+
+
+# ============================================================================
+# SYNTHETIC CORPUS
+# ============================================================================
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December']
+
+FILLER = [
+    'Students from all branches are eligible.', 'Teams of 2-4 members.',
+    'Prizes worth INR 5 Lakhs plus internship offers.', 'Open to undergraduate and postgraduate students.',
+    'Build solutions for healthcare, fintech and sustainability.', 'Mentorship from industry experts.',
+    'Online round followed by an offline grand finale.', 'Stipend of 25,000 per month.',
+    'No registration fee.', 'Certificates for all participants.'
+]
+
+DEADLINE_PHRASES = ['Registration deadline:', 'Apply by', 'Last date', 'Submit by', 'Closes on', 'Deadline']
+
+
+def _random_date_text(rng, value):
+    """Write a date in one of the formats search snippets use"""
+    style = rng.randrange(6)
+    month = MONTH_NAMES[value.month - 1]
+    if style == 0:
+        return f"{month} {value.day}, {value.year}"
+    if style == 1:
+        return f"{value.day} {month} {value.year}"
+    if style == 2:
+        return f"{value.day} {month[:3]} '{value.year % 100:02d}"
+    if style == 3:
+        return f"{value.day:02d}/{value.month:02d}/{value.year}"
+    if style == 4:
+        return value.isoformat()
+    return f"{month[:3]} {value.day}, {value.year}"
+
+
+def build_corpus(size, seed):
+    """
+    Generate (title, snippet) pairs shaped like Google results
+
+    Roughly a third carry a keyword deadline, a third a bare date, a tenth say
+    registrations closed, and the rest mention no date at all.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    corpus = []
+
+    for i in range(size):
+        title = f"Innovation Challenge {today.year + rng.choice((0, 1))} #{i} - Apply Now"
+        sentences = rng.sample(FILLER, rng.randint(2, 5))
+        kind = rng.random()
+        when = today + timedelta(days=rng.randint(-400, 400))
+
+        if kind < 0.35:
+            sentences.insert(rng.randrange(len(sentences) + 1),
+                             f"{rng.choice(DEADLINE_PHRASES)} {_random_date_text(rng, when)}.")
+        elif kind < 0.7:
+            sentences.insert(rng.randrange(len(sentences) + 1),
+                             f"Event on {_random_date_text(rng, when)}.")
+        elif kind < 0.8:
+            sentences.append('Registrations closed.')
+
+        corpus.append((title, ' '.join(sentences)))
+
+    return corpus
+
+
+# ============================================================================
+# PREVIOUS IMPLEMENTATION (baseline)
+# ============================================================================
+
+def legacy_extract_deadline(text):
+    date_patterns = [
+        r'(?:deadline|apply by|last date|due date|register by|submit by|registration deadline|application deadline|closes on|close date|expiry|expires|ends on|till|before):?\s*([A-Z][a-z]+\s+\d{1,2},?\s+\d{4})',
+        r'(?:deadline|apply by|last date|due date|register by|submit by|registration deadline|application deadline|closes on|close date|expiry|expires|ends on|till|before):?\s*(\d{1,2}\s+[A-Z][a-z]+\s+\d{4})',
+        r'(?:deadline|apply by|last date|due date|register by|submit by):?\s*(\d{1,2}\s+[A-Z][a-z]+\s+\'\d{2})',
+        r'(?:deadline|apply by|last date|due date|register by|submit by):?\s*([A-Z][a-z]+\s+\d{1,2}\s+\'\d{2})',
+        r'\b([A-Z][a-z]+\s+\d{1,2},?\s+20\d{2})\b',
+        r'\b(\d{1,2}\s+[A-Z][a-z]+\s+20\d{2})\b',
+        r'\b(\d{1,2}\s+[A-Z][a-z]+\s+\'\d{2})\b',
+        r'\b([A-Z][a-z]+\s+\d{1,2}\s+\'\d{2})\b',
+        r'\b(\d{1,2}/\d{1,2}/20\d{2})\b',
+        r'\b(\d{1,2}-\d{1,2}-20\d{2})\b',
+        r'\b(20\d{2}-\d{1,2}-\d{1,2})\b',
+    ]
+    for pattern in date_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            return match.group(1).replace("'2", "202").replace("'1", "201")
+    return None
+
+
+def legacy_is_expired(title, snippet):
+    text = (title + ' ' + snippet).lower()
+    if any(keyword in text for keyword in ['closed', 'ended', 'expired']):
+        return True
+
+    month_map = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+                 'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+    yesterday = (datetime.now() - timedelta(days=1)).date()
+    date_patterns = [
+        (r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]* (\d{1,2}),? (\d{4})', 'mdy'),
+        (r'(\d{1,2})[-/](\d{1,2})[-/](\d{4})', 'dmy'),
+        (r'(\d{4})-(\d{1,2})-(\d{1,2})', 'ymd'),
+        (r'deadline:?\s*(\d{1,2})\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s*(\d{4})', 'dmy_text'),
+    ]
+    for pattern, format_type in date_patterns:
+        for match in re.findall(pattern, text):
+            try:
+                if format_type == 'mdy':
+                    deadline = datetime(int(match[2]), month_map[match[0][:3]], int(match[1]))
+                elif format_type == 'dmy':
+                    deadline = datetime(int(match[2]), int(match[1]), int(match[0]))
+                elif format_type == 'ymd':
+                    deadline = datetime(int(match[0]), int(match[1]), int(match[2]))
+                else:
+                    deadline = datetime(int(match[2]), month_map[match[1][:3]], int(match[0]))
+                if deadline.date() < yesterday:
+                    return True
+            except Exception:
+                continue
+    return False
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_legacy(corpus):
+    kept = 0
+    for title, snippet in corpus:
+        if legacy_is_expired(title, snippet):
+            continue
+        legacy_extract_deadline(f"{title} {snippet}")
+        kept += 1
+    return kept
+
+
+def run_single_pass(corpus):
+    kept = 0
+    for title, snippet in corpus:
+        dates = scan_dates(f"{title} {snippet}")
+        if dates.is_expired():
+            continue
+        dates.deadline
+        kept += 1
+    return kept
+
+
+def _time(label, fn, corpus, repeat):
+    best = None
+    kept = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        kept = fn(corpus)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f"  {label:<12} {best:8.3f}s  {len(corpus) / best:12,.0f} snippets/s  ({kept} kept)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark deadline and expiry extraction')
+    parser.add_argument('--snippets', type=int, default=50000, help='Corpus size')
+    parser.add_argument('--seed', type=int, default=7, help='Corpus random seed')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per implementation (best is reported)')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.snippets, args.seed)
+    characters = sum(len(title) + len(snippet) + 1 for title, snippet in corpus)
+    print(f"📊 {len(corpus):,} synthetic snippets, {characters / 1e6:.1f}M characters")
+
+    legacy = _time('15 regexes', run_legacy, corpus, args.repeat)
+    single = _time('single pass', run_single_pass, corpus, args.repeat)
+    print(f"✅ Single pass is {legacy / single:.1f}x the previous throughput")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,465 @@
+"""
+Datastore Dump
+Stream collections to gzip'd JSONL files and load them back
+
+Usage:
+    python datastore_dump.py export DIR [--collections a,b] [--partitions 4] [--workers 4] [--resume]
+    python datastore_dump.py import DIR [--collections a,b] [--into datastore|sqlite] [--sqlite-path PATH] [--resume]
+
+A dump directory holds manifest.json and, per collection, one or more
+partition files (<collection>/part-00000.jsonl.gz) with one
+{"id": ..., "data": ...} line per document. Values are encoded the same way
+the SQLite backend stores them (timestamps and bytes are tagged; document
+references become their path).
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+from services.batch_writer import BufferedWriter
+from services.firebase_service import FirebaseService
+from services.storage_backend import create_storage_backend, decode_value, encode_value
+
+
+DEFAULT_COLLECTIONS = [
+    'students', 'resume_texts', 'opportunities', 'reasoning_results',
+    'gamification', 'profiles', 'applications', 'users', 'users_by_email'
+]
+
+MANIFEST_FILE = 'manifest.json'
+FORMAT_VERSION = 1
+
+
+# ============================================================================
+# FILE HELPERS
+# ============================================================================
+
+def _read_json(path):
+    """Load a JSON file, or None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    """Write a JSON file atomically, so a crash never leaves half a checkpoint"""
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temporary, path)
+
+
+def _partition_file(collection, index):
+    return f"{collection}/part-{index:05d}.jsonl.gz"
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def plan_partitions(firebase_service, collection, count):
+    """
+    Split a collection into document-ID ranges that can be exported in parallel
+
+    On Firestore the split points come from the partitioned-query API, which
+    balances partitions by size server-side. Local backends live in this
+    process, so they are exported as one range.
+
+    Returns:
+        List of (start_id, end_id) - start inclusive, end exclusive, None for unbounded
+    """
+    if count <= 1 or firebase_service.backend_name != 'firestore':
+        return [(None, None)]
+
+    boundaries = set()
+    for partition in firebase_service.db.collection_group(collection).get_partitions(count):
+        end = partition.end_at
+        # Collection groups also cover same-named subcollections; only top-level split points apply
+        if end is not None and end.parent.id == collection and end.parent.parent is None:
+            boundaries.add(end.id)
+
+    starts = [None] + sorted(boundaries)
+    ends = sorted(boundaries) + [None]
+    return list(zip(starts, ends))
+
+
+def _document_pages(db, collection, partition, last_id, page_size):
+    """
+    Yield lists of (doc_id, data) for a partition in ID order, after last_id
+
+    Firestore is read with one limited query per page. Local backends are
+    read with iter_documents(), a single ID-ordered pass (keyset pages on
+    SQLite), since paging a LocalQuery re-scans and re-sorts the collection
+    for every page.
+    """
+    start, end = partition['start'], partition['end']
+
+    # Local backends (possibly wrapped by datastore_metrics) have iter_documents; Firestore clients do not
+    iter_documents = getattr(db, 'iter_documents', None)
+    if iter_documents is not None:
+        page = []
+        for doc_id, data in iter_documents(collection, after=last_id, page_size=page_size):
+            if last_id is None and start is not None and doc_id < start:
+                continue
+            if end is not None and doc_id >= end:
+                break
+            page.append((doc_id, data))
+            if len(page) == page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+        return
+
+    query = db.collection(collection).order_by('__name__')
+    if end is not None:
+        query = query.end_before({'__name__': end})
+
+    while True:
+        page_query = query
+        if last_id is not None:
+            page_query = page_query.start_after({'__name__': last_id})
+        elif start is not None:
+            page_query = page_query.start_at({'__name__': start})
+
+        page = [(doc.id, doc.to_dict()) for doc in page_query.limit(page_size).stream()]
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1][0]
+
+
+def export_partition(db, directory, collection, partition, page_size=500):
+    """
+    Stream one document-ID range of a collection to its partition file
+
+    Documents are read in pages of page_size ordered by ID, and each page is
+    appended as its own gzip member. The checkpoint records the last ID and
+    the file size after every page, so an interrupted export resumes by
+    cutting the file back to that size and continuing after that ID. Pages
+    are written as they are read (see _document_pages), so on Firestore and
+    SQLite only one page is held in memory; the memory backend already holds
+    the whole collection.
+
+    Returns:
+        Number of documents in the partition
+    """
+    path = os.path.join(directory, partition['file'])
+    checkpoint_path = path[:-len('.jsonl.gz')] + '.checkpoint.json'
+    state = _read_json(checkpoint_path) or {'last_id': None, 'documents': 0, 'offset': 0, 'done': False}
+    if state['done']:
+        return state['documents']
+
+    with open(path, 'ab') as raw:
+        # Drop anything written after the last checkpoint
+        raw.truncate(state['offset'])
+
+        for page in _document_pages(db, collection, partition, state['last_id'], page_size):
+            with gzip.GzipFile(fileobj=raw, mode='wb') as member:
+                for doc_id, data in page:
+                    line = json.dumps({'id': doc_id, 'data': encode_value(data)},
+                                      default=str, separators=(',', ':'))
+                    member.write(line.encode('utf-8') + b'\n')
+            raw.flush()
+            os.fsync(raw.fileno())
+
+            state['last_id'] = page[-1][0]
+            state['documents'] += len(page)
+            state['offset'] = raw.tell()
+            _write_json(checkpoint_path, state)
+
+    state['done'] = True
+    _write_json(checkpoint_path, state)
+    return state['documents']
+
+
+def export_collections(firebase_service, directory, collections=None, partitions=4, workers=4,
+                       page_size=500, resume=False):
+    """
+    Export collections to a dump directory, partitions in parallel
+
+    Args:
+        firebase_service: FirebaseService to read from
+        directory: Dump directory (created if needed)
+        collections: Collection names (default: DEFAULT_COLLECTIONS)
+        partitions: Partitions per collection (Firestore only)
+        workers: Partitions exported concurrently
+        page_size: Documents per read (and per gzip member)
+        resume: Continue an interrupted export in the same directory
+
+    Returns:
+        The manifest
+    """
+    collections = collections or DEFAULT_COLLECTIONS
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    os.makedirs(directory, exist_ok=True)
+
+    manifest = _read_json(manifest_path)
+    if manifest is not None and not resume:
+        raise ValueError(f"{directory} already holds a dump - pass --resume or use another directory")
+    if manifest is None:
+        manifest = {
+            'format': FORMAT_VERSION,
+            'source': firebase_service.backend_name,
+            'started_at': _now(),
+            'complete': False,
+            'collections': {}
+        }
+
+    # Partition plans are saved before exporting, so a resumed export uses the same ranges
+    for collection in collections:
+        if collection in manifest['collections']:
+            continue
+        os.makedirs(os.path.join(directory, collection), exist_ok=True)
+        manifest['collections'][collection] = {
+            'partitions': [
+                {'file': _partition_file(collection, index), 'start': start, 'end': end, 'documents': None}
+                for index, (start, end) in enumerate(plan_partitions(firebase_service, collection, partitions))
+            ]
+        }
+    manifest['complete'] = False
+    _write_json(manifest_path, manifest)
+
+    tasks = [
+        (collection, partition)
+        for collection in collections
+        for partition in manifest['collections'][collection]['partitions']
+    ]
+    print(f"📦 Exporting {len(collections)} collections in {len(tasks)} partitions to {directory}")
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(export_partition, firebase_service.db, directory, collection, partition, page_size):
+                (collection, partition)
+            for collection, partition in tasks
+        }
+        for future in as_completed(futures):
+            collection, partition = futures[future]
+            try:
+                partition['documents'] = future.result()
+                print(f"✓ {partition['file']}: {partition['documents']} documents")
+            except Exception as e:
+                failures += 1
+                print(f"❌ {partition['file']} failed: {e}")
+
+    manifest['complete'] = all(
+        partition['documents'] is not None
+        for entry in manifest['collections'].values()
+        for partition in entry['partitions']
+    )
+    if manifest['complete']:
+        manifest['finished_at'] = _now()
+    _write_json(manifest_path, manifest)
+
+    total = sum(partition['documents'] or 0 for _, partition in tasks)
+    if failures:
+        print(f"⚠️  Export incomplete: {failures} partitions failed - rerun with --resume")
+    else:
+        print(f"✅ Exported {total} documents")
+    return manifest
+
+
+# ============================================================================
+# IMPORT
+# ============================================================================
+
+def import_partition(db, directory, collection, partition, batch_size=500, target='datastore', resume=False):
+    """
+    Load one partition file through batched writes
+
+    The file is read line by line and written in batches of batch_size, so
+    memory stays bounded by one batch. After each commit the number of lines
+    written is checkpointed per target; a resumed import skips those lines.
+
+    Returns:
+        Number of documents written
+    """
+    path = os.path.join(directory, partition['file'])
+    checkpoint_path = path[:-len('.jsonl.gz')] + f'.import-{target}.json'
+    state = (_read_json(checkpoint_path) if resume else None) or {'lines': 0, 'done': False}
+    if state['done']:
+        return state['lines']
+
+    reference = db.collection(collection)
+    batch = db.batch()
+    pending = 0
+    line_number = state['lines']
+
+    with gzip.open(path, 'rt', encoding='utf-8') as lines:
+        for line_number, line in enumerate(lines, 1):
+            if line_number <= state['lines']:
+                continue
+            record = json.loads(line)
+            batch.set(reference.document(record['id']), decode_value(record['data']))
+            pending += 1
+
+            if pending >= batch_size:
+                batch.commit()
+                state['lines'] = line_number
+                _write_json(checkpoint_path, state)
+                batch = db.batch()
+                pending = 0
+
+    if pending:
+        batch.commit()
+    state['lines'] = max(line_number, state['lines'])
+    state['done'] = True
+    _write_json(checkpoint_path, state)
+    return state['lines']
+
+
+def load_dump(db, directory, collections=None, batch_size=500, workers=4, target='datastore', resume=False):
+    """
+    Load a dump into a Firestore client or local storage backend
+
+    Load tests can call this with create_storage_backend('memory') to start
+    from a production-shaped fixture.
+
+    Args:
+        db: Firestore client or StorageBackend to write to
+        directory: Dump directory written by export_collections
+        collections: Collections to load (default: all in the dump)
+        batch_size: Writes per commit
+        workers: Partitions loaded concurrently
+        target: Name for this destination's import checkpoints
+        resume: Skip lines already committed by an interrupted import
+
+    Returns:
+        Dictionary mapping collection name to documents written
+    """
+    manifest = _read_json(os.path.join(directory, MANIFEST_FILE))
+    if manifest is None:
+        raise ValueError(f"No {MANIFEST_FILE} in {directory}")
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dump format: {manifest.get('format')}")
+    if not manifest.get('complete'):
+        raise ValueError("Dump is incomplete - finish it with `export --resume` first")
+
+    collections = collections or list(manifest['collections'])
+    missing = [collection for collection in collections if collection not in manifest['collections']]
+    if missing:
+        raise ValueError(f"Collections not in dump: {', '.join(missing)}")
+
+    tasks = [
+        (collection, partition)
+        for collection in collections
+        for partition in manifest['collections'][collection]['partitions']
+    ]
+    print(f"📥 Loading {len(collections)} collections from {len(tasks)} partitions")
+
+    written = {collection: 0 for collection in collections}
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(import_partition, db, directory, collection, partition, batch_size, target, resume):
+                (collection, partition)
+            for collection, partition in tasks
+        }
+        for future in as_completed(futures):
+            collection, partition = futures[future]
+            try:
+                count = future.result()
+                written[collection] += count
+                print(f"✓ {partition['file']}: {count} documents")
+            except Exception as e:
+                failures += 1
+                print(f"❌ {partition['file']} failed: {e}")
+
+    if failures:
+        print(f"⚠️  Import incomplete: {failures} partitions failed - rerun with --resume")
+    else:
+        print(f"✅ Loaded {sum(written.values())} documents")
+    return written
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _collection_list(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def main():
+    """Parse arguments and run the export or import"""
+    parser = argparse.ArgumentParser(description='Export/import datastore collections as gzip JSONL')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='Dump collections to a directory')
+    export_parser.add_argument('directory')
+    export_parser.add_argument('--collections', type=_collection_list,
+                               help=f"Comma-separated (default: {','.join(DEFAULT_COLLECTIONS)})")
+    export_parser.add_argument('--partitions', type=int, default=4, help='Partitions per collection (Firestore)')
+    export_parser.add_argument('--workers', type=int, default=4, help='Partitions exported concurrently')
+    export_parser.add_argument('--page-size', type=int, default=500, help='Documents per read')
+    export_parser.add_argument('--resume', action='store_true', help='Continue an interrupted export')
+
+    import_parser = subparsers.add_parser('import', help='Load a dump')
+    import_parser.add_argument('directory')
+    import_parser.add_argument('--collections', type=_collection_list, help='Comma-separated (default: all)')
+    import_parser.add_argument('--into', choices=['datastore', 'sqlite'], default='datastore',
+                               help='datastore: the configured DATASTORE_BACKEND; sqlite: a local file directly')
+    import_parser.add_argument('--sqlite-path', default='./datastore.sqlite3', help='File for --into sqlite')
+    import_parser.add_argument('--batch-size', type=int, default=BufferedWriter.MAX_BATCH_SIZE,
+                               help='Writes per commit (Firestore allows at most 500)')
+    import_parser.add_argument('--workers', type=int, default=4, help='Partitions loaded concurrently')
+    import_parser.add_argument('--resume', action='store_true', help='Skip lines already imported')
+
+    args = parser.parse_args()
+    load_dotenv()
+
+    if args.command == 'import' and args.into == 'sqlite':
+        # Straight into the local store - no Firebase initialization needed
+        db = create_storage_backend('sqlite', args.sqlite_path)
+        target = 'sqlite-' + re.sub(r'[^A-Za-z0-9_.-]', '_', os.path.basename(args.sqlite_path))
+        try:
+            load_dump(db, args.directory, args.collections, args.batch_size, args.workers, target, args.resume)
+        finally:
+            db.close()
+        return 0
+
+    print("\n🔧 Initializing datastore...")
+    firebase_service = FirebaseService()
+    if not firebase_service.firebase_enabled:
+        print("❌ Datastore not available")
+        return 1
+
+    if args.command == 'export':
+        export_collections(firebase_service, args.directory, args.collections, args.partitions,
+                           args.workers, args.page_size, args.resume)
+    else:
+        batch_size = args.batch_size
+        if firebase_service.backend_name == 'firestore':
+            batch_size = min(batch_size, BufferedWriter.MAX_BATCH_SIZE)
+        load_dump(firebase_service.db, args.directory, args.collections, batch_size, args.workers,
+                  firebase_service.backend_name, args.resume)
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n\n❌ Interrupted by user")
+        sys.exit(130)
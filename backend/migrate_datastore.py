@@ -0,0 +1,283 @@
+"""
+Datastore Migrations
+Run one-off data migrations against the configured datastore
+
+Usage:
+    python migrate_datastore.py opportunity-aliases [--dry-run]
+    python migrate_datastore.py reasoning-ids [--dry-run] [--delete-legacy]
+    python migrate_datastore.py resume-split [--dry-run]
+    python migrate_datastore.py email-index [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from firebase_admin import firestore
+
+from services.auth_service import EMAIL_INDEX_COLLECTION, email_index_key, normalize_email
+from services.firebase_service import FirebaseService
+
+
+def migrate_opportunity_aliases(firebase_service, dry_run=False):
+    """
+    Collapse legacy duplicate opportunity documents onto canonical records
+
+    Older searches stored every result twice: once at opportunities/{md5(url)[:12]}
+    and once under a random ID. The random-ID copies are replaced by small
+    {'alias_of': canonical_id} stubs (get_opportunity follows them), and
+    canonical records get their content_hash.
+    """
+    collection = firebase_service.db.collection('opportunities')
+    writer = firebase_service.get_writer()
+
+    # Pass 1: projected scan - only the fields needed to classify documents
+    existing_ids = set()
+    legacy = []
+    for doc in collection.select(['url', 'link', 'content_hash', 'alias_of']).stream():
+        existing_ids.add(doc.id)
+        data = doc.to_dict() or {}
+        url = data.get('url') or data.get('link')
+        if data.get('alias_of') or data.get('content_hash') or not url:
+            continue
+        legacy.append((doc.id, FirebaseService.opportunity_key(url)))
+
+    aliased = promoted = hashed = 0
+
+    # Pass 2: rewrite legacy documents
+    for doc_id, canonical_id in legacy:
+        if doc_id == canonical_id:
+            data = collection.document(doc_id).get().to_dict()
+            if not dry_run:
+                writer.update(collection.document(doc_id), {
+                    'content_hash': FirebaseService.opportunity_content_hash(data)
+                })
+            hashed += 1
+            continue
+
+        if canonical_id not in existing_ids:
+            # No canonical record yet - promote this copy to become it
+            data = collection.document(doc_id).get().to_dict()
+            data['content_hash'] = FirebaseService.opportunity_content_hash(data)
+            if not dry_run:
+                writer.set(collection.document(canonical_id), data)
+            existing_ids.add(canonical_id)
+            promoted += 1
+
+        if not dry_run:
+            writer.set(collection.document(doc_id), {
+                'alias_of': canonical_id,
+                'aliased_at': firestore.SERVER_TIMESTAMP
+            })
+        aliased += 1
+
+    if not dry_run:
+        result = writer.flush()
+        if result['failed']:
+            print(f"⚠️  {len(result['failed'])} writes failed")
+
+    print(f"✅ Opportunities: {aliased} aliased, {promoted} promoted to canonical, {hashed} hashed"
+          f"{' (dry run)' if dry_run else ''}")
+
+
+def migrate_reasoning_ids(firebase_service, dry_run=False, delete_legacy=False):
+    """
+    Copy random-ID reasoning results to their deterministic IDs
+
+    Reasoning results used to be stored under random IDs and found with a
+    where/order_by query. They are now keyed by FirebaseService.reasoning_key(),
+    so the newest legacy result for each (profile, opportunity, version) is
+    copied to that key. Legacy documents without a profile_version were computed
+    against version 0. Legacy documents are kept (old result links keep working)
+    unless delete_legacy is set.
+    """
+    collection = firebase_service.db.collection('reasoning_results')
+    writer = firebase_service.get_writer()
+
+    # Pass 1: projected scan - find the newest legacy result per deterministic key
+    existing_ids = set()
+    newest = {}  # reasoning key -> (analyzed_at, doc_id)
+    legacy_ids = []
+    fields = ['profile_id', 'opportunity_id', 'profile_version', 'analyzed_at', 'is_fallback']
+    for doc in collection.select(fields).stream():
+        existing_ids.add(doc.id)
+        data = doc.to_dict() or {}
+        if not data.get('profile_id') or not data.get('opportunity_id'):
+            continue
+
+        key = FirebaseService.reasoning_key(
+            data['profile_id'], data['opportunity_id'], data.get('profile_version', 0)
+        )
+        if key == doc.id:
+            continue
+
+        legacy_ids.append(doc.id)
+        if data.get('is_fallback'):
+            continue
+        analyzed_at = data.get('analyzed_at')
+        current = newest.get(key)
+        if current is None or (analyzed_at is not None and (current[0] is None or analyzed_at > current[0])):
+            newest[key] = (analyzed_at, doc.id)
+
+    copied = 0
+
+    # Pass 2: copy winners that don't have a deterministic document yet
+    for key, (_, doc_id) in newest.items():
+        if key in existing_ids:
+            continue
+        data = collection.document(doc_id).get().to_dict()
+        data.setdefault('profile_version', 0)
+        data['migrated_from'] = doc_id
+        if not dry_run:
+            writer.set(collection.document(key), data)
+        copied += 1
+
+    deleted = 0
+    if delete_legacy:
+        for doc_id in legacy_ids:
+            if not dry_run:
+                writer.delete(collection.document(doc_id))
+            deleted += 1
+
+    if not dry_run:
+        result = writer.flush()
+        if result['failed']:
+            print(f"⚠️  {len(result['failed'])} writes failed")
+
+    print(f"✅ Reasoning results: {len(legacy_ids)} legacy, {copied} copied to deterministic IDs, "
+          f"{deleted} deleted{' (dry run)' if dry_run else ''}")
+
+
+def migrate_resume_split(firebase_service, dry_run=False):
+    """
+    Move inline resume_text out of student documents
+
+    The raw text is written zlib-compressed to resume_texts/{profile_id} and
+    removed from the student document, which keeps profile reads small.
+    """
+    students = firebase_service.db.collection('students')
+    resume_texts = firebase_service.db.collection('resume_texts')
+    writer = firebase_service.get_writer()
+
+    moved = cleared = 0
+    for doc in students.select(['resume_text']).stream():
+        data = doc.to_dict() or {}
+        if 'resume_text' not in data:
+            continue
+
+        resume_text = data['resume_text']
+        if not dry_run:
+            if resume_text:
+                writer.set(resume_texts.document(doc.id),
+                           FirebaseService._compress_resume_text(resume_text))
+            writer.update(students.document(doc.id), {
+                'resume_text': firestore.DELETE_FIELD,
+                'has_resume_text': bool(resume_text)
+            })
+        if resume_text:
+            moved += 1
+        else:
+            cleared += 1
+
+    if not dry_run:
+        result = writer.flush()
+        if result['failed']:
+            print(f"⚠️  {len(result['failed'])} writes failed")
+
+    print(f"✅ Students: {moved} resume texts moved to resume_texts, {cleared} empty fields removed"
+          f"{' (dry run)' if dry_run else ''}")
+
+
+def migrate_email_index(firebase_service, dry_run=False):
+    """
+    Create users_by_email entries for users registered before the index existed
+
+    When several legacy users share an email, the earliest registered one gets
+    the entry and the others are reported. Once this has run, set
+    EMAIL_INDEX_BACKFILLED=true to drop the legacy email-query fallback.
+    """
+    db = firebase_service.db
+    users = db.collection('users')
+    index = db.collection(EMAIL_INDEX_COLLECTION)
+    writer = firebase_service.get_writer()
+
+    indexed = {doc.id for doc in index.select([]).stream()}
+
+    owners = {}  # index key -> (created_at, user_id, email)
+    for doc in users.select(['email', 'created_at']).stream():
+        data = doc.to_dict() or {}
+        email = data.get('email')
+        if not email:
+            continue
+        key = email_index_key(email)
+        candidate = (str(data.get('created_at') or ''), doc.id, email)
+        current = owners.get(key)
+        if current is not None:
+            print(f"⚠️  Duplicate email {normalize_email(email)}: users {current[1]} and {doc.id}")
+        if current is None or candidate < current:
+            owners[key] = candidate
+
+    created = 0
+    for key, (created_at, user_id, email) in owners.items():
+        if key in indexed:
+            continue
+        if not dry_run:
+            writer.set(index.document(key), {
+                'user_id': user_id,
+                'email': normalize_email(email),
+                'created_at': created_at or firestore.SERVER_TIMESTAMP
+            })
+        created += 1
+
+    if not dry_run:
+        result = writer.flush()
+        if result['failed']:
+            print(f"⚠️  {len(result['failed'])} writes failed")
+
+    print(f"✅ Email index: {created} entries created, {len(owners) - created} already present"
+          f"{' (dry run)' if dry_run else ''}")
+
+
+MIGRATIONS = {
+    'opportunity-aliases': migrate_opportunity_aliases,
+    'reasoning-ids': migrate_reasoning_ids,
+    'resume-split': migrate_resume_split,
+    'email-index': migrate_email_index,
+}
+
+
+def main():
+    """Parse arguments and run the selected migration"""
+    parser = argparse.ArgumentParser(description='Run datastore migrations')
+    parser.add_argument('migration', choices=sorted(MIGRATIONS))
+    parser.add_argument('--dry-run', action='store_true', help='Report changes without writing')
+    parser.add_argument('--delete-legacy', action='store_true',
+                        help='reasoning-ids: delete random-ID documents after copying')
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    print("\n🔧 Initializing datastore...")
+    firebase_service = FirebaseService()
+    if not firebase_service.firebase_enabled:
+        print("❌ Datastore not available")
+        return 1
+
+    options = {'dry_run': args.dry_run}
+    if args.migration == 'reasoning-ids':
+        options['delete_legacy'] = args.delete_legacy
+
+    MIGRATIONS[args.migration](firebase_service, **options)
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n❌ Interrupted by user")
+        sys.exit(130)
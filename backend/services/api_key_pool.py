@@ -0,0 +1,200 @@
+"""
+API Key Pool - Picks Google Custom Search keys by remaining daily quota, benching keys that hit rate limits
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+except Exception:
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+
+def quota_day():
+    """Current Google quota day (quotas reset at midnight Pacific Time)"""
+    return datetime.now(QUOTA_TIMEZONE).date()
+
+
+class ApiKeyPool:
+    """
+    Schedules requests across several API keys that each have a daily quota
+
+    acquire() returns the key with the most requests left today, skipping
+    keys that are cooling down after a rate limit. Each acquire() counts one
+    request against the key. After a 429, report_rate_limited() benches the
+    key for `cooldown` seconds, doubling with each consecutive 429 up to
+    `max_cooldown`. A 429 that says the daily quota is used up benches the
+    key until the quota resets. A successful response clears the streak.
+
+    Usage is counted per process, so with several workers each one sees only
+    its own share; Google's own 429s still bench a key that others used up.
+    """
+
+    def __init__(self, keys, daily_quota=100, cooldown=60, max_cooldown=3600, name='api_keys'):
+        """
+        Args:
+            keys: API keys, in configuration order
+            daily_quota: Requests each key may make per quota day
+            cooldown: Seconds a key is benched after its first consecutive 429
+            max_cooldown: Longest bench for repeated 429s
+            name: Label used in stats()
+        """
+        self.keys = list(dict.fromkeys(keys))
+        self.daily_quota = daily_quota
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._day = quota_day()
+        self._state = {key: self._new_state() for key in self.keys}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __bool__(self):
+        return bool(self.keys)
+
+    # ========================================================================
+    # SCHEDULING
+    # ========================================================================
+
+    def acquire(self, exclude=()):
+        """
+        Take the key with the most remaining quota for one request
+
+        Args:
+            exclude: Keys not to use (e.g. ones this request already tried)
+
+        Returns:
+            An API key, or None if every key is excluded, cooling down or out of quota
+        """
+        now = time.time()
+        with self._lock:
+            self._roll_day()
+            best = None
+            for key in self.keys:
+                state = self._state[key]
+                if key in exclude or state['cooldown_until'] > now or state['used_today'] >= self.daily_quota:
+                    continue
+                # Most remaining quota first, then the key used least recently
+                rank = (state['used_today'], state['last_used'])
+                if best is None or rank < best[0]:
+                    best = (rank, key)
+            if best is None:
+                return None
+
+            state = self._state[best[1]]
+            state['used_today'] += 1
+            state['requests'] += 1
+            state['last_used'] = now
+            return best[1]
+
+    def report_success(self, key):
+        """Record a successful response for a key"""
+        with self._lock:
+            state = self._state.get(key)
+            if state is not None:
+                state['consecutive_limits'] = 0
+
+    def report_rate_limited(self, key, daily_exhausted=False):
+        """
+        Record a 429 for a key and bench it
+
+        Args:
+            key: Key that was rate limited
+            daily_exhausted: The response said the key's daily quota is used up
+        """
+        now = time.time()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                return
+            state['rate_limited'] += 1
+            state['last_rate_limited'] = now
+            if daily_exhausted:
+                state['used_today'] = max(state['used_today'], self.daily_quota)
+                return
+            state['consecutive_limits'] += 1
+            bench = min(self.cooldown * 2 ** (state['consecutive_limits'] - 1), self.max_cooldown)
+            state['cooldown_until'] = max(state['cooldown_until'], now + bench)
+
+    def report_error(self, key):
+        """Record a failed request (network error or unexpected status) for a key"""
+        with self._lock:
+            state = self._state.get(key)
+            if state is not None:
+                state['errors'] += 1
+
+    # ========================================================================
+    # STATS
+    # ========================================================================
+
+    def remaining_today(self):
+        """Requests left today across all keys"""
+        with self._lock:
+            self._roll_day()
+            return sum(max(self.daily_quota - state['used_today'], 0) for state in self._state.values())
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            self._roll_day()
+            keys = []
+            for position, key in enumerate(self.keys, 1):
+                state = self._state[key]
+                keys.append({
+                    'key': f"#{position} …{key[-4:]}",
+                    'used_today': state['used_today'],
+                    'remaining_today': max(self.daily_quota - state['used_today'], 0),
+                    'requests': state['requests'],
+                    'rate_limited': state['rate_limited'],
+                    'errors': state['errors'],
+                    'cooldown_seconds': round(max(state['cooldown_until'] - now, 0), 1),
+                    'last_rate_limited_age_seconds': (
+                        round(now - state['last_rate_limited'], 1) if state['last_rate_limited'] else None
+                    )
+                })
+
+        available = sum(1 for row in keys if row['remaining_today'] and not row['cooldown_seconds'])
+        return {
+            'name': self.name,
+            'quota_day': self._day.isoformat(),
+            'daily_quota_per_key': self.daily_quota,
+            'keys_configured': len(keys),
+            'keys_available': available,
+            'used_today': sum(row['used_today'] for row in keys),
+            'remaining_today': sum(row['remaining_today'] for row in keys),
+            'keys': keys
+        }
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    @staticmethod
+    def _new_state():
+        return {
+            'used_today': 0,
+            'requests': 0,
+            'rate_limited': 0,
+            'errors': 0,
+            'consecutive_limits': 0,
+            'cooldown_until': 0.0,
+            'last_used': 0.0,
+            'last_rate_limited': None
+        }
+
+    def _roll_day(self):
+        """Reset daily usage when the quota day changes (caller holds the lock)"""
+        today = quota_day()
+        if today == self._day:
+            return
+        self._day = today
+        for state in self._state.values():
+            state['used_today'] = 0
+            state['consecutive_limits'] = 0
+            state['cooldown_until'] = 0.0
@@ -0,0 +1,201 @@
+"""
+Async Firebase Service - asyncio read path for I/O-bound endpoints
+"""
+
+import asyncio
+import threading
+import time
+
+from firebase_admin import firestore, firestore_async
+
+
+class AsyncFirebaseService:
+    """
+    Read-only asyncio companion to FirebaseService
+
+    Independent reads can be awaited together with asyncio.gather, so an
+    endpoint that needs several collections waits roughly as long as its
+    slowest read instead of the sum of all of them.
+
+    With Firestore, reads use the native AsyncClient. Flask runs every async
+    view on its own short-lived event loop, so the client lives on one
+    dedicated background loop (one long-lived gRPC channel) and requests hand
+    their coroutines to it. Local backends have no async API; their calls run
+    in worker threads via asyncio.to_thread.
+    """
+
+    def __init__(self, firebase_service):
+        """
+        Args:
+            firebase_service: FirebaseService whose datastore should be read
+        """
+        self.firebase = firebase_service
+        self.metrics = firebase_service.metrics
+        self.native = firebase_service.firebase_enabled and firebase_service.backend_name == 'firestore'
+
+        self._loop = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    # ========================================================================
+    # READS
+    # ========================================================================
+
+    async def get_document(self, collection, doc_id, fields=None):
+        """
+        Read one document
+
+        Args:
+            collection: Collection name
+            doc_id: Document ID
+            fields: Optional list of field paths to project
+
+        Returns:
+            Document data, or None if it does not exist
+        """
+        if not self.firebase.firebase_enabled:
+            return None
+
+        if not self.native:
+            return await asyncio.to_thread(self._get_document_sync, collection, doc_id, fields)
+
+        started = time.perf_counter()
+        try:
+            return await self._run_native(self._get_document_native(collection, doc_id, fields))
+        finally:
+            self.metrics.record(reads=1, latency=time.perf_counter() - started)
+
+    async def get_many(self, collection, ids, fields=None):
+        """
+        Async FirebaseService.get_many - get_all chunks are fetched concurrently
+
+        Returns:
+            Dictionary mapping document ID to data, for documents that exist
+        """
+        if not self.firebase.firebase_enabled:
+            return {}
+
+        unique_ids = list(dict.fromkeys(doc_id for doc_id in ids if doc_id))
+        chunk_size = self.firebase.GET_MANY_CHUNK_SIZE
+        chunks = [unique_ids[start:start + chunk_size] for start in range(0, len(unique_ids), chunk_size)]
+
+        results = await asyncio.gather(*(self._get_chunk(collection, chunk, fields) for chunk in chunks))
+
+        documents = {}
+        for result in results:
+            documents.update(result)
+        return documents
+
+    async def query(self, collection, filters=(), order_by=None, descending=False, limit=None, fields=None):
+        """
+        Run a query and return its documents
+
+        Args:
+            collection: Collection name
+            filters: Sequence of (field_path, op, value) equality/range filters
+            order_by: Optional field path to sort on
+            descending: Sort descending instead of ascending
+            limit: Optional maximum number of documents
+            fields: Optional list of field paths to project
+
+        Returns:
+            List of (document_id, data) tuples
+        """
+        if not self.firebase.firebase_enabled:
+            return []
+
+        arguments = (collection, filters, order_by, descending, limit, fields)
+        if not self.native:
+            return await asyncio.to_thread(self._query_sync, *arguments)
+
+        started = time.perf_counter()
+        rows = []
+        try:
+            rows = await self._run_native(self._query_native(*arguments))
+            return rows
+        finally:
+            self.metrics.record(reads=max(len(rows), 1), queries=1, streamed=len(rows),
+                                latency=time.perf_counter() - started)
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    @staticmethod
+    def _build_query(reference, filters, order_by, descending, limit, fields):
+        query = reference
+        for field_path, op, value in filters:
+            query = query.where(filter=firestore.FieldFilter(field_path, op, value))
+        if order_by:
+            direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+            query = query.order_by(order_by, direction=direction)
+        if fields:
+            query = query.select(fields)
+        if limit:
+            query = query.limit(limit)
+        return query
+
+    async def _get_chunk(self, collection, ids, fields):
+        if not self.native:
+            return await asyncio.to_thread(self.firebase.get_many, collection, ids, fields)
+
+        started = time.perf_counter()
+        try:
+            return await self._run_native(self._get_all_native(collection, ids, fields))
+        except Exception as e:
+            print(f"❌ Error batch-reading {len(ids)} documents from {collection}: {e}")
+            return {}
+        finally:
+            self.metrics.record(reads=len(ids), latency=time.perf_counter() - started)
+
+    # Local backends: plain synchronous calls, run in a worker thread
+
+    def _get_document_sync(self, collection, doc_id, fields):
+        snapshot = self.firebase.db.collection(collection).document(doc_id).get(field_paths=fields)
+        return snapshot.to_dict() if snapshot.exists else None
+
+    def _query_sync(self, collection, filters, order_by, descending, limit, fields):
+        query = self._build_query(self.firebase.db.collection(collection),
+                                  filters, order_by, descending, limit, fields)
+        return [(doc.id, doc.to_dict()) for doc in query.stream()]
+
+    # Firestore: native coroutines, run on the background loop
+
+    async def _get_document_native(self, collection, doc_id, fields):
+        snapshot = await self._client.collection(collection).document(doc_id).get(field_paths=fields)
+        return snapshot.to_dict() if snapshot.exists else None
+
+    async def _get_all_native(self, collection, ids, fields):
+        reference = self._client.collection(collection)
+        references = [reference.document(doc_id) for doc_id in ids]
+        documents = {}
+        async for snapshot in self._client.get_all(references, field_paths=fields):
+            if snapshot.exists:
+                documents[snapshot.id] = snapshot.to_dict()
+        return documents
+
+    async def _query_native(self, collection, filters, order_by, descending, limit, fields):
+        query = self._build_query(self._client.collection(collection),
+                                  filters, order_by, descending, limit, fields)
+        return [(doc.id, doc.to_dict()) async for doc in query.stream()]
+
+    async def _run_native(self, coroutine):
+        """Run a coroutine on the background loop and await its result from the caller's loop"""
+        loop = self._ensure_loop()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, loop))
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='firestore-async', daemon=True)
+                thread.start()
+                # The gRPC channel binds to the loop it is created on
+                self._client = asyncio.run_coroutine_threadsafe(self._create_client(), loop).result()
+                self._loop = loop
+                print("✓ Async Firestore client started")
+            return self._loop
+
+    @staticmethod
+    async def _create_client():
+        return firestore_async.client()
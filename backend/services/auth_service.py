@@ -3,13 +3,97 @@ Authentication Service
 Handles user registration, login, and session management
 """
 import hashlib
+import os
 import secrets
 from datetime import datetime, timedelta
+from urllib.parse import quote
 from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists
+
+from .datastore_metrics import instrument_client
 
 # In-memory session store (use Redis in production)
 active_sessions = {}
 
+# Shared data layer, set by init_auth_service()
+_firebase_service = None
+
+# users_by_email/{normalized email} -> {'user_id', 'email'} makes email lookups a point read.
+# Until every legacy user has an index entry (migrate_datastore.py email-index), lookups
+# that miss the index fall back to the old users.where('email', '==', ...) query.
+EMAIL_INDEX_COLLECTION = 'users_by_email'
+
+
+def init_auth_service(firebase_service):
+    """Route auth datastore access through the shared FirebaseService client"""
+    global _firebase_service
+    _firebase_service = firebase_service
+
+
+def get_db():
+    """Shared datastore client (falls back to the default Firestore app outside the API)"""
+    if _firebase_service is not None and _firebase_service.firebase_enabled:
+        return _firebase_service.db
+    return instrument_client(firestore.client())
+
+
+def email_index_backfilled():
+    """True once every user has a users_by_email entry (skips the legacy query fallback)"""
+    return os.getenv('EMAIL_INDEX_BACKFILLED', 'false').lower() == 'true'
+
+
+def normalize_email(email):
+    """Canonical form of an email address for uniqueness checks"""
+    return (email or '').strip().lower()
+
+
+def email_index_key(email):
+    """users_by_email document ID for an email ('/' is not allowed in document IDs)"""
+    return quote(normalize_email(email), safe='@+')
+
+
+def _email_index_entry(user_id, email):
+    return {
+        'user_id': user_id,
+        'email': normalize_email(email),
+        'created_at': datetime.utcnow().isoformat()
+    }
+
+
+def _find_user_by_email(db, email):
+    """
+    Look up a user by email
+    
+    Returns:
+        (user_id, user_data) or (None, None)
+    """
+    index_doc = db.collection(EMAIL_INDEX_COLLECTION).document(email_index_key(email)).get()
+    if index_doc.exists:
+        user_id = index_doc.to_dict()['user_id']
+        user_doc = db.collection('users').document(user_id).get()
+        if user_doc.exists:
+            return user_id, user_doc.to_dict()
+        return None, None
+    
+    if email_index_backfilled():
+        return None, None
+    
+    # Legacy user without an index entry yet - find them the old way and backfill
+    legacy = db.collection('users').where('email', '==', email).limit(1).get()
+    if not legacy:
+        return None, None
+    
+    user_doc = legacy[0]
+    try:
+        db.collection(EMAIL_INDEX_COLLECTION).document(email_index_key(email)).create(
+            _email_index_entry(user_doc.id, email)
+        )
+    except AlreadyExists:
+        pass
+    except Exception as e:
+        print(f"⚠️  Could not backfill email index for {email}: {e}")
+    return user_doc.id, user_doc.to_dict()
+
 def hash_password(password):
     """Hash password with SHA-256"""
     return hashlib.sha256(password.encode()).hexdigest()
@@ -21,15 +105,21 @@ def generate_session_token():
 def register_user(email, password, name):
     """
     Register new user
+    
+    The user document and its users_by_email entry are committed in one atomic
+    batch. The index entry is written with create(), which fails if the email is
+    already taken, so two concurrent registrations cannot both succeed.
+    
     Returns: user_id and session_token on success, None on failure
+    Raises: ValueError if the email is already registered
     """
-    db = firestore.client()
-    users_ref = db.collection('users')
+    db = get_db()
     
-    # Check if user already exists
-    existing = users_ref.where('email', '==', email).limit(1).get()
-    if len(list(existing)) > 0:
-        raise ValueError('User with this email already exists')
+    # Legacy users registered before the email index existed have no entry yet
+    if not email_index_backfilled():
+        user_id, _ = _find_user_by_email(db, email)
+        if user_id:
+            raise ValueError('User with this email already exists')
     
     # Create new user
     user_data = {
@@ -40,8 +130,17 @@ def register_user(email, password, name):
         'profile_id': None  # Will be set when they upload resume
     }
     
-    user_ref = users_ref.add(user_data)
-    user_id = user_ref[1].id
+    user_ref = db.collection('users').document()
+    user_id = user_ref.id
+    
+    batch = db.batch()
+    batch.create(db.collection(EMAIL_INDEX_COLLECTION).document(email_index_key(email)),
+                 _email_index_entry(user_id, email))
+    batch.set(user_ref, user_data)
+    try:
+        batch.commit()
+    except AlreadyExists:
+        raise ValueError('User with this email already exists')
     
     # Create session
     session_token = generate_session_token()
@@ -97,13 +196,14 @@ def login_user(email, password):
         if password == user_info['password']:
             # Create user document in Firebase if it doesn't exist
             try:
-                db = firestore.client()
+                db = get_db()
                 user_ref = db.collection('users').document(user_info['user_id'])
                 user_doc = user_ref.get()
                 
                 if not user_doc.exists:
-                    # Create the user document
-                    user_ref.set({
+                    # Create the user document (and its email index entry)
+                    batch = db.batch()
+                    batch.set(user_ref, {
                         'email': email,
                         'name': user_info['name'],
                         'password_hash': hash_password(password),
@@ -111,6 +211,9 @@ def login_user(email, password):
                         'profile_id': None,
                         'is_test_user': True
                     })
+                    batch.set(db.collection(EMAIL_INDEX_COLLECTION).document(email_index_key(email)),
+                              _email_index_entry(user_info['user_id'], email))
+                    batch.commit()
                     print(f"✅ Created test user document: {email}")
                 else:
                     # Update profile_id from existing document
@@ -145,18 +248,10 @@ def login_user(email, password):
     
     # If not in test users, try Firestore (will fail if quota exceeded)
     try:
-        db = firestore.client()
-        users_ref = db.collection('users')
-        
-        # Use WHERE query to find user by email (requires index but avoids quota issues)
-        user_docs = users_ref.where('email', '==', email).limit(1).get()
-        
-        if not user_docs or len(user_docs) == 0:
-            raise ValueError('Invalid email or password')
+        db = get_db()
         
-        user_doc = user_docs[0]
-        user_data = user_doc.to_dict()
-        user_id = user_doc.id
+        # Email index point read (legacy users fall back to the email query once)
+        user_id, user_data = _find_user_by_email(db, email)
         
         if not user_data:
             raise ValueError('Invalid email or password')
@@ -221,7 +316,7 @@ def logout_user(session_token):
 
 def link_profile_to_user(user_id, profile_id):
     """Link a profile to a user account"""
-    db = firestore.client()
+    db = get_db()
     users_ref = db.collection('users')
     
     user_ref = users_ref.document(user_id)
@@ -239,7 +334,7 @@ def link_profile_to_user(user_id, profile_id):
 
 def get_user_profile(user_id):
     """Get user's linked profile ID"""
-    db = firestore.client()
+    db = get_db()
     user_ref = db.collection('users').document(user_id)
     user_doc = user_ref.get()
     
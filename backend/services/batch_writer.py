@@ -0,0 +1,146 @@
+"""
+Batch Writer - Coalesces datastore writes into WriteBatch commits
+"""
+
+import threading
+
+
+class BufferedWriter:
+    """
+    Collects set/update/delete operations and commits them as WriteBatch chunks
+
+    Operations are buffered until flush() is called (FirebaseService flushes at
+    the end of each request), until a full batch has accumulated, or - when
+    flush_interval is set - after that many seconds. If a chunk fails to commit,
+    its writes are retried one at a time so failures are reported per document.
+    An optional on_commit callback receives the references of every write once
+    it has committed (e.g. to invalidate caches).
+    """
+
+    # Firestore rejects batches with more than 500 writes
+    MAX_BATCH_SIZE = 500
+
+    def __init__(self, db, max_batch_size=MAX_BATCH_SIZE, flush_interval=None, on_commit=None):
+        """
+        Args:
+            db: Firestore client (or local storage backend)
+            max_batch_size: Writes per commit (capped at 500)
+            flush_interval: Optional seconds after the first buffered write to auto-flush
+            on_commit: Optional callback called with the list of document references of each commit
+        """
+        self.db = db
+        self.max_batch_size = min(max_batch_size, self.MAX_BATCH_SIZE)
+        self.flush_interval = flush_interval
+        self.on_commit = on_commit
+        self.last_result = None
+
+        self._operations = []
+        self._lock = threading.RLock()
+        self._timer = None
+
+    @property
+    def pending(self):
+        """Number of buffered operations"""
+        return len(self._operations)
+
+    def set(self, reference, data, merge=False):
+        """Buffer a set() on a document reference"""
+        self._add(('set', reference, data, merge))
+
+    def update(self, reference, data):
+        """Buffer an update() on a document reference"""
+        self._add(('update', reference, data, False))
+
+    def delete(self, reference):
+        """Buffer a delete() on a document reference"""
+        self._add(('delete', reference, None, False))
+
+    def flush(self):
+        """
+        Commit all buffered operations
+
+        Returns:
+            Dictionary with committed count, number of commits and a list of
+            per-document failures ({'path', 'op', 'error'})
+        """
+        with self._lock:
+            operations, self._operations = self._operations, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            result = {'committed': 0, 'commits': 0, 'failed': []}
+
+            for start in range(0, len(operations), self.max_batch_size):
+                chunk = operations[start:start + self.max_batch_size]
+                batch = self.db.batch()
+                for operation in chunk:
+                    self._apply(batch, operation)
+
+                try:
+                    batch.commit()
+                    result['commits'] += 1
+                    result['committed'] += len(chunk)
+                except Exception as e:
+                    print(f"⚠️  Batch commit of {len(chunk)} writes failed ({e}) - retrying individually")
+                    self._commit_individually(chunk, result)
+                else:
+                    self._committed(chunk)
+
+            if operations:
+                print(f"✓ Flushed {result['committed']}/{len(operations)} writes in {result['commits']} commit(s)")
+            for failure in result['failed']:
+                print(f"❌ Write failed: {failure['op']} {failure['path']}: {failure['error']}")
+
+            self.last_result = result
+            return result
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    def _add(self, operation):
+        with self._lock:
+            self._operations.append(operation)
+            batch_full = len(self._operations) >= self.max_batch_size
+
+            if self.flush_interval and self._timer is None and not batch_full:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if batch_full:
+            self.flush()
+
+    def _committed(self, operations):
+        if self.on_commit is None:
+            return
+        try:
+            self.on_commit([operation[1] for operation in operations])
+        except Exception as e:
+            print(f"⚠️  Post-commit callback failed: {e}")
+
+    def _apply(self, batch, operation):
+        op, reference, data, merge = operation
+        if op == 'set':
+            batch.set(reference, data, merge=merge)
+        elif op == 'update':
+            batch.update(reference, data)
+        else:
+            batch.delete(reference)
+
+    def _commit_individually(self, operations, result):
+        for operation in operations:
+            batch = self.db.batch()
+            self._apply(batch, operation)
+            try:
+                batch.commit()
+                result['commits'] += 1
+                result['committed'] += 1
+                self._committed([operation])
+            except Exception as e:
+                result['failed'].append({
+                    'path': operation[1].path,
+                    'op': operation[0],
+                    'error': str(e)
+                })
@@ -0,0 +1,412 @@
+"""
+Datastore Metrics - Per-request accounting of Firestore reads, writes and queries
+
+instrument_client() wraps a Firestore client (or a local storage backend) in
+thin proxies that count every operation into a DatastoreMetrics recorder.
+Counts follow Firestore billing: a document get is one read even when the
+document is missing, a query costs one read per returned document (at least
+one), and every document in a batch commit is one write.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class DatastoreMetrics:
+    """
+    Per-request counters aggregated per endpoint
+
+    Flask hooks call start_request()/finish_request() around each request. The
+    active request lives in a context variable, so operations run from asyncio
+    tasks or asyncio.to_thread() workers are still charged to it. Operations
+    performed outside a request (background timers, CLI scripts) are
+    aggregated under BACKGROUND.
+    """
+
+    COUNTERS = ('reads', 'writes', 'queries', 'streamed', 'commits', 'calls')
+    BACKGROUND = '(background)'
+
+    def __init__(self):
+        self._request = ContextVar('datastore_request', default=None)  # (endpoint, counts)
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    # ========================================================================
+    # RECORDING
+    # ========================================================================
+
+    def start_request(self, endpoint):
+        """Begin counting operations for the current thread's request"""
+        self._request.set((endpoint, self._empty_counts()))
+
+    def finish_request(self):
+        """
+        Stop counting for the current request and fold it into the endpoint totals
+
+        Returns:
+            The request's counts, or None if no request was active
+        """
+        active = self._request.get()
+        self._request.set(None)
+        if active is None:
+            return None
+
+        endpoint, counts = active
+        self._aggregate(endpoint, counts, requests=1)
+        return counts
+
+    def current(self):
+        """Counts recorded so far in the current request (None outside a request)"""
+        active = self._request.get()
+        return dict(active[1]) if active is not None else None
+
+    def record(self, reads=0, writes=0, queries=0, streamed=0, commits=0, latency=0.0):
+        """Add one datastore call to the current request (or to BACKGROUND)"""
+        delta = {
+            'reads': reads, 'writes': writes, 'queries': queries,
+            'streamed': streamed, 'commits': commits, 'calls': 1,
+            'latency_ms': latency * 1000
+        }
+
+        active = self._request.get()
+        if active is None:
+            self._aggregate(self.BACKGROUND, delta, requests=0)
+            return
+
+        # Concurrent reads of one request (asyncio.gather) may record from several threads
+        counts = active[1]
+        with self._lock:
+            for key, value in delta.items():
+                counts[key] += value
+
+    @contextmanager
+    def track(self, endpoint):
+        """
+        Count the operations of a block as if it were a request
+
+        Yields a dictionary that holds the final counts once the block exits.
+        """
+        previous = self._request.get()
+        self.start_request(endpoint)
+        result = {}
+        try:
+            yield result
+        finally:
+            result.update(self.finish_request() or {})
+            self._request.set(previous)
+
+    # ========================================================================
+    # REPORTING
+    # ========================================================================
+
+    def snapshot(self):
+        """Per-endpoint totals, averages and per-request maxima"""
+        with self._lock:
+            report = {}
+            for endpoint, stats in self._endpoints.items():
+                requests = stats['requests']
+                entry = {key: value for key, value in stats.items() if key != 'latency_ms'}
+                entry['latency_ms'] = round(stats['latency_ms'], 2)
+                entry['max_latency_ms'] = round(stats['max_latency_ms'], 2)
+                if requests:
+                    entry['avg_reads'] = round(stats['reads'] / requests, 2)
+                    entry['avg_writes'] = round(stats['writes'] / requests, 2)
+                    entry['avg_latency_ms'] = round(stats['latency_ms'] / requests, 2)
+                report[endpoint] = entry
+            return report
+
+    def budget_violations(self, budgets):
+        """
+        Compare per-request maxima against budgets
+
+        Args:
+            budgets: {endpoint: {'reads': n, 'writes': n, 'queries': n}}
+
+        Returns:
+            List of human-readable violations (empty when within budget)
+        """
+        report = self.snapshot()
+        violations = []
+        for endpoint, limits in budgets.items():
+            stats = report.get(endpoint)
+            if not stats:
+                continue
+            for counter, limit in limits.items():
+                worst = stats.get(f'max_{counter}', 0)
+                if worst > limit:
+                    violations.append(f"{endpoint}: {worst} {counter} per request (budget {limit})")
+        return violations
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    @staticmethod
+    def format_header(counts):
+        """Compact X-Datastore-Ops header value"""
+        return (f"reads={counts['reads']}; writes={counts['writes']}; queries={counts['queries']}; "
+                f"streamed={counts['streamed']}; ms={counts['latency_ms']:.1f}")
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    def _empty_counts(self):
+        counts = dict.fromkeys(self.COUNTERS, 0)
+        counts['latency_ms'] = 0.0
+        return counts
+
+    def _aggregate(self, endpoint, counts, requests):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._empty_counts()
+                stats['requests'] = 0
+                for counter in ('reads', 'writes', 'queries', 'latency_ms'):
+                    stats[f'max_{counter}'] = 0
+                self._endpoints[endpoint] = stats
+
+            stats['requests'] += requests
+            for key in self.COUNTERS + ('latency_ms',):
+                stats[key] += counts[key]
+            if requests:
+                for counter in ('reads', 'writes', 'queries', 'latency_ms'):
+                    stats[f'max_{counter}'] = max(stats[f'max_{counter}'], counts[counter])
+
+
+# Process-wide recorder shared by FirebaseService and the auth helpers
+datastore_metrics = DatastoreMetrics()
+
+
+def parse_ops_header(value):
+    """Parse an X-Datastore-Ops header back into a dictionary of numbers"""
+    counts = {}
+    for part in (value or '').split(';'):
+        if '=' in part:
+            key, number = part.strip().split('=', 1)
+            counts[key] = float(number) if '.' in number else int(number)
+    return counts
+
+
+def assert_datastore_budget(response, max_reads=None, max_writes=None, max_queries=None):
+    """
+    Test helper: fail if a response used more datastore operations than allowed
+
+    Example:
+        response = app.test_client().get('/api/gamification/leaderboard')
+        assert_datastore_budget(response, max_reads=60, max_queries=1)
+
+    Raises:
+        AssertionError when the header is missing or a budget is exceeded
+    """
+    header = response.headers.get('X-Datastore-Ops')
+    if header is None:
+        raise AssertionError('Response has no X-Datastore-Ops header')
+
+    counts = parse_ops_header(header)
+    limits = {'reads': max_reads, 'writes': max_writes, 'queries': max_queries}
+    exceeded = [
+        f"{counter}={counts.get(counter, 0)} > {limit}"
+        for counter, limit in limits.items()
+        if limit is not None and counts.get(counter, 0) > limit
+    ]
+    if exceeded:
+        raise AssertionError(f"Datastore budget exceeded ({', '.join(exceeded)}): {header}")
+    return counts
+
+
+def instrument_client(client, metrics=datastore_metrics):
+    """Wrap a Firestore client or local backend so its operations are counted"""
+    if client is None or isinstance(client, InstrumentedClient):
+        return client
+    return InstrumentedClient(client, metrics)
+
+
+def _unwrap(reference):
+    return reference._wrapped if isinstance(reference, _Proxy) else reference
+
+
+# ============================================================================
+# PROXIES
+# ============================================================================
+
+class _Proxy:
+    """Forwards every attribute not overridden to the wrapped object"""
+
+    def __init__(self, wrapped, metrics):
+        self._wrapped = wrapped
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        if name == '_wrapped':
+            raise AttributeError(name)
+        return getattr(self._wrapped, name)
+
+    def __eq__(self, other):
+        return self._wrapped == _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._wrapped)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._wrapped!r})"
+
+    def _counted(self, function, args, kwargs, **counts):
+        """Call function and record counts with its latency (failed calls count too)"""
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self._metrics.record(latency=time.perf_counter() - started, **counts)
+
+
+class InstrumentedClient(_Proxy):
+    """Client proxy: hands out instrumented references, queries and batches"""
+
+    def collection(self, *path):
+        return InstrumentedCollection(self._wrapped.collection(*path), self._metrics)
+
+    def document(self, *path):
+        return InstrumentedDocument(self._wrapped.document(*path), self._metrics)
+
+    def batch(self):
+        return InstrumentedBatch(self._wrapped.batch(), self._metrics)
+
+    def get_all(self, references, field_paths=None, **kwargs):
+        references = [_unwrap(reference) for reference in references]
+        snapshots = self._counted(
+            lambda: list(self._wrapped.get_all(references, field_paths=field_paths, **kwargs)),
+            (), {}, reads=len(references)
+        )
+        return iter(snapshots)
+
+
+class InstrumentedQuery(_Proxy):
+    """Query proxy: query builders stay instrumented, stream()/get() are counted"""
+
+    def __getattr__(self, name):
+        attribute = getattr(self._wrapped, name)
+        if not callable(attribute):
+            return attribute
+
+        def build(*args, **kwargs):
+            result = attribute(*[_unwrap(arg) for arg in args], **kwargs)
+            if hasattr(result, 'stream') and not isinstance(result, _Proxy):
+                return InstrumentedQuery(result, self._metrics)
+            return result
+        return build
+
+    def stream(self, *args, **kwargs):
+        started = time.perf_counter()
+        elapsed = 0.0
+        streamed = 0
+        iterator = iter(self._wrapped.stream(*args, **kwargs))
+        elapsed += time.perf_counter() - started
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    snapshot = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - started
+                streamed += 1
+                yield snapshot
+        finally:
+            self._metrics.record(reads=max(streamed, 1), queries=1, streamed=streamed, latency=elapsed)
+
+    def get(self, *args, **kwargs):
+        return list(self.stream(*args, **kwargs))
+
+    def on_snapshot(self, callback):
+        """Listen for changes; every delivered document change is billed as one read"""
+        def counted(documents, changes, read_time):
+            self._metrics.record(reads=len(changes), streamed=len(changes))
+            return callback(documents, changes, read_time)
+        return self._wrapped.on_snapshot(counted)
+
+
+class InstrumentedCollection(InstrumentedQuery):
+    """Collection proxy: document() and add() return instrumented references"""
+
+    def document(self, *args, **kwargs):
+        return InstrumentedDocument(self._wrapped.document(*args, **kwargs), self._metrics)
+
+    def add(self, document_data, *args, **kwargs):
+        update_time, reference = self._counted(
+            self._wrapped.add, (document_data,) + args, kwargs, writes=1, commits=1
+        )
+        return update_time, InstrumentedDocument(reference, self._metrics)
+
+    def list_documents(self, *args, **kwargs):
+        started = time.perf_counter()
+        references = list(self._wrapped.list_documents(*args, **kwargs))
+        self._metrics.record(reads=max(len(references), 1), queries=1,
+                             streamed=len(references), latency=time.perf_counter() - started)
+        return (InstrumentedDocument(reference, self._metrics) for reference in references)
+
+
+class InstrumentedDocument(_Proxy):
+    """Document reference proxy counting gets and single-document writes"""
+
+    def collection(self, *args, **kwargs):
+        return InstrumentedCollection(self._wrapped.collection(*args, **kwargs), self._metrics)
+
+    def get(self, *args, **kwargs):
+        return self._counted(self._wrapped.get, args, kwargs, reads=1)
+
+    def set(self, *args, **kwargs):
+        return self._write(self._wrapped.set, *args, **kwargs)
+
+    def create(self, *args, **kwargs):
+        return self._write(self._wrapped.create, *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        return self._write(self._wrapped.update, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._write(self._wrapped.delete, *args, **kwargs)
+
+    def _write(self, function, *args, **kwargs):
+        return self._counted(function, args, kwargs, writes=1, commits=1)
+
+
+class InstrumentedBatch(_Proxy):
+    """WriteBatch proxy: unwraps references and counts writes on commit"""
+
+    def __init__(self, wrapped, metrics):
+        super().__init__(wrapped, metrics)
+        self._pending = 0
+
+    def set(self, reference, *args, **kwargs):
+        self._pending += 1
+        return self._wrapped.set(_unwrap(reference), *args, **kwargs)
+
+    def create(self, reference, *args, **kwargs):
+        self._pending += 1
+        return self._wrapped.create(_unwrap(reference), *args, **kwargs)
+
+    def update(self, reference, *args, **kwargs):
+        self._pending += 1
+        return self._wrapped.update(_unwrap(reference), *args, **kwargs)
+
+    def delete(self, reference, *args, **kwargs):
+        self._pending += 1
+        return self._wrapped.delete(_unwrap(reference), *args, **kwargs)
+
+    def commit(self, *args, **kwargs):
+        pending, self._pending = self._pending, 0
+        return self._counted(self._wrapped.commit, args, kwargs, writes=pending, commits=1)
+
+    def __len__(self):
+        return self._pending
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
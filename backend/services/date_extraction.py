@@ -0,0 +1,221 @@
+"""
+Date Extraction - Single-pass scanner for deadline and closing dates in search snippets
+"""
+
+import re
+from datetime import date, datetime, timedelta
+
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+# Longer phrases first so "registration deadline" wins over "deadline"
+DEADLINE_KEYWORDS = [
+    'registration deadline', 'application deadline', 'deadline', 'apply by', 'last date',
+    'due date', 'register by', 'submit by', 'closes on', 'close date', 'expiry', 'expires',
+    'ends on', 'till', 'before'
+]
+
+# Words that mean the opportunity is no longer open, whatever dates it mentions
+CLOSED_KEYWORDS = ['closed', 'ended', 'expired']
+
+_MONTH = r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?'
+_YEAR = r"(?:(?:19|20)\d{2}|'\d{2})"
+
+# One alternation over every supported format. Each branch has its own named
+# groups because Python does not allow a group name to repeat.
+DATE_PATTERN = re.compile(
+    # Every branch starts at a word boundary, so positions inside words are rejected on the first check
+    r'\b(?:'
+    r'(?:(?P<keyword>' + '|'.join(re.escape(k) for k in DEADLINE_KEYWORDS) + r'):?\s*)?'
+    r'(?:'
+    r'(?P<iso_y>(?:19|20)\d{2})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})(?!\d)'
+    r'|(?P<num_a>\d{1,2})(?P<num_sep>[-/])(?P<num_b>\d{1,2})(?P=num_sep)(?P<num_y>(?:19|20)\d{2})(?!\d)'
+    r'|(?P<mdy_m>' + _MONTH + r')\s+(?P<mdy_d>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<mdy_y>' + _YEAR + r')(?!\d)'
+    r'|(?P<dmy_d>\d{1,2})(?:st|nd|rd|th)?\s+(?P<dmy_m>' + _MONTH + r'),?\s+(?P<dmy_y>' + _YEAR + r')(?!\d)'
+    r')'
+    r'|(?P<closed>' + '|'.join(CLOSED_KEYWORDS) + r')\b'
+    r')',
+    re.IGNORECASE
+)
+
+
+class DateCandidate:
+    """One date found in a piece of text"""
+
+    __slots__ = ('date', 'text', 'keyword', 'kind', 'position')
+
+    def __init__(self, value, text, keyword, kind, position):
+        """
+        Args:
+            value: Normalized datetime.date
+            text: The date as written, with 'YY years expanded (e.g. "15 March 2027")
+            keyword: Lowercased deadline keyword right before the date, or None
+            kind: 'text' (month names), 'numeric' (15/03/2027) or 'iso' (2027-03-15)
+            position: Offset of the date in the scanned text
+        """
+        self.date = value
+        self.text = text
+        self.keyword = keyword
+        self.kind = kind
+        self.position = position
+
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'text': self.text,
+            'keyword': self.keyword,
+            'kind': self.kind
+        }
+
+    def __repr__(self):
+        return f"DateCandidate({self.date.isoformat()}, {self.text!r}, keyword={self.keyword!r})"
+
+
+class DateScan:
+    """
+    Every date (and closing word) found in one pass over a piece of text
+
+    Deadline, expiry and deadline feasibility are all read from this one
+    result instead of re-scanning the text for each.
+    """
+
+    # Deadline preference when no date follows a keyword: month names, then numeric, then ISO
+    KIND_PRIORITY = {'text': 0, 'numeric': 1, 'iso': 2}
+
+    def __init__(self, candidates, closed_keyword=None):
+        """
+        Args:
+            candidates: DateCandidate list in text order
+            closed_keyword: First closing word found ("closed", "ended", "expired"), or None
+        """
+        self.candidates = candidates
+        self.closed_keyword = closed_keyword
+
+    @property
+    def deadline(self):
+        """
+        The most likely deadline
+
+        Returns:
+            The first date preceded by a deadline keyword, otherwise the first
+            date by KIND_PRIORITY, or None if the text has no dates
+        """
+        if not self.candidates:
+            return None
+        for candidate in self.candidates:
+            if candidate.keyword:
+                return candidate
+        return min(self.candidates, key=lambda c: (self.KIND_PRIORITY[c.kind], c.position))
+
+    def expired_by(self, today=None):
+        """
+        Why the text looks expired
+
+        Args:
+            today: Reference date (defaults to date.today())
+
+        Returns:
+            The closing word, the first date before yesterday, or None if not expired
+        """
+        if self.closed_keyword:
+            return self.closed_keyword
+        cutoff = (today or date.today()) - timedelta(days=1)
+        for candidate in self.candidates:
+            if candidate.date < cutoff:
+                return candidate
+        return None
+
+    def is_expired(self, today=None):
+        return self.expired_by(today) is not None
+
+
+def _year(value):
+    """'27 -> 2027, '19 -> 2019, 2027 -> 2027"""
+    if value.startswith("'"):
+        return 2000 + int(value[1:])
+    return int(value)
+
+
+def _make_date(year, month, day):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _parse_match(match):
+    """Turn a DATE_PATTERN match into (date, text, kind), date None if it is not a real date"""
+    groups = match.groupdict()
+    text = match.group(0)[match.end('keyword') - match.start(0):] if groups['keyword'] else match.group(0)
+    text = text.lstrip(': \t\n')
+
+    if groups['iso_y']:
+        return _make_date(int(groups['iso_y']), int(groups['iso_m']), int(groups['iso_d'])), text, 'iso'
+
+    if groups['num_a']:
+        # Day first (15/03/2027) unless that is impossible (03/15/2027)
+        first, second, year = int(groups['num_a']), int(groups['num_b']), int(groups['num_y'])
+        value = _make_date(year, second, first) or _make_date(year, first, second)
+        return value, text, 'numeric'
+
+    if groups['mdy_m']:
+        month, day, year = groups['mdy_m'], groups['mdy_d'], groups['mdy_y']
+    else:
+        month, day, year = groups['dmy_m'], groups['dmy_d'], groups['dmy_y']
+    if "'" in year:
+        text = text.replace(year, str(_year(year)))
+    return _make_date(_year(year), MONTHS[month[:3].lower()], int(day)), text, 'text'
+
+
+def scan_dates(text):
+    """
+    Find every date in text in a single regex pass
+
+    Args:
+        text: Text to scan (e.g. a search result's title and snippet)
+
+    Returns:
+        DateScan
+    """
+    candidates = []
+    closed_keyword = None
+
+    for match in DATE_PATTERN.finditer(text or ''):
+        closed = match.group('closed')
+        if closed:
+            closed_keyword = closed_keyword or closed.lower()
+            continue
+
+        value, date_text, kind = _parse_match(match)
+        if value is None:
+            continue
+        keyword = match.group('keyword')
+        position = match.start('keyword') if keyword else match.start()
+        candidates.append(DateCandidate(value, date_text, keyword.lower() if keyword else None, kind, position))
+
+    return DateScan(candidates, closed_keyword)
+
+
+def parse_date(value):
+    """
+    Read a single date out of a stored deadline value
+
+    Accepts datetime/date objects, ISO strings ("2027-03-15T00:00:00Z") and
+    the display strings extracted from snippets ("March 15, 2027").
+
+    Returns:
+        datetime.date or None
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str):
+        return None
+    candidate = scan_dates(value).deadline
+    return candidate.date if candidate else None
@@ -4,9 +4,24 @@ Firebase Service - Handles all Firebase Firestore operations
 
 import firebase_admin
 from firebase_admin import credentials, firestore
+import base64
+import copy
+import hashlib
 import os
 import json
-from datetime import datetime
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .async_firebase_service import AsyncFirebaseService
+from .batch_writer import BufferedWriter
+from .cache import TTLCache
+from .datastore_metrics import datastore_metrics, instrument_client
+from .gamification_mirror import GamificationMirror
+from .opportunity_index import OpportunityIndex
+from .recent_feed import RecentOpportunityFeed
+from .storage_backend import create_storage_backend, project_fields
 
 
 class FirebaseService:
@@ -17,28 +32,93 @@ class FirebaseService:
         self.students_collection = None
         self.opportunities_collection = None
         self.reasoning_collection = None
+        self.resume_texts_collection = None
         self.firebase_enabled = False
         
+        # Per-thread (i.e. per-request) write buffers, see get_writer()
+        self._write_buffers = threading.local()
+        self.write_flush_interval = float(os.getenv('WRITE_BUFFER_FLUSH_INTERVAL', '0')) or None
+        
+        # Read-through caches for the hottest point reads (see get_student_profile/get_opportunity)
+        self.profile_cache = TTLCache(
+            max_size=int(os.getenv('PROFILE_CACHE_SIZE', '1000')),
+            ttl=float(os.getenv('PROFILE_CACHE_TTL', '300')),
+            negative_ttl=float(os.getenv('NEGATIVE_CACHE_TTL', '30')),
+            name='profiles'
+        )
+        self.opportunity_cache = TTLCache(
+            max_size=int(os.getenv('OPPORTUNITY_CACHE_SIZE', '5000')),
+            ttl=float(os.getenv('OPPORTUNITY_CACHE_TTL', '900')),
+            negative_ttl=float(os.getenv('NEGATIVE_CACHE_TTL', '30')),
+            name='opportunities'
+        )
+        # Content hashes of opportunities known to be stored (lets repeat searches skip reads and writes)
+        self.opportunity_hash_cache = TTLCache(max_size=20000, ttl=86400, name='opportunity_hashes')
+        # Newest opportunities per type, serving /api/opportunities/cached without reads
+        self.recent_feed = RecentOpportunityFeed(
+            capacity=int(os.getenv('RECENT_FEED_SIZE', '100')),
+            ttl=float(os.getenv('RECENT_FEED_TTL', '300'))
+        )
+        
+        # Storage backend: 'firestore' (default), 'memory' or 'sqlite'
+        self.backend_name = os.getenv('DATASTORE_BACKEND', 'firestore').lower()
+        
         try:
-            # Initialize Firebase
-            if not firebase_admin._apps:
-                self._initialize_firebase()
+            if self.backend_name == 'firestore':
+                # Initialize Firebase
+                if not firebase_admin._apps:
+                    self._initialize_firebase()
+                
+                # Get Firestore client
+                self.db = firestore.client()
+            else:
+                self.db = self._create_local_backend(self.backend_name)
             
-            # Get Firestore client
-            self.db = firestore.client()
+            self.firebase_enabled = True
+            print(f"✅ Datastore initialized successfully ({self.backend_name})")
+            
+        except Exception as e:
+            print(f"❌ Firebase initialization failed: {e}")
+            
+            # Optional local fallback (e.g. a SQLite mirror when Firestore is unavailable)
+            fallback = os.getenv('DATASTORE_FALLBACK')
+            if fallback and fallback.lower() != self.backend_name:
+                try:
+                    self.db = self._create_local_backend(fallback)
+                    self.backend_name = fallback.lower()
+                    self.firebase_enabled = True
+                    print(f"⚠️  Falling back to local {self.backend_name} datastore")
+                except Exception as fallback_error:
+                    print(f"❌ Datastore fallback failed: {fallback_error}")
+            
+            if not self.firebase_enabled:
+                print("⚠️  Application will continue with limited functionality")
+        
+        # Count every datastore operation per request (see datastore_metrics.py)
+        self.metrics = datastore_metrics
+        if self.firebase_enabled:
+            self.db = instrument_client(self.db, self.metrics)
             
             # Collection references
             self.students_collection = self.db.collection('students')
             self.opportunities_collection = self.db.collection('opportunities')
             self.reasoning_collection = self.db.collection('reasoning_results')
-            
-            self.firebase_enabled = True
-            print("✅ Firebase initialized successfully")
-            
-        except Exception as e:
-            print(f"❌ Firebase initialization failed: {e}")
-            print("⚠️  Application will continue with limited functionality")
-            self.firebase_enabled = False
+            self.resume_texts_collection = self.db.collection('resume_texts')
+        
+        # asyncio read path for async endpoints (its event loop starts on first use)
+        self.async_service = AsyncFirebaseService(self)
+        
+        # Listener-backed copy of gamification for leaderboards and peer stats (started by the app)
+        self.gamification_mirror = GamificationMirror(self)
+        # Listener-backed BM25 index over stored opportunities, searched before Google (started by the app)
+        self.opportunity_index = OpportunityIndex(self)
+    
+    def _create_local_backend(self, backend_name):
+        """Create a local Firestore-compatible backend (memory or sqlite)"""
+        sqlite_path = os.getenv('DATASTORE_SQLITE_PATH', './datastore.sqlite3')
+        backend = create_storage_backend(backend_name, sqlite_path)
+        print(f"✓ Using local {backend.name} datastore")
+        return backend
     
     def _initialize_firebase(self):
         """Initialize Firebase instance with credentials"""
@@ -86,6 +166,138 @@ class FirebaseService:
             raise ValueError("Firebase credentials not configured")
     
     
+    # ========================================================================
+    # BUFFERED WRITES
+    # ========================================================================
+    
+    def get_writer(self):
+        """
+        Get the write buffer for the current request (thread)
+        
+        Writes buffered here are committed as WriteBatch chunks by
+        flush_writes(), which app.py calls when the response is sent.
+        
+        Returns:
+            BufferedWriter, or None if the datastore is disabled
+        """
+        if not self.firebase_enabled:
+            return None
+        
+        writer = getattr(self._write_buffers, 'writer', None)
+        if writer is None:
+            writer = BufferedWriter(self.db, flush_interval=self.write_flush_interval,
+                                    on_commit=self._invalidate_committed)
+            self._write_buffers.writer = writer
+            self._write_buffers.depth = 0
+        return writer
+    
+    
+    def flush_writes(self):
+        """
+        Flush-on-response hook: commit any writes buffered by this request
+        
+        Returns:
+            Flush result dictionary, or None if nothing was pending
+        """
+        writer = getattr(self._write_buffers, 'writer', None)
+        if writer is None or not writer.pending:
+            return None
+        return writer.flush()
+    
+    
+    def _invalidate_committed(self, references):
+        """
+        Drop cached copies of documents a buffered commit just wrote
+        
+        Writes also invalidate when they are buffered, but a read between
+        buffering and the commit would re-cache the old (or missing) document.
+        """
+        for reference in references:
+            collection_path, _, doc_id = reference.path.rpartition('/')
+            if collection_path == 'opportunities':
+                self.opportunity_cache.invalidate(doc_id)
+            elif collection_path == 'students':
+                self._invalidate_profile(doc_id)
+    
+    
+    @contextmanager
+    def batched_writes(self):
+        """
+        Buffer writes for the duration of a block and flush them on exit
+        
+        Nested blocks share one buffer; only the outermost block flushes.
+        
+        Yields:
+            BufferedWriter, or None if the datastore is disabled
+        """
+        writer = self.get_writer()
+        if writer is None:
+            yield None
+            return
+        
+        self._write_buffers.depth += 1
+        try:
+            yield writer
+        finally:
+            self._write_buffers.depth -= 1
+            if self._write_buffers.depth == 0:
+                writer.flush()
+    
+    
+    # ========================================================================
+    # CACHE STATISTICS
+    # ========================================================================
+    
+    def cache_stats(self):
+        """Hit-rate counters for the read-through caches"""
+        return {
+            'profiles': self.profile_cache.stats(),
+            'opportunities': self.opportunity_cache.stats(),
+            'recent_feed': self.recent_feed.stats(),
+            'gamification_mirror': self.gamification_mirror.stats(),
+            'opportunity_index': self.opportunity_index.stats()
+        }
+    
+    
+    # ========================================================================
+    # BATCHED READS
+    # ========================================================================
+    
+    # Documents fetched per get_all round trip
+    GET_MANY_CHUNK_SIZE = 100
+    
+    def get_many(self, collection, ids, fields=None):
+        """
+        Fetch many documents from one collection with batched get_all calls
+        
+        Args:
+            collection: Collection name
+            ids: Iterable of document IDs (duplicates and empty IDs are ignored)
+            fields: Optional list of field paths to project (e.g. ['personal_info.name'])
+        
+        Returns:
+            Dictionary mapping document ID to data, for documents that exist
+        """
+        if not self.firebase_enabled:
+            return {}
+        
+        unique_ids = list(dict.fromkeys(doc_id for doc_id in ids if doc_id))
+        collection_ref = self.db.collection(collection)
+        documents = {}
+        
+        for start in range(0, len(unique_ids), self.GET_MANY_CHUNK_SIZE):
+            chunk = unique_ids[start:start + self.GET_MANY_CHUNK_SIZE]
+            try:
+                refs = [collection_ref.document(doc_id) for doc_id in chunk]
+                for snapshot in self.db.get_all(refs, field_paths=fields):
+                    if snapshot.exists:
+                        documents[snapshot.id] = snapshot.to_dict()
+            except Exception as e:
+                print(f"❌ Error batch-reading {len(chunk)} documents from {collection}: {e}")
+        
+        return documents
+    
+    
     # ========================================================================
     # STUDENT PROFILE OPERATIONS
     # ========================================================================
@@ -94,6 +306,10 @@ class FirebaseService:
         """
         Create a new student profile in Firestore
         
+        The raw resume text is kept out of the student document (it is only
+        needed when re-parsing) and stored zlib-compressed in resume_texts/{id}.
+        Both documents are written in one batch.
+        
         Args:
             profile_data: Structured profile dictionary
             resume_text: Optional raw resume text
@@ -113,11 +329,17 @@ class FirebaseService:
             
             student = {
                 'profile': profile_data,
-                'resume_text': resume_text,
+                'has_resume_text': bool(resume_text),
+                'profile_version': 1,
                 'created_at': firestore.SERVER_TIMESTAMP
             }
             
-            doc_ref.set(student)
+            batch = self.db.batch()
+            batch.set(doc_ref, student)
+            if resume_text:
+                batch.set(self.resume_texts_collection.document(doc_ref.id),
+                          self._compress_resume_text(resume_text))
+            batch.commit()
             
             return {
                 'profile_id': doc_ref.id,
@@ -131,10 +353,16 @@ class FirebaseService:
             }
     
     
-    def get_student_profile(self, profile_id):
+    def get_student_profile(self, profile_id, fields=None, include_resume=False):
         """
         Get student profile by ID
         
+        Args:
+            profile_id: Student profile ID
+            fields: Optional list of field paths to read (e.g. ['profile', 'profile_version']);
+                the whole document is read when omitted
+            include_resume: Also load the raw resume text (extra read)
+        
         Returns:
             Profile dictionary or None
         """
@@ -142,21 +370,60 @@ class FirebaseService:
             print(f"⚠️  Firebase disabled - cannot retrieve profile {profile_id}")
             return None
         
-        try:
-            doc_ref = self.students_collection.document(profile_id)
-            doc = doc_ref.get()
+        cache_key = (profile_id, tuple(fields)) if fields else profile_id
+        data = self.profile_cache.get(cache_key)
+        
+        if data is TTLCache.MISSING:
+            try:
+                doc = self.students_collection.document(profile_id).get(field_paths=fields)
+            except Exception as e:
+                print(f"❌ Error getting profile {profile_id}: {e}")
+                return None
             
-            if doc.exists:
-                data = doc.to_dict()
-                data['profile_id'] = doc.id
-                print(f"✓ Retrieved profile {profile_id}")
-                return data
-            else:
+            if not doc.exists:
+                self.profile_cache.set_missing(cache_key)
                 print(f"⚠️  Profile {profile_id} not found")
                 return None
-                
+            
+            data = doc.to_dict()
+            # Legacy documents still carry the raw text inline - never cache or return it here
+            data.pop('resume_text', None)
+            data['profile_id'] = doc.id
+            self.profile_cache.set(cache_key, data)
+            print(f"✓ Retrieved profile {profile_id}")
+        
+        if data is None:
+            return None
+        
+        data = copy.deepcopy(data)
+        if include_resume:
+            data['resume_text'] = self.get_resume_text(profile_id)
+        return data
+    
+    
+    def get_resume_text(self, profile_id):
+        """
+        Load the raw resume text for a profile
+        
+        Returns:
+            Resume text, or None if the profile has none
+        """
+        if not self.firebase_enabled:
+            return None
+        
+        try:
+            doc = self.resume_texts_collection.document(profile_id).get()
+            if doc.exists:
+                return self._decompress_resume_text(doc.to_dict())
+            
+            # Not split out yet (see migrate_datastore.py resume-split)
+            legacy = self.students_collection.document(profile_id).get(field_paths=['resume_text'])
+            if legacy.exists:
+                return (legacy.to_dict() or {}).get('resume_text')
+            return None
+            
         except Exception as e:
-            print(f"❌ Error getting profile {profile_id}: {e}")
+            print(f"❌ Error getting resume text for {profile_id}: {e}")
             return None
     
     
@@ -169,42 +436,241 @@ class FirebaseService:
             doc_ref = self.students_collection.document(profile_id)
             doc_ref.update({
                 'profile': profile_data,
+                'profile_version': firestore.Increment(1),
                 'updated_at': firestore.SERVER_TIMESTAMP
             })
             return {'success': True, 'profile_id': profile_id}
         except Exception as e:
             print(f"❌ Error updating profile: {e}")
             return {'success': False, 'error': str(e)}
+        finally:
+            self._invalidate_profile(profile_id)
+    
+    
+    def _invalidate_profile(self, profile_id):
+        """Drop the full and every projected cache entry of a profile"""
+        self.profile_cache.invalidate_where(
+            lambda key: key == profile_id or (isinstance(key, tuple) and key[0] == profile_id)
+        )
+    
+    
+    @staticmethod
+    def _compress_resume_text(resume_text):
+        """Build a resume_texts document holding zlib-compressed UTF-8 text"""
+        raw = resume_text.encode('utf-8')
+        return {
+            'encoding': 'zlib',
+            'data': zlib.compress(raw, 6),
+            'original_size': len(raw),
+            'created_at': firestore.SERVER_TIMESTAMP
+        }
+    
+    
+    @staticmethod
+    def _decompress_resume_text(document):
+        """Inverse of _compress_resume_text"""
+        data = document.get('data')
+        if data is None:
+            return None
+        if document.get('encoding') == 'zlib':
+            data = zlib.decompress(data)
+        return data.decode('utf-8') if isinstance(data, bytes) else data
     
     
     # ========================================================================
     # OPPORTUNITY OPERATIONS
     # ========================================================================
     
-    def create_opportunity(self, opportunity_data):
-        """Create or update an opportunity (cache it)"""
+    # Fields that make up an opportunity's content - discovery timestamps are
+    # excluded so re-finding the same result does not count as a change
+    OPPORTUNITY_CONTENT_FIELDS = (
+        'title', 'link', 'url', 'description', 'snippet', 'source', 'type', 'organizer',
+        'eligibility_text', 'deadline', 'apply_by', 'relevance_score'
+    )
+    
+    @staticmethod
+    def opportunity_key(url):
+        """Canonical opportunity ID: hash of the result URL"""
+        return hashlib.md5(url.encode()).hexdigest()[:12]
+    
+    
+    @classmethod
+    def opportunity_content_hash(cls, opportunity):
+        """Stable hash of the fields that define an opportunity"""
+        content = {field: opportunity.get(field) for field in cls.OPPORTUNITY_CONTENT_FIELDS}
+        encoded = json.dumps(content, sort_keys=True, default=str).encode()
+        return hashlib.sha1(encoded).hexdigest()
+    
+    
+    def upsert_opportunities(self, opportunities, writer=None):
+        """
+        Store search results as canonical, content-addressed opportunity records
+        
+        Each opportunity lives at opportunities/{md5(url)[:12]} and is only
+        rewritten when its content hash changes, so repeat searches cost no
+        writes (and no reads once the hashes are known in-process).
+        
+        Args:
+            opportunities: Parsed opportunity dictionaries (must have 'url' or 'link')
+            writer: Optional BufferedWriter to coalesce the writes into
+        
+        Returns:
+            The opportunities with 'id' and 'opportunity_id' set to the canonical ID
+        """
+        keyed = []
+        for opp in opportunities:
+            opp_id = self.opportunity_key(opp.get('url') or opp.get('link') or opp.get('title', ''))
+            opp['id'] = opp_id
+            opp['opportunity_id'] = opp_id
+            keyed.append((opp_id, self.opportunity_content_hash(opp), opp))
+        
         if not self.firebase_enabled:
-            mock_id = f"opp_{datetime.now().timestamp()}"
-            return {'opportunity_id': mock_id, **opportunity_data}
+            return opportunities
         
         try:
-            doc_ref = self.opportunities_collection.document()
+            # Stored hashes: in-process first, then one batched projected read for the rest
+            known = {}
+            unknown_ids = []
+            for opp_id, _, _ in keyed:
+                stored_hash = self.opportunity_hash_cache.get(opp_id)
+                if stored_hash is TTLCache.MISSING:
+                    unknown_ids.append(opp_id)
+                else:
+                    known[opp_id] = stored_hash
             
-            opportunity = {
-                **opportunity_data,
-                'cached_at': firestore.SERVER_TIMESTAMP
-            }
+            if unknown_ids:
+                stored = self.get_many('opportunities', unknown_ids, fields=['content_hash'])
+                for opp_id in unknown_ids:
+                    known[opp_id] = stored.get(opp_id, {}).get('content_hash')
             
-            doc_ref.set(opportunity)
+            changed = 0
+            for opp_id, content_hash, opp in keyed:
+                if known.get(opp_id) == content_hash:
+                    self.opportunity_hash_cache.set(opp_id, content_hash)
+                    continue
+                
+                record = {field: opp.get(field) for field in self.OPPORTUNITY_CONTENT_FIELDS}
+                record.update({
+                    'content_hash': content_hash,
+                    'discovered_date': opp.get('discovered_date'),
+                    'created_at': datetime.now().isoformat(),
+                    'cached_at': firestore.SERVER_TIMESTAMP,
+                    'source_type': 'search',
+                    'is_cached': True
+                })
+                
+                doc_ref = self.opportunities_collection.document(opp_id)
+                if writer is not None:
+                    writer.set(doc_ref, record, merge=True)
+                else:
+                    doc_ref.set(record, merge=True)
+                
+                self.opportunity_cache.invalidate(opp_id)
+                self.opportunity_hash_cache.set(opp_id, content_hash)
+                stored_at = datetime.now(timezone.utc)
+                self.recent_feed.push(opp_id, stored_at, {**record, 'cached_at': stored_at})
+                changed += 1
+            
+            print(f"✓ Opportunities: {changed} new/changed, {len(keyed) - changed} unchanged")
             
-            return {
-                'opportunity_id': doc_ref.id,
-                **opportunity_data
-            }
         except Exception as e:
-            print(f"❌ Error creating opportunity: {e}")
-            mock_id = f"error_{datetime.now().timestamp()}"
-            return {'opportunity_id': mock_id, **opportunity_data}
+            print(f"⚠️  Could not save opportunities to DB: {e}")
+        
+        return opportunities
+    
+    
+    def get_cached_opportunities(self, limit=20, opportunity_type=None, cursor=None):
+        """
+        Newest stored opportunities, optionally of one type, with cursor pagination
+        
+        Pages come from the in-process recent feed when it can answer them. The
+        datastore query - (type ==, cached_at desc, __name__ desc), see
+        firestore.indexes.json - only runs to prime the feed or for pages older
+        than the feed holds.
+        
+        Args:
+            limit: Page size
+            opportunity_type: Optional type filter (applied before the limit)
+            cursor: next_cursor from the previous page
+        
+        Returns:
+            Dictionary with opportunities, next_cursor (None on the last page) and
+            source ('memory' or 'datastore')
+        """
+        if not self.firebase_enabled:
+            return {'opportunities': [], 'next_cursor': None, 'source': 'datastore'}
+        
+        after = self._decode_feed_cursor(cursor) if cursor else None
+        
+        page = self.recent_feed.page(opportunity_type, limit, after)
+        if page is None and not self.recent_feed.is_fresh(opportunity_type):
+            try:
+                rows = self._query_recent_opportunities(opportunity_type, self.recent_feed.capacity)
+                self.recent_feed.prime(opportunity_type, rows)
+                page = self.recent_feed.page(opportunity_type, limit, after)
+            except Exception as e:
+                print(f"❌ Error priming recent opportunities: {e}")
+        
+        source = 'memory'
+        if page is None:
+            source = 'datastore'
+            try:
+                rows = self._query_recent_opportunities(opportunity_type, limit + 1, after)
+                page = rows[:limit], len(rows) > limit
+            except Exception as e:
+                print(f"❌ Error getting recent opportunities: {e}")
+                page = [], False
+        
+        items, has_more = page
+        opportunities = [{**data, 'opportunity_id': opp_id} for opp_id, _, data in items]
+        next_cursor = None
+        if has_more and items:
+            last_id, last_cached_at, _ = items[-1]
+            next_cursor = self._encode_feed_cursor(last_cached_at, last_id)
+        
+        return {'opportunities': opportunities, 'next_cursor': next_cursor, 'source': source}
+    
+    
+    def _query_recent_opportunities(self, opportunity_type, limit, after=None):
+        """Run the feed query; returns newest-first (opportunity_id, cached_at, data) rows"""
+        query = self.opportunities_collection
+        if opportunity_type:
+            query = query.where(filter=firestore.FieldFilter('type', '==', opportunity_type))
+        query = query.order_by('cached_at', direction=firestore.Query.DESCENDING) \
+            .order_by('__name__', direction=firestore.Query.DESCENDING)
+        if after is not None:
+            query = query.start_after({'cached_at': after[0], '__name__': after[1]})
+        
+        rows = []
+        for doc in query.limit(limit).stream():
+            data = doc.to_dict()
+            rows.append((doc.id, data.get('cached_at'), data))
+        return rows
+    
+    
+    @staticmethod
+    def _encode_feed_cursor(cached_at, opportunity_id):
+        """Opaque pagination cursor for the last item of a page"""
+        raw = json.dumps({'t': cached_at.isoformat(), 'id': opportunity_id})
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+    
+    
+    @staticmethod
+    def _decode_feed_cursor(cursor):
+        """
+        Inverse of _encode_feed_cursor
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            cached_at = datetime.fromisoformat(raw['t'])
+            if cached_at.tzinfo is None:
+                cached_at = cached_at.replace(tzinfo=timezone.utc)
+            return cached_at, raw['id']
+        except Exception:
+            raise ValueError('Invalid cursor')
     
     
     def get_opportunity(self, opportunity_id):
@@ -213,16 +679,21 @@ class FirebaseService:
             print(f"⚠️  Firebase disabled - cannot retrieve opportunity {opportunity_id}")
             return None
         
+        cached = self.opportunity_cache.get(opportunity_id)
+        if cached is not TTLCache.MISSING:
+            return copy.deepcopy(cached)
+        
         try:
             doc_ref = self.opportunities_collection.document(opportunity_id)
             doc = doc_ref.get()
             
             if doc.exists:
-                data = doc.to_dict()
-                data['opportunity_id'] = doc.id
+                data = self._resolve_canonical_opportunity(doc.id, doc.to_dict())
+                self.opportunity_cache.set(opportunity_id, data)
                 print(f"✓ Retrieved opportunity {opportunity_id}")
-                return data
+                return copy.deepcopy(data)
             else:
+                self.opportunity_cache.set_missing(opportunity_id)
                 print(f"⚠️  Opportunity {opportunity_id} not found")
                 return None
                 
@@ -231,12 +702,125 @@ class FirebaseService:
             return None
     
     
+    # Fields canonical_opportunity_id needs, added to projected reads
+    OPPORTUNITY_ALIAS_FIELDS = ['alias_of', 'content_hash', 'url', 'link']
+    
+    def get_opportunities(self, opportunity_ids, fields=None):
+        """
+        Batched get_opportunity: fetch many opportunities, resolving legacy IDs
+        
+        Legacy random-ID documents and 'alias_of' stubs are replaced by their
+        canonical record (see _resolve_canonical_opportunity), which are all
+        fetched with one more batched read.
+        
+        Args:
+            opportunity_ids: Opportunity IDs (duplicates are ignored)
+            fields: Optional list of field paths to return
+        
+        Returns:
+            Dictionary mapping each requested ID that exists to its data, with
+            'opportunity_id' set to the canonical ID
+        """
+        read_fields = list(dict.fromkeys(list(fields) + self.OPPORTUNITY_ALIAS_FIELDS)) if fields else None
+        documents = self.get_many('opportunities', opportunity_ids, fields=read_fields)
+        
+        canonical_ids = {
+            doc_id: self.canonical_opportunity_id(doc_id, data) for doc_id, data in documents.items()
+        }
+        wanted = {canonical_id for canonical_id in canonical_ids.values() if canonical_id}
+        canonical_documents = self.get_many('opportunities', wanted, fields=fields) if wanted else {}
+        
+        resolved = {}
+        for doc_id, data in documents.items():
+            canonical_id = canonical_ids[doc_id]
+            if canonical_id in canonical_documents:
+                resolved[doc_id] = {**canonical_documents[canonical_id], 'opportunity_id': canonical_id}
+            else:
+                resolved[doc_id] = {**project_fields(data, fields), 'opportunity_id': doc_id}
+        return resolved
+    
+    
+    def canonical_opportunity_id(self, doc_id, data):
+        """ID of the canonical record a legacy opportunity document stands for, or None if it is canonical"""
+        canonical_id = data.get('alias_of')
+        if not canonical_id and 'content_hash' not in data and (data.get('url') or data.get('link')):
+            candidate = self.opportunity_key(data.get('url') or data.get('link'))
+            if candidate != doc_id:
+                canonical_id = candidate
+        return canonical_id or None
+    
+    def _resolve_canonical_opportunity(self, doc_id, data):
+        """
+        Map legacy opportunity documents onto their canonical record
+        
+        Legacy searches also stored every result under a random ID. Those
+        documents (or the 'alias_of' stubs left by migrate_datastore.py) resolve
+        to the content-addressed record when it exists.
+        """
+        canonical_id = self.canonical_opportunity_id(doc_id, data)
+        if canonical_id:
+            canonical = self.opportunities_collection.document(canonical_id).get()
+            if canonical.exists:
+                resolved = canonical.to_dict()
+                resolved['opportunity_id'] = canonical_id
+                return resolved
+        
+        data['opportunity_id'] = doc_id
+        return data
+    
+    
     # ========================================================================
     # REASONING RESULTS OPERATIONS
     # ========================================================================
     
-    def create_reasoning_result(self, profile_id, opportunity_id, analysis):
-        """Store reasoning result - ALWAYS returns result even if Firebase fails"""
+    @staticmethod
+    def reasoning_key(profile_id, opportunity_id, profile_version=0):
+        """
+        Deterministic reasoning_results document ID
+        
+        A result is only valid for the profile it was computed from, so the
+        profile version is part of the key: editing a profile moves lookups to
+        a fresh ID instead of returning a stale analysis.
+        """
+        raw = f"{profile_id}:{opportunity_id}:{profile_version or 0}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
+    
+    
+    def get_profile_version(self, profile_id):
+        """
+        Current profile_version of a student profile (0 for legacy or missing profiles)
+        
+        Read straight from the datastore rather than profile_cache: a stale
+        version would serve reasoning computed for an older profile.
+        """
+        if not self.firebase_enabled:
+            return 0
+        
+        try:
+            doc = self.students_collection.document(profile_id).get(field_paths=['profile_version'])
+        except Exception as e:
+            print(f"❌ Error getting profile version {profile_id}: {e}")
+            return 0
+        
+        if not doc.exists:
+            return 0
+        return (doc.to_dict() or {}).get('profile_version', 0)
+    
+    
+    def create_reasoning_result(self, profile_id, opportunity_id, analysis,
+                                profile_version=None, is_fallback=False):
+        """
+        Store reasoning result - ALWAYS returns result even if Firebase fails
+        
+        Args:
+            profile_id: Student profile ID
+            opportunity_id: Opportunity ID
+            analysis: Analysis dictionary
+            profile_version: Version of the profile that was analyzed
+                (looked up when not given)
+            is_fallback: True for placeholder analyses, which are stored but
+                never served from the cache
+        """
         if not self.firebase_enabled:
             print("⚠️  Firebase disabled - returning analysis without saving")
             return {
@@ -245,12 +829,17 @@ class FirebaseService:
             }
         
         try:
-            doc_ref = self.reasoning_collection.document()
+            if profile_version is None:
+                profile_version = self.get_profile_version(profile_id)
+            reasoning_id = self.reasoning_key(profile_id, opportunity_id, profile_version)
+            doc_ref = self.reasoning_collection.document(reasoning_id)
             
             reasoning = {
                 'profile_id': profile_id,
                 'opportunity_id': opportunity_id,
+                'profile_version': profile_version,
                 'analysis': analysis,
+                'is_fallback': is_fallback,
                 'analyzed_at': firestore.SERVER_TIMESTAMP
             }
             
@@ -271,30 +860,73 @@ class FirebaseService:
             }
     
     
-    def get_cached_reasoning(self, profile_id, opportunity_id):
-        """Check if reasoning already exists"""
+    def get_reasoning_result(self, reasoning_id):
+        """
+        Get reasoning result by ID
+        
+        Returns:
+            Reasoning result dictionary or None
+        """
         if not self.firebase_enabled:
             return None
         
         try:
-            query = self.reasoning_collection \
-                .where(filter=firestore.FieldFilter('profile_id', '==', profile_id)) \
-                .where(filter=firestore.FieldFilter('opportunity_id', '==', opportunity_id)) \
-                .order_by('analyzed_at', direction=firestore.Query.DESCENDING) \
-                .limit(1)
-            
-            docs = list(query.stream())
-            
-            if docs:
-                data = docs[0].to_dict()
-                data['reasoning_id'] = docs[0].id
-                return data
+            doc = self.reasoning_collection.document(reasoning_id).get()
+            if not doc.exists:
+                return None
             
-            return None
+            data = doc.to_dict()
+            data['reasoning_id'] = doc.id
+            return data
             
         except Exception as e:
-            print(f"❌ Error getting cached reasoning: {e}")
+            print(f"❌ Error getting reasoning result {reasoning_id}: {e}")
+            return None
+    
+    
+    def get_cached_reasoning(self, profile_id, opportunity_id, profile_version=None):
+        """
+        Check if reasoning already exists for the current profile version
+        
+        Results are keyed by reasoning_key(), so this is a single document read.
+        """
+        if not self.firebase_enabled:
             return None
+        
+        if profile_version is None:
+            profile_version = self.get_profile_version(profile_id)
+        
+        data = self.get_reasoning_result(self.reasoning_key(profile_id, opportunity_id, profile_version))
+        if not data or data.get('is_fallback'):
+            return None
+        return data
+    
+    
+    def get_cached_reasoning_many(self, profile_id, opportunity_ids, profile_version=None):
+        """
+        Look up cached reasoning for several opportunities with one multi-get
+        
+        Returns:
+            Dictionary mapping opportunity_id -> reasoning result (hits only)
+        """
+        if not self.firebase_enabled or not opportunity_ids:
+            return {}
+        
+        if profile_version is None:
+            profile_version = self.get_profile_version(profile_id)
+        
+        keys = {
+            self.reasoning_key(profile_id, opp_id, profile_version): opp_id
+            for opp_id in opportunity_ids
+        }
+        
+        cached = {}
+        for reasoning_id, data in self.get_many('reasoning_results', list(keys)).items():
+            if data.get('is_fallback'):
+                continue
+            data['reasoning_id'] = reasoning_id
+            cached[keys[reasoning_id]] = data
+        return cached
     
     
     # ========================================================================
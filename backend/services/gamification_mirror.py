@@ -0,0 +1,169 @@
+"""
+Gamification Mirror - In-process copy of the gamification collection kept current by snapshot listeners
+"""
+
+import threading
+
+from .storage_backend import project_fields
+
+
+class GamificationMirror:
+    """
+    Every user's points, streak and achievements plus their profile name and college
+
+    Leaderboards, ranks and peer averages need every gamification document.
+    Instead of streaming the collection on each request, two snapshot
+    listeners (gamification and profiles) load both collections once on
+    start() and then receive only the documents that change, so those reads
+    cost nothing per request.
+
+    Listener updates arrive on a background thread shortly after each write,
+    so reads are eventually consistent. Until both initial snapshots have
+    loaded, or if a listener stops, `ready` is False and callers fall back
+    to querying the datastore.
+    """
+
+    # Only the fields rankings and peer statistics use are kept
+    GAMIFICATION_FIELDS = ['user_id', 'total_points', 'level', 'login_streak', 'achievements',
+                           'actions', 'is_synthetic']
+    PROFILE_FIELDS = ['personal_info.name', 'education.institution']
+
+    def __init__(self, firebase_service):
+        """
+        Args:
+            firebase_service: FirebaseService whose datastore should be mirrored
+        """
+        self.firebase = firebase_service
+
+        self._users = {}     # user_id -> projected gamification data
+        self._profiles = {}  # user_id -> projected profile data
+        self._rows = None    # ID-sorted rows, rebuilt on the first read after a change
+        self._ranked = None  # points-sorted rows, likewise
+        self._watches = {}
+        self._loaded = set()  # collections whose initial snapshot has been applied
+        self._lock = threading.Lock()
+
+        self.changes_applied = 0
+
+    # ========================================================================
+    # LIFECYCLE
+    # ========================================================================
+
+    def start(self):
+        """Start listening to the gamification and profiles collections"""
+        if not self.firebase.firebase_enabled or self._watches:
+            return
+
+        try:
+            for collection, fields in (('gamification', self.GAMIFICATION_FIELDS),
+                                       ('profiles', self.PROFILE_FIELDS)):
+                self._watches[collection] = self.firebase.db.collection(collection).on_snapshot(
+                    self._listener(collection, fields)
+                )
+            print("✓ Gamification mirror listening for changes")
+        except Exception as e:
+            print(f"⚠️  Gamification mirror unavailable, leaderboards will query the datastore: {e}")
+            self.stop()
+
+    def stop(self):
+        """Stop listening and drop the mirrored data"""
+        watches, self._watches = self._watches, {}
+        for watch in watches.values():
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                print(f"⚠️  Error stopping gamification listener: {e}")
+
+        with self._lock:
+            self._users = {}
+            self._profiles = {}
+            self._rows = None
+            self._ranked = None
+            self._loaded = set()
+
+    @property
+    def ready(self):
+        """True once both collections have loaded and both listeners are still streaming"""
+        if len(self._loaded) < 2:
+            return False
+        return all(watch.is_active for watch in self._watches.values())
+
+    # ========================================================================
+    # READS
+    # ========================================================================
+
+    def ranked(self):
+        """
+        Users ordered like a total_points DESCENDING query
+
+        Returns:
+            List of (user_id, gamification data); users without total_points are
+            left out, as the query would
+        """
+        with self._lock:
+            if self._ranked is None:
+                self._ranked = sorted(
+                    ((user_id, data) for user_id, data in self._users.items() if 'total_points' in data),
+                    key=lambda row: (row[1]['total_points'], row[0]),
+                    reverse=True
+                )
+            return self._ranked
+
+    def rows(self):
+        """Every user as (user_id, gamification data) in document ID order, like streaming the collection"""
+        with self._lock:
+            if self._rows is None:
+                self._rows = sorted(self._users.items())
+            return self._rows
+
+    def profiles(self, user_ids=None):
+        """
+        Projected profiles ({'personal_info': {'name'}, 'education': {'institution'}})
+
+        Args:
+            user_ids: Optional IDs to return; all profiles if omitted
+
+        Returns:
+            Dictionary mapping user ID to profile data, for profiles that exist
+        """
+        with self._lock:
+            if user_ids is None:
+                return dict(self._profiles)
+            return {user_id: self._profiles[user_id] for user_id in user_ids if user_id in self._profiles}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': 'gamification_mirror',
+                'ready': self.ready,
+                'users': len(self._users),
+                'profiles': len(self._profiles),
+                'changes_applied': self.changes_applied
+            }
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    def _listener(self, collection, fields):
+        """Build the on_snapshot callback that applies one collection's changes"""
+        def on_snapshot(documents, changes, read_time):
+            with self._lock:
+                # Stored dictionaries are replaced, never mutated, so readers can keep references
+                target = self._users if collection == 'gamification' else self._profiles
+                for change in changes:
+                    snapshot = change.document
+                    if change.type.name == 'REMOVED':
+                        target.pop(snapshot.id, None)
+                    else:
+                        target[snapshot.id] = project_fields(snapshot.to_dict() or {}, fields)
+
+                if changes and collection == 'gamification':
+                    self._rows = None
+                    self._ranked = None
+                self.changes_applied += len(changes)
+
+                if collection not in self._loaded:
+                    self._loaded.add(collection)
+                    print(f"✓ Gamification mirror loaded {len(target)} {collection} documents")
+        return on_snapshot
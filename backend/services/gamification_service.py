@@ -260,22 +260,23 @@ class GamificationService:
     def get_leaderboard(self, limit=50):
         """Get top users by points"""
         try:
-            users = self.db.collection('gamification')\
-                .order_by('total_points', direction='DESCENDING')\
-                .limit(limit)\
-                .stream()
+            mirror = self.firebase.gamification_mirror
+            if mirror.ready:
+                rows = [data for _, data in mirror.ranked()[:limit]]
+            else:
+                users = self.db.collection('gamification')\
+                    .order_by('total_points', direction='DESCENDING')\
+                    .limit(limit)\
+                    .stream()
+                rows = [doc.to_dict() for doc in users]
+            
+            # Fetch all display names in one batched read
+            names = self._get_display_names([data['user_id'] for data in rows])
             
             leaderboard = []
-            for rank, doc in enumerate(users, 1):
-                data = doc.to_dict()
+            for rank, data in enumerate(rows, 1):
                 user_id = data['user_id']
-                
-                # Get user profile name
-                try:
-                    profile = self.db.collection('profiles').document(user_id).get()
-                    name = profile.to_dict().get('personal_info', {}).get('name', 'Anonymous User')
-                except:
-                    name = 'Anonymous User'
+                name = names.get(user_id, 'Anonymous User')
                 
                 level_info = self._get_level_from_points(data['total_points'])
                 
@@ -301,63 +302,115 @@ class GamificationService:
         """Get top N users + current user if not in top N"""
         try:
             # Get all users sorted by points to calculate accurate ranks
-            all_users = self.db.collection('gamification')\
-                .order_by('total_points', direction='DESCENDING')\
-                .stream()
+            mirror = self.firebase.gamification_mirror
+            if mirror.ready:
+                all_users = (data for _, data in mirror.ranked())
+            else:
+                all_users = (
+                    doc.to_dict() for doc in self.db.collection('gamification')
+                    .order_by('total_points', direction='DESCENDING')
+                    .stream()
+                )
             
-            leaderboard = []
-            user_entry = None
-            user_rank = None
+            result = self._rank_leaderboard(all_users, top_limit, user_id)
             
-            for rank, doc in enumerate(all_users, 1):
-                data = doc.to_dict()
-                current_user_id = data['user_id']
-                
-                # Get user profile name
-                try:
-                    profile = self.db.collection('profiles').document(current_user_id).get()
-                    name = profile.to_dict().get('personal_info', {}).get('name', 'Anonymous User')
-                except:
-                    name = 'Anonymous User'
-                
-                level_info = self._get_level_from_points(data['total_points'])
-                
-                entry = {
-                    'rank': rank,
-                    'user_id': current_user_id,
-                    'name': name,
-                    'points': data['total_points'],
-                    'level': level_info['level'],
-                    'level_name': level_info['name'],
-                    'level_icon': level_info['icon'],
-                    'achievements_count': len(data.get('achievements', [])),
-                    'login_streak': data.get('login_streak', 0)
-                }
-                
-                # Add to top N
-                if rank <= top_limit:
-                    leaderboard.append(entry)
-                
-                # Track current user's position
-                if user_id and current_user_id == user_id:
-                    user_entry = entry
-                    user_rank = rank
+            # Only the displayed entries need names - fetch them in one batched read
+            names = self._get_display_names([entry['user_id'] for entry in result['leaderboard']])
+            for entry in result['leaderboard']:
+                entry['name'] = names.get(entry['user_id'], 'Anonymous User')
             
-            # If user is not in top N, add them at the end
-            if user_id and user_rank and user_rank > top_limit and user_entry:
-                leaderboard.append(user_entry)
+            return result
             
-            return {
-                'leaderboard': leaderboard,
-                'user_rank': user_rank,
-                'total_users': rank if 'rank' in locals() else 0,
-                'show_separator': user_rank and user_rank > top_limit
-            }
+        except Exception as e:
+            print(f"Error getting leaderboard with user: {e}")
+            return {'leaderboard': [], 'user_rank': None, 'total_users': 0, 'show_separator': False}
+    
+    async def get_leaderboard_with_user_async(self, top_limit=10, user_id=None):
+        """Async get_leaderboard_with_user"""
+        if self.firebase.gamification_mirror.ready:
+            # Served from memory - nothing to await
+            return self.get_leaderboard_with_user(top_limit, user_id)
+        
+        aio = self.firebase.async_service
+        try:
+            rows = await aio.query('gamification', order_by='total_points', descending=True)
+            
+            result = self._rank_leaderboard((data for _, data in rows), top_limit, user_id)
+            
+            profiles = await aio.get_many(
+                'profiles', [entry['user_id'] for entry in result['leaderboard']], fields=['personal_info.name']
+            )
+            for entry in result['leaderboard']:
+                profile = profiles.get(entry['user_id'])
+                entry['name'] = profile.get('personal_info', {}).get('name', 'Anonymous User') if profile else 'Anonymous User'
+            
+            return result
             
         except Exception as e:
             print(f"Error getting leaderboard with user: {e}")
             return {'leaderboard': [], 'user_rank': None, 'total_users': 0, 'show_separator': False}
     
+    def _rank_leaderboard(self, rows, top_limit, user_id):
+        """
+        Rank points-sorted gamification rows into the top N (+ the current user)
+        
+        Entries are returned without names; callers fill them in.
+        """
+        leaderboard = []
+        user_entry = None
+        user_rank = None
+        total_users = 0
+        
+        for rank, data in enumerate(rows, 1):
+            total_users = rank
+            current_user_id = data['user_id']
+            
+            level_info = self._get_level_from_points(data['total_points'])
+            
+            entry = {
+                'rank': rank,
+                'user_id': current_user_id,
+                'name': 'Anonymous User',
+                'points': data['total_points'],
+                'level': level_info['level'],
+                'level_name': level_info['name'],
+                'level_icon': level_info['icon'],
+                'achievements_count': len(data.get('achievements', [])),
+                'login_streak': data.get('login_streak', 0)
+            }
+            
+            # Add to top N
+            if rank <= top_limit:
+                leaderboard.append(entry)
+            
+            # Track current user's position
+            if user_id and current_user_id == user_id:
+                user_entry = entry
+                user_rank = rank
+        
+        # If user is not in top N, add them at the end
+        if user_id and user_rank and user_rank > top_limit and user_entry:
+            leaderboard.append(user_entry)
+        
+        return {
+            'leaderboard': leaderboard,
+            'user_rank': user_rank,
+            'total_users': total_users,
+            'show_separator': user_rank and user_rank > top_limit
+        }
+    
+    def _get_display_names(self, user_ids):
+        """Map user IDs to profile display names (from the mirror, else one batched read)"""
+        mirror = self.firebase.gamification_mirror
+        if mirror.ready:
+            profiles = mirror.profiles(user_ids)
+        else:
+            profiles = self.firebase.get_many('profiles', user_ids, fields=['personal_info.name'])
+        return {
+            user_id: profile.get('personal_info', {}).get('name', 'Anonymous User')
+            for user_id, profile in profiles.items()
+        }
+    
     def _calculate_gamification_status(self, data, user_id):
         """Calculate current level, progress, achievements, and tasks"""
         points = data['total_points']
@@ -0,0 +1,202 @@
+"""
+Keyword Matcher - Aho-Corasick automaton that finds every keyword of every category in one pass
+"""
+
+from collections import deque
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordHits:
+    """Keywords found in one text, grouped by category"""
+
+    __slots__ = ('matches', 'by_category', '_owners')
+
+    def __init__(self, matches, owners):
+        """
+        Args:
+            matches: (start, end, keyword) for every occurrence, in scan order
+            owners: Dictionary mapping keyword to the categories it belongs to
+        """
+        self.matches = matches
+        self._owners = owners
+
+        # category -> [(start, end, keyword)]
+        by_category = {}
+        for match in matches:
+            for category in owners[match[2]]:
+                if category in by_category:
+                    by_category[category].append(match)
+                else:
+                    by_category[category] = [match]
+        self.by_category = by_category
+
+    def __contains__(self, category):
+        return category in self.by_category
+
+    def keywords(self, category, start=0, end=None):
+        """
+        Distinct keywords of a category that occur in the text
+
+        Args:
+            category: Category name
+            start, end: Only count occurrences that lie entirely inside text[start:end]
+        """
+        matches = self.by_category.get(category, ())
+        if start == 0 and end is None:
+            return {keyword for _, _, keyword in matches}
+        end = float('inf') if end is None else end
+        return {keyword for s, e, keyword in matches if s >= start and e <= end}
+
+    def count(self, category, start=0, end=None):
+        """Number of distinct keywords of a category inside text[start:end]"""
+        if category not in self.by_category:
+            return 0
+        return len(self.keywords(category, start, end))
+
+    def positions(self, category, start=0, end=None):
+        """Offsets (relative to start) of a category's occurrences inside text[start:end], sorted"""
+        end = float('inf') if end is None else end
+        return sorted(s - start for s, e, _ in self.by_category.get(category, ()) if s >= start and e <= end)
+
+    @property
+    def categories(self):
+        return set(self.by_category)
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive substring matching for many keyword lists at once
+
+    All keywords are compiled into one Aho-Corasick automaton, so a scan
+    reads each character of the text once however many keywords and
+    categories there are, and reports every occurrence of every keyword,
+    overlapping ones included. A keyword matches wherever it occurs as a
+    substring, so results agree with `keyword in text.lower()`.
+
+    The automaton runs in C when pyahocorasick is installed (see
+    requirements.txt); otherwise a pure-Python transition table is used.
+    """
+
+    def __init__(self, categories):
+        """
+        Args:
+            categories: Dictionary mapping category name to a list of keywords;
+                a keyword may belong to several categories
+        """
+        self.categories = {category: list(keywords) for category, keywords in categories.items()}
+
+        # keyword -> categories it belongs to
+        owners = {}
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                owners.setdefault(keyword.lower(), []).append(category)
+        self._owners = {keyword: tuple(categories) for keyword, categories in owners.items()}
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self._owners:
+                self._automaton.add_word(keyword, (keyword, len(keyword)))
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._build_table()
+
+    @property
+    def engine(self):
+        return 'pyahocorasick' if self._automaton is not None else 'python'
+
+    def scan(self, text):
+        """
+        Find every keyword occurrence in text
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            KeywordHits
+        """
+        if not text:
+            return KeywordHits([], self._owners)
+
+        if self._automaton is not None:
+            lowered = text.lower()
+            if len(lowered) == len(text):
+                return KeywordHits(
+                    [(end - length + 1, end + 1, keyword)
+                     for end, (keyword, length) in self._automaton.iter(lowered)],
+                    self._owners
+                )
+
+        # Pure-Python automaton; matches the original text directly, so offsets stay
+        # exact even where lower() changes the length (e.g. "İ")
+        if self._transitions is None:
+            self._build_table()
+        transitions = self._transitions
+        outputs = self._outputs
+        matches = []
+        state = 0
+        for end, ch in enumerate(text):
+            state = transitions[state].get(ch, 0)
+            output = outputs[state]
+            if output:
+                for keyword, length in output:
+                    matches.append((end - length + 1, end + 1, keyword))
+        return KeywordHits(matches, self._owners)
+
+    def scan_many(self, texts):
+        """Scan a batch of texts, returning a KeywordHits per text"""
+        return [self.scan(text) for text in texts]
+
+    # ------------------------------------------------------------------------
+
+    _transitions = None
+    _outputs = None
+
+    def _build_table(self):
+        """Build the automaton as a flat state -> {character: next state} table"""
+        goto = [{}]
+        outputs = [[]]
+        for keyword in self._owners:
+            state = 0
+            for ch in keyword:
+                if ch not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            outputs[state].append((keyword, len(keyword)))
+
+        # Failure links, breadth first so a state's fallback is complete before it is used
+        fail = [0] * len(goto)
+        order = []
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for ch, child in goto[state].items():
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(ch, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+                queue.append(child)
+
+        # Fold the failure links into direct transitions (a missing key means the
+        # root). Upper-case keys are added so scans need no lower() copy.
+        transitions = [dict(goto[0])] + [None] * (len(goto) - 1)
+        for state in order:
+            table = dict(transitions[fail[state]])
+            table.update(goto[state])
+            transitions[state] = table
+        for table in transitions:
+            for ch, target in list(table.items()):
+                upper = ch.upper()
+                if len(upper) == 1 and upper != ch:
+                    table.setdefault(upper, target)
+
+        self._transitions = transitions
+        self._outputs = [tuple(output) or None for output in outputs]
@@ -0,0 +1,271 @@
+"""
+Opportunity Index - In-process BM25 inverted index over stored opportunities, kept current by a snapshot listener
+"""
+
+import math
+import re
+import threading
+from datetime import date, timedelta
+
+from .date_extraction import parse_date
+from .storage_backend import project_fields
+
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it', 'of',
+    'on', 'or', 'the', 'to', 'with', 'your', 'you', 'our', 'this', 'that', 'all', 'now'
+])
+
+
+def tokenize(text):
+    """
+    Lowercased word tokens without stopwords; a trailing plural "s" is dropped
+
+    "Hackathons for Students 2026" -> ['hackathon', 'student', '2026']
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall((text or '').lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class OpportunityIndex:
+    """
+    BM25 full-text search over every stored opportunity
+
+    A snapshot listener on the opportunities collection loads the corpus once
+    on start() and then applies only changed documents, re-indexing just
+    those. Searches never touch the datastore. Until the initial snapshot has
+    loaded, or if the listener stops, `ready` is False and callers should
+    search Google instead.
+
+    Fields are weighted by repeating their terms (BM25 over one weighted
+    document), so a query word in the title counts three times as much as
+    the same word in the snippet.
+
+    'alias_of' stubs are not indexed. Legacy random-ID copies of a search
+    result are, but results are deduplicated by canonical ID, and a legacy
+    copy is returned as its canonical record when that is indexed too.
+    """
+
+    FIELD_WEIGHTS = {'title': 3.0, 'organizer': 2.0, 'type': 2.0, 'snippet': 1.0}
+
+    # Fields kept per document, returned as the search result
+    STORED_FIELDS = ['title', 'link', 'url', 'description', 'snippet', 'source', 'type', 'organizer',
+                     'eligibility_text', 'deadline', 'apply_by', 'relevance_score', 'discovered_date',
+                     'cached_at']
+
+    # BM25 parameters
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, firebase_service):
+        """
+        Args:
+            firebase_service: FirebaseService whose opportunities should be indexed
+        """
+        self.firebase = firebase_service
+
+        self._documents = {}    # opportunity ID -> stored fields
+        self._deadlines = {}    # opportunity ID -> parsed deadline date (or None)
+        self._doc_terms = {}    # opportunity ID -> {term: weighted frequency}
+        self._lengths = {}      # opportunity ID -> weighted length
+        self._canonical = {}    # opportunity ID -> canonical opportunity ID (itself unless a legacy copy)
+        self._postings = {}     # term -> {opportunity ID: weighted frequency}
+        self._total_length = 0.0
+        self._watch = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+        self.changes_applied = 0
+        self.searches = 0
+
+    # ========================================================================
+    # LIFECYCLE
+    # ========================================================================
+
+    def start(self):
+        """Start listening to the opportunities collection"""
+        if not self.firebase.firebase_enabled or self._watch is not None:
+            return
+
+        try:
+            self._watch = self.firebase.db.collection('opportunities').on_snapshot(self._on_snapshot)
+            print("✓ Opportunity index listening for changes")
+        except Exception as e:
+            print(f"⚠️  Opportunity index unavailable, searches will go to Google: {e}")
+            self.stop()
+
+    def stop(self):
+        """Stop listening and drop the index"""
+        watch, self._watch = self._watch, None
+        if watch is not None:
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                print(f"⚠️  Error stopping opportunity index listener: {e}")
+
+        with self._lock:
+            self._documents = {}
+            self._deadlines = {}
+            self._doc_terms = {}
+            self._lengths = {}
+            self._canonical = {}
+            self._postings = {}
+            self._total_length = 0.0
+            self._loaded = False
+
+    @property
+    def ready(self):
+        """True once the corpus has loaded and the listener is still streaming"""
+        return self._loaded and self._watch is not None and self._watch.is_active
+
+    # ========================================================================
+    # SEARCH
+    # ========================================================================
+
+    def search(self, query, opportunity_type=None, limit=20, min_coverage=0.0):
+        """
+        Rank stored opportunities against a query with BM25
+
+        Args:
+            query: Free-text query
+            opportunity_type: Only return opportunities of this type
+            limit: Maximum results
+            min_coverage: Fraction of the query's distinct terms a result must contain
+
+        Returns:
+            List of opportunity dictionaries (with 'id' and 'opportunity_id'), best
+            first and one per canonical ID; opportunities whose deadline has passed
+            are left out
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        opportunity_type = (opportunity_type or '').lower() or None
+        cutoff = date.today() - timedelta(days=1)
+        needed = math.ceil(min_coverage * len(terms) - 1e-9)
+
+        with self._lock:
+            self.searches += 1
+            count = len(self._documents)
+            if not count:
+                return []
+            average_length = self._total_length / count
+
+            scores = {}
+            matched = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for opp_id, frequency in postings.items():
+                    norm = self.K1 * (1 - self.B + self.B * self._lengths[opp_id] / average_length)
+                    scores[opp_id] = scores.get(opp_id, 0.0) + idf * frequency * (self.K1 + 1) / (frequency + norm)
+                    matched[opp_id] = matched.get(opp_id, 0) + 1
+
+            ranked = []
+            for opp_id, score in scores.items():
+                if matched[opp_id] < needed:
+                    continue
+                document = self._documents[opp_id]
+                if opportunity_type and (document.get('type') or '').lower() != opportunity_type:
+                    continue
+                deadline = self._deadlines[opp_id]
+                if deadline is not None and deadline < cutoff:
+                    continue
+                ranked.append((score, opp_id))
+
+            ranked.sort(key=lambda row: (-row[0], row[1]))
+
+            results = []
+            seen = set()
+            for _, opp_id in ranked:
+                canonical_id = self._canonical[opp_id]
+                if canonical_id in seen:
+                    continue
+                seen.add(canonical_id)
+                result_id = canonical_id if canonical_id in self._documents else opp_id
+                results.append({**self._documents[result_id], 'id': result_id, 'opportunity_id': result_id})
+                if len(results) == limit:
+                    break
+            return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': 'opportunity_index',
+                'ready': self.ready,
+                'documents': len(self._documents),
+                'terms': len(self._postings),
+                'changes_applied': self.changes_applied,
+                'searches': self.searches
+            }
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    def _on_snapshot(self, documents, changes, read_time):
+        """Apply one batch of listener changes"""
+        with self._lock:
+            for change in changes:
+                snapshot = change.document
+                self._remove(snapshot.id)
+                if change.type.name != 'REMOVED':
+                    self._add(snapshot.id, snapshot.to_dict() or {})
+            self.changes_applied += len(changes)
+
+            if not self._loaded:
+                self._loaded = True
+                print(f"✓ Opportunity index loaded {len(self._documents)} opportunities "
+                      f"({len(self._postings)} terms)")
+
+    def _add(self, opp_id, data):
+        """Index one document (caller holds the lock)"""
+        if data.get('alias_of'):
+            return
+
+        frequencies = {}
+        length = 0.0
+        for field, weight in self.FIELD_WEIGHTS.items():
+            value = data.get(field)
+            tokens = tokenize(value if isinstance(value, str) else '')
+            length += weight * len(tokens)
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0.0) + weight
+
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[opp_id] = frequency
+
+        self._documents[opp_id] = project_fields(data, self.STORED_FIELDS)
+        self._deadlines[opp_id] = parse_date(data.get('deadline'))
+        self._doc_terms[opp_id] = frequencies
+        self._lengths[opp_id] = length
+        self._canonical[opp_id] = self.firebase.canonical_opportunity_id(opp_id, data) or opp_id
+        self._total_length += length
+
+    def _remove(self, opp_id):
+        """Drop one document from the index (caller holds the lock)"""
+        frequencies = self._doc_terms.pop(opp_id, None)
+        if frequencies is None:
+            return
+        for term in frequencies:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(opp_id, None)
+                if not postings:
+                    del self._postings[term]
+
+        self._total_length -= self._lengths.pop(opp_id)
+        self._documents.pop(opp_id, None)
+        self._deadlines.pop(opp_id, None)
+        self._canonical.pop(opp_id, None)
@@ -3,12 +3,112 @@ Opportunity Service - Handles opportunity discovery using Google Programmable Se
 """
 
 import os
+import threading
+import time
 import requests
-from datetime import datetime, timedelta
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 import re
+from requests.adapters import HTTPAdapter
+
+from .api_key_pool import ApiKeyPool
+from .date_extraction import scan_dates
+from .keyword_matcher import KeywordMatcher
+from .profile_ranker import ProfileRanker
+from .result_sets import ResultSets, matches_filters
+from .search_cache import create_search_cache
+from .search_warmer import SearchWarmer
+from .single_flight import SingleFlight
+
+
+# ============================================================================
+# KEYWORD DICTIONARIES
+# ============================================================================
+
+# Profile keywords -> suggested searches, checked in order
+BRANCH_SUGGESTIONS = [
+    # === COMPUTER SCIENCE & IT ===
+    ('branch_cs', ['computer', 'software', 'it', 'information technology'],
+     ['Software development internship 2026', 'Tech hackathon 2026']),
+    # === AI/ML/DATA SCIENCE ===
+    ('branch_ai', ['machine learning', 'ai', 'artificial intelligence', 'data science', 'deep learning'],
+     ['AI hackathon 2026', 'Data Science competition 2026']),
+    # === MECHANICAL ENGINEERING ===
+    ('branch_mech', ['mechanical', 'automobile', 'automotive', 'manufacturing', 'cad', 'solidworks', 'catia'],
+     ['Mechanical engineering internship 2026', 'Product design competition', 'Automotive hackathon']),
+    # === ELECTRICAL/ELECTRONICS ===
+    ('branch_eee', ['electrical', 'electronics', 'ece', 'eee', 'circuit', 'vlsi', 'embedded', 'iot'],
+     ['Electronics project competition 2026', 'IoT hackathon 2026', 'Hardware engineering internship']),
+    # === CIVIL ENGINEERING ===
+    ('branch_civil', ['civil', 'construction', 'structural', 'architecture'],
+     ['Civil engineering internship 2026', 'Infrastructure design competition', 'Smart city hackathon']),
+    # === CHEMICAL/BIOTECHNOLOGY ===
+    ('branch_chem', ['chemical', 'biotech', 'biotechnology', 'pharmacy', 'pharmaceutical'],
+     ['Biotech innovation challenge 2026', 'Chemical engineering internship', 'Healthcare hackathon']),
+    # === BUSINESS/MANAGEMENT ===
+    ('branch_mgmt', ['management', 'mba', 'business', 'finance', 'marketing'],
+     ['Business case competition 2026', 'Startup challenge', 'Management internship 2026']),
+    # === DESIGN/CREATIVE ===
+    ('branch_design', ['design', 'ui', 'ux', 'graphic', 'creative'],
+     ['Design competition 2026', 'UI/UX hackathon']),
+]
+
+# Opportunity type keywords, checked in order (first type with a hit wins)
+TYPE_KEYWORDS = {
+    'hackathon': ['hackathon', 'hack'],
+    'internship': ['internship', 'intern', 'summer training'],
+    'fellowship': ['fellowship', 'scholar', 'grant'],
+    'scholarship': ['scholarship', 'financial aid'],
+    'competition': ['competition', 'contest', 'challenge'],
+    'program': ['program', 'workshop', 'bootcamp']
+}
+
+# Relevance scoring: (category, keywords, {field: points}, points per distinct keyword or once)
+RELEVANCE_WEIGHTS = [
+    # High-value keywords boost score
+    ('high_value', ['apply', 'deadline', 'eligibility', 'register', 'prize', 'stipend', '2026'],
+     {'title': 5, 'snippet': 3}, True),
+    # Trusted domains get boost
+    ('trusted_domain', ['devpost.com', 'devfolio.co', 'unstop.com', 'internshala.com',
+                        'scholars4dev.com', 'opportunitydesk.org', 'linkedin.com'],
+     {'link': 15}, False),
+    # Penalty for irrelevant indicators
+    ('spam', ['login', 'signin', 'profile', 'settings', 'terms', 'privacy'],
+     {'link': -20}, True),
+]
+
+ELIGIBILITY_KEYWORDS = [
+    'eligible', 'eligibility', 'open to', 'for students',
+    'requirements', 'must be', 'should be', 'criteria'
+]
+
+# Suggested to every student after the branch-specific ones
+GENERAL_SUGGESTIONS = [
+    'Student hackathon 2026',
+    'College internship program 2026',
+    'Student fellowship 2026',
+    'Innovation challenge',
+    'Student startup competition'
+]
+
+# One automaton over the search result dictionaries: a single scan of a result
+# finds the hits for relevance, type and eligibility together
+RESULT_KEYWORDS = KeywordMatcher({
+    **{f"type_{opp_type}": keywords for opp_type, keywords in TYPE_KEYWORDS.items()},
+    **{category: keywords for category, keywords, *_ in RELEVANCE_WEIGHTS},
+    'eligibility': ELIGIBILITY_KEYWORDS
+})
+
+# Profiles are matched separately; short branch keywords such as "it" and "ai"
+# would otherwise match all over every snippet
+PROFILE_KEYWORDS = KeywordMatcher({category: keywords for category, keywords, _ in BRANCH_SUGGESTIONS})
 
 
 class OpportunityService:
+    # Result pages fetched per search (start indexes; 10 results each)
+    SEARCH_PAGES = (1, 11)
+    
     def __init__(self, firebase_service):
         """
         Initialize Opportunity Service
@@ -27,7 +127,14 @@ class OpportunityService:
                 self.search_api_keys.append(key_value)
         
         self.search_engine_id = os.getenv('GOOGLE_SEARCH_ENGINE_ID')
-        self.current_key_index = 0  # Track which key we're using
+        # Each request goes to the key with the most daily quota left; rate-limited keys cool down
+        self.search_keys = ApiKeyPool(
+            self.search_api_keys,
+            daily_quota=int(os.getenv('GOOGLE_SEARCH_DAILY_QUOTA', '100')),
+            cooldown=float(os.getenv('GOOGLE_SEARCH_KEY_COOLDOWN', '60')),
+            name='google_search_keys'
+        )
+        self._counter_lock = threading.Lock()  # Pages are fetched concurrently
         
         if not self.search_api_keys or not self.search_engine_id:
             print("⚠️  Warning: Google Search API credentials not configured")
@@ -35,15 +142,65 @@ class OpportunityService:
             print(f"✓ Loaded {len(self.search_api_keys)} Google Search API key(s) for load balancing")
         
         self.search_url = "https://www.googleapis.com/customsearch/v1"
-    
-    def _get_next_api_key(self):
-        """Get next API key in rotation"""
-        if not self.search_api_keys:
-            return None
-        key = self.search_api_keys[self.current_key_index]
-        self.current_key_index = (self.current_key_index + 1) % len(self.search_api_keys)
-        return key
-    
+        
+        # Result pages of a search are fetched concurrently. The pool is shared by every request
+        # in the process, so it is sized for several searches at once, not for one search's pages.
+        search_workers = max(int(os.getenv('SEARCH_POOL_WORKERS', '8')), len(self.SEARCH_PAGES))
+        self.search_pool = ThreadPoolExecutor(max_workers=search_workers, thread_name_prefix='google-search')
+        
+        # One keep-alive session for every search, so TLS connections are reused;
+        # one pooled connection per search thread
+        self.http = requests.Session()
+        self.http.mount('https://', HTTPAdapter(pool_maxsize=search_workers))
+        
+        # Recent search results by normalized (query, type) - repeat searches cost no API quota.
+        # 'sqlite' shares one cache between all worker processes on the host.
+        self.search_cache = create_search_cache(
+            os.getenv('SEARCH_CACHE_BACKEND', 'memory'),
+            path=os.getenv('SEARCH_CACHE_PATH', './search_cache.sqlite3'),
+            max_entries=int(os.getenv('SEARCH_CACHE_SIZE', '500')),
+            ttl=float(os.getenv('SEARCH_CACHE_TTL', '3600')),
+            max_stale=float(os.getenv('SEARCH_CACHE_MAX_STALE', '86400'))
+        )
+        # Stale cache entries are re-searched here while the stale results are served
+        self.refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='search-refresh')
+        # Each search's ranked results are kept under a search_id for RESULT_SET_TTL seconds, so
+        # later pages are sliced from them (same backend as the search cache, so any worker can serve them)
+        self.result_sets = ResultSets(create_search_cache(
+            os.getenv('SEARCH_CACHE_BACKEND', 'memory'),
+            path=os.getenv('SEARCH_CACHE_PATH', './search_cache.sqlite3'),
+            table='result_sets',
+            name='result_sets',
+            max_entries=int(os.getenv('RESULT_SET_SIZE', '1000')),
+            ttl=float(os.getenv('RESULT_SET_TTL', '900')),
+            max_stale=0
+        ))
+        # Searches sent with a profile are re-ranked by TF-IDF similarity to it, blended with relevance_score
+        self.profile_ranker = ProfileRanker(weight=float(os.getenv('PROFILE_RANK_WEIGHT', '0.4')))
+        # Streamed searches store their results here after the response has been sent
+        self.persist_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='search-persist')
+        # Identical searches running at the same time share one Google fetch, parse and store
+        self.search_flights = SingleFlight(name='search_flights')
+        # Searches are answered from the local opportunity index when it has at least
+        # LOCAL_SEARCH_MIN_RESULTS results containing LOCAL_SEARCH_MIN_COVERAGE of the query's words
+        self.local_search_min_results = int(os.getenv('LOCAL_SEARCH_MIN_RESULTS', '10'))
+        self.local_search_min_coverage = float(os.getenv('LOCAL_SEARCH_MIN_COVERAGE', '0.6'))
+        self.local_search_limit = int(os.getenv('LOCAL_SEARCH_LIMIT', '20'))
+        self.local_searches = 0
+        self.google_searches = 0
+        # Google Custom Search requests sent (one per result page)
+        self.search_requests = 0
+        
+        # Popular and suggested searches are re-run in the background within a daily
+        # request budget, so first clicks are served from the search cache
+        self.search_warmer = SearchWarmer(
+            self,
+            general_templates=GENERAL_SUGGESTIONS,
+            branch_templates=[query for _, _, queries in BRANCH_SUGGESTIONS for query in queries],
+            interval=float(os.getenv('SEARCH_WARM_INTERVAL', '1800')),
+            top_n=int(os.getenv('SEARCH_WARM_TOP_N', '20')),
+            daily_budget=int(os.getenv('SEARCH_WARM_DAILY_BUDGET', '40'))
+        )
     
     def generate_personalized_suggestions(self, profile_data):
         """
@@ -66,72 +223,17 @@ class OpportunityService:
         degree = education.get('degree', '').lower()
         
         # Join all skills for easier matching
-        all_skills = ' '.join(tech_skills).lower() if tech_skills else ''
-        all_interests = ' '.join(interests).lower() if interests else ''
-        combined_text = f"{major} {degree} {all_skills} {all_interests}"
-        
-        # === COMPUTER SCIENCE & IT ===
-        cs_keywords = ['computer', 'software', 'it', 'information technology']
-        if any(kw in combined_text for kw in cs_keywords):
-            suggestions.append('Software development internship 2026')
-            suggestions.append('Tech hackathon 2026')
-        
-        # === AI/ML/DATA SCIENCE ===
-        ai_keywords = ['machine learning', 'ai', 'artificial intelligence', 'data science', 'deep learning']
-        if any(kw in combined_text for kw in ai_keywords):
-            suggestions.append('AI hackathon 2026')
-            suggestions.append('Data Science competition 2026')
-        
-        # === MECHANICAL ENGINEERING ===
-        mech_keywords = ['mechanical', 'automobile', 'automotive', 'manufacturing', 'cad', 'solidworks', 'catia']
-        if any(kw in combined_text for kw in mech_keywords):
-            suggestions.append('Mechanical engineering internship 2026')
-            suggestions.append('Product design competition')
-            suggestions.append('Automotive hackathon')
-        
-        # === ELECTRICAL/ELECTRONICS ===
-        eee_keywords = ['electrical', 'electronics', 'ece', 'eee', 'circuit', 'vlsi', 'embedded', 'iot']
-        if any(kw in combined_text for kw in eee_keywords):
-            suggestions.append('Electronics project competition 2026')
-            suggestions.append('IoT hackathon 2026')
-            suggestions.append('Hardware engineering internship')
-        
-        # === CIVIL ENGINEERING ===
-        civil_keywords = ['civil', 'construction', 'structural', 'architecture']
-        if any(kw in combined_text for kw in civil_keywords):
-            suggestions.append('Civil engineering internship 2026')
-            suggestions.append('Infrastructure design competition')
-            suggestions.append('Smart city hackathon')
-        
-        # === CHEMICAL/BIOTECHNOLOGY ===
-        chem_keywords = ['chemical', 'biotech', 'biotechnology', 'pharmacy', 'pharmaceutical']
-        if any(kw in combined_text for kw in chem_keywords):
-            suggestions.append('Biotech innovation challenge 2026')
-            suggestions.append('Chemical engineering internship')
-            suggestions.append('Healthcare hackathon')
-        
-        # === BUSINESS/MANAGEMENT ===
-        mgmt_keywords = ['management', 'mba', 'business', 'finance', 'marketing']
-        if any(kw in combined_text for kw in mgmt_keywords):
-            suggestions.append('Business case competition 2026')
-            suggestions.append('Startup challenge')
-            suggestions.append('Management internship 2026')
-        
-        # === DESIGN/CREATIVE ===
-        design_keywords = ['design', 'ui', 'ux', 'graphic', 'creative']
-        if any(kw in combined_text for kw in design_keywords):
-            suggestions.append('Design competition 2026')
-            suggestions.append('UI/UX hackathon')
+        all_skills = ' '.join(tech_skills) if tech_skills else ''
+        all_interests = ' '.join(interests) if interests else ''
+        hits = PROFILE_KEYWORDS.scan(f"{major} {degree} {all_skills} {all_interests}")
+        
+        for category, _, branch_suggestions in BRANCH_SUGGESTIONS:
+            if category in hits:
+                suggestions.extend(branch_suggestions)
         
         # === GENERAL FOR ALL STUDENTS ===
         # Always include general opportunities
-        suggestions.extend([
-            'Student hackathon 2026',
-            'College internship program 2026',
-            'Student fellowship 2026',
-            'Innovation challenge',
-            'Student startup competition'
-        ])
+        suggestions.extend(GENERAL_SUGGESTIONS)
         
         # Remove duplicates and limit to 8
         suggestions = list(dict.fromkeys(suggestions))[:8]
@@ -139,7 +241,7 @@ class OpportunityService:
         return suggestions
     
     
-    def search_opportunities(self, query, opportunity_type=None):
+    def search_opportunities(self, query, opportunity_type=None, force_refresh=False):
         """
         Search for opportunities using Google Programmable Search Engine
         Enhanced to search across multiple platforms including:
@@ -150,42 +252,231 @@ class OpportunityService:
         Args:
             query: Search query string
             opportunity_type: Optional filter (hackathon, internship, fellowship)
+            force_refresh: Skip the search cache and query Google again
         
         Returns:
-            Dictionary with opportunities list and metadata
+            Dictionary with opportunities list and metadata, including
+            from_cache, cache_age_seconds and source (search_cache, local_index or google)
         """
+        self.search_warmer.record(query, opportunity_type)
+        
         # Build enhanced query with platform-specific search
-        enhanced_query = self._enhance_query(query, opportunity_type)
+        enhanced_query = self._enhance_query(query)
+        
+        cache_key = self._search_cache_key(enhanced_query, opportunity_type)
+        if not force_refresh:
+            result = self._search_without_google(query, opportunity_type, enhanced_query, cache_key)
+            if result is not None:
+                return result
+        
+        cached_opportunities, shared = self.search_flights.do(
+            cache_key, self._run_search, cache_key, enhanced_query, opportunity_type
+        )
+        if shared:
+            print(f"✓ Joined in-flight search: {enhanced_query}")
+        return self._search_response(cached_opportunities, enhanced_query)
+    
+    
+    def search_page(self, query=None, opportunity_type=None, year=None, limit=10, offset=0,
+                    search_id=None, force_refresh=False, profile=None):
+        """
+        One page of search results, served from a saved result set when possible
         
-        # Check cache first (recent searches within last hour)
-        # For hackathon demo, we'll implement basic caching logic
+        With a live search_id the page is sliced from that search's saved results
+        (no Google call, no writes). Otherwise the query is searched, its results
+        are saved under a new search_id, and the page is sliced from those.
         
-        # Perform Google search
-        search_results = self._perform_google_search(enhanced_query)
+        Args:
+            query: Search query string (needed unless search_id is live)
+            opportunity_type: Optional type filter
+            year: Optional year filter (deadline year, else year in the title)
+            limit: Page size
+            offset: Position of the first result in the filtered list
+            search_id: search_id from an earlier page
+            force_refresh: Ignore search_id and the search cache and query Google again
+            profile: Structured student profile; a new search's results are re-ranked
+                for it before they are saved
         
-        # Parse and structure results
-        opportunities = self._parse_search_results(search_results, opportunity_type)
+        Returns:
+            Page dictionary (see ResultSets.page) with new_search set when a search
+            ran, or None if search_id has expired and there is no query to re-run
+        """
+        if search_id and not force_refresh:
+            page = self.result_sets.page(search_id, offset, limit, opportunity_type, year)
+            if page is not None:
+                return {**page, 'from_cache': True, 'new_search': False}
+            print(f"⚠️  Search {search_id} expired{', searching again' if query else ''}")
+        if not query:
+            return None
         
-        # Cache results in Firebase
-        cached_opportunities = self._cache_opportunities(opportunities)
+        result = self.search_opportunities(query, opportunity_type, force_refresh=force_refresh)
+        if profile:
+            result = {**result, 'opportunities': self.profile_ranker.rank(profile, result['opportunities'])}
+        search_id = self.result_sets.create(result, opportunity_type)
+        page = self.result_sets.page(search_id, offset, limit, opportunity_type, year)
+        return {**page, 'from_cache': result['from_cache'], 'new_search': True}
+    
+    def stream_search(self, query, opportunity_type=None, year=None, force_refresh=False, profile=None):
+        """
+        Search, yielding each opportunity as soon as its result page is fetched and scored
         
-        return {
-            'opportunities': cached_opportunities,
-            'count': len(cached_opportunities),
-            'query': enhanced_query,
-            'cached': True
+        Search cache and local index answers are yielded at once. Otherwise the
+        result pages are requested concurrently and each page's opportunities are
+        yielded the moment that page arrives, so the first results are one Google
+        round trip away. The ranked results are saved as a result set before the
+        summary; storing the opportunities and filling the search cache happen on
+        persist_pool afterwards. Like search_opportunities, a stream joins an
+        identical search already in flight instead of fetching it again.
+        
+        Args:
+            query: Search query string
+            opportunity_type: Optional filter (hackathon, internship, fellowship)
+            year: Optional year filter (deadline year, else year in the title)
+            force_refresh: Skip the search cache and local index and query Google
+            profile: Structured student profile; the saved results are re-ranked for it
+                and the summary lists the re-ranked order as ranked_ids
+        
+        Yields:
+            ('opportunity', opportunity) for each result in arrival order, then
+            ('done', summary) with search_id, count, total, skipped counts, source and timings
+        """
+        started = time.perf_counter()
+        first_result_ms = None
+        type_filter = (opportunity_type or '').lower() or None
+        year = str(year) if year else None
+        skipped = {'relevance': 0, 'expired': 0}
+        
+        self.search_warmer.record(query, opportunity_type)
+        enhanced_query = self._enhance_query(query)
+        cache_key = self._search_cache_key(enhanced_query, opportunity_type)
+        
+        result = None
+        if not force_refresh:
+            result = self._search_without_google(query, opportunity_type, enhanced_query, cache_key)
+        
+        # Identical searches share one Google fetch: join one already in flight (streamed or not)
+        flight = self.search_flights.begin(cache_key) if result is None else None
+        if flight is not None:
+            print(f"✓ Joined in-flight search: {enhanced_query}")
+            result = self._search_response(flight.result(), enhanced_query)
+        
+        if result is not None:
+            for opportunity in result['opportunities']:
+                if matches_filters(opportunity, type_filter, year):
+                    if first_result_ms is None:
+                        first_result_ms = (time.perf_counter() - started) * 1000
+                    yield 'opportunity', opportunity
+        else:
+            opportunities = []
+            search = self._stream_google_search(cache_key, enhanced_query, opportunity_type, opportunities, skipped)
+            finished = False
+            try:
+                for opportunity in search:
+                    if matches_filters(opportunity, type_filter, year):
+                        if first_result_ms is None:
+                            first_result_ms = (time.perf_counter() - started) * 1000
+                        yield 'opportunity', opportunity
+                finished = True
+            finally:
+                if not finished:
+                    # The client went away mid-stream: finish the search anyway, since
+                    # callers that joined it are waiting for its results
+                    self.persist_pool.submit(self._drain_search, search)
+            result = self._search_response(opportunities, enhanced_query)
+        
+        ranked_ids = None
+        if profile:
+            result = {**result, 'opportunities': self.profile_ranker.rank(profile, result['opportunities'])}
+            ranked_ids = [opp.get('opportunity_id') for opp in result['opportunities']
+                          if matches_filters(opp, type_filter, year)]
+        
+        search_id = self.result_sets.create(result, opportunity_type)
+        total = sum(1 for opp in result['opportunities'] if matches_filters(opp, type_filter, year))
+        yield 'done', {
+            'ranked_ids': ranked_ids,
+            'search_id': search_id,
+            'count': total,
+            'total': total,
+            'skipped_low_relevance': skipped['relevance'],
+            'skipped_expired': skipped['expired'],
+            'query': result['query'],
+            'from_cache': result['from_cache'],
+            'cache_age_seconds': result['cache_age_seconds'],
+            'source': result['source'],
+            'expires_in_seconds': self.result_sets.ttl,
+            'first_result_ms': round(first_result_ms, 1) if first_result_ms is not None else None,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
         }
     
+    @staticmethod
+    def decode_search_cursor(cursor):
+        """
+        Read a search page cursor
+        
+        Returns:
+            (search_id, offset, limit, opportunity_type, year)
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        return ResultSets.decode_cursor(cursor)
+    
+    
+    def warm_search(self, query, opportunity_type=None, fresh_for=0):
+        """
+        Run a search ahead of time so it is answered from the search cache
+        
+        Args:
+            query: Search query string
+            opportunity_type: Optional filter (hackathon, internship, fellowship)
+            fresh_for: Seconds the cached results must stay fresh for; younger
+                entries are left alone
+        
+        Returns:
+            (outcome, requests): outcome is 'fresh' (cache entry still good),
+            'local' (the local index answers it), 'claimed' (another worker is
+            already refreshing it) or 'warmed' (searched Google and cached the
+            results); requests is the number of Google requests this call sent
+        """
+        enhanced_query = self._enhance_query(query)
+        cache_key = self._search_cache_key(enhanced_query, opportunity_type)
+        
+        searched_at = self.search_cache.peek(cache_key)
+        if searched_at is not None and time.time() - searched_at + fresh_for <= self.search_cache.ttl:
+            return 'fresh', 0
+        if self._local_matches(query, opportunity_type) is not None:
+            return 'local', 0
+        
+        # With a shared (SQLite) search cache, only one worker warms each query
+        if not self.search_cache.claim_refresh(cache_key):
+            return 'claimed', 0
+        
+        usage = {'requests': 0}
+        try:
+            self.search_flights.do(cache_key, self._run_search, cache_key, enhanced_query, opportunity_type,
+                                   usage=usage)
+        except Exception:
+            self.search_cache.release_refresh(cache_key)
+            raise
+        print(f"✓ Warmed search: {enhanced_query}")
+        return 'warmed', usage['requests']
     
-    def get_cached_opportunities(self, limit=20, opportunity_type=None):
+    
+    def get_cached_opportunities(self, limit=20, opportunity_type=None, cursor=None):
         """
-        Get recently cached opportunities from Firebase
+        Get recently cached opportunities, newest first
+        
+        Args:
+            limit: Page size
+            opportunity_type: Optional type filter
+            cursor: next_cursor from the previous page
         """
-        opportunities = self.firebase.get_cached_opportunities(limit, opportunity_type)
+        page = self.firebase.get_cached_opportunities(limit, opportunity_type, cursor)
         
         return {
-            'opportunities': opportunities,
-            'count': len(opportunities)
+            'opportunities': page['opportunities'],
+            'count': len(page['opportunities']),
+            'next_cursor': page['next_cursor']
         }
     
     
@@ -196,10 +487,276 @@ class OpportunityService:
         return self.firebase.get_opportunity(opportunity_id)
     
     
+    def get_opportunities(self, opportunity_ids, fields=None):
+        """
+        Get several opportunities with batched reads
+        
+        Legacy IDs resolve to their canonical record, whose ID is returned as opportunity_id.
+        
+        Args:
+            opportunity_ids: List of opportunity IDs
+            fields: Optional list of fields to return
+        
+        Returns:
+            Dictionary with opportunities (in request order) and missing IDs
+        """
+        documents = self.firebase.get_opportunities(opportunity_ids, fields=fields)
+        
+        opportunities = []
+        missing = []
+        for opp_id in dict.fromkeys(opportunity_ids):
+            if opp_id in documents:
+                opportunities.append(documents[opp_id])
+            else:
+                missing.append(opp_id)
+        
+        return {
+            'opportunities': opportunities,
+            'count': len(opportunities),
+            'missing': missing
+        }
+    
+    
     # ========================================================================
     # PRIVATE HELPER METHODS
     # ========================================================================
     
+    def _search_local(self, query, opportunity_type):
+        """
+        Answer a search from the in-process opportunity index
+        
+        Returns:
+            Ranked opportunities, or None if the index is not loaded or found fewer than
+            local_search_min_results good matches (the caller then searches Google)
+        """
+        opportunities = self._local_matches(query, opportunity_type)
+        if opportunities is None:
+            return None
+        
+        self.local_searches += 1
+        print(f"✓ Local index: {len(opportunities)} matches for '{query}' (no Google call)")
+        return opportunities
+    
+    def _local_matches(self, query, opportunity_type):
+        """Local index results for a search, or None if they are not enough to answer it"""
+        index = getattr(self.firebase, 'opportunity_index', None)
+        if index is None or not index.ready or self.local_search_min_results <= 0:
+            return None
+        
+        opportunities = index.search(
+            query, opportunity_type,
+            limit=self.local_search_limit,
+            min_coverage=self.local_search_min_coverage
+        )
+        if len(opportunities) < self.local_search_min_results:
+            print(f"🔎 Local index: {len(opportunities)} matches for '{query}', searching Google")
+            return None
+        return opportunities
+    
+    def _search_without_google(self, query, opportunity_type, enhanced_query, cache_key):
+        """
+        Answer a search from the search cache or the local index
+        
+        Returns:
+            search_opportunities result, or None if Google has to be searched
+        """
+        # Check cache first. Stale entries (older than SEARCH_CACHE_TTL) are still
+        # served immediately while one worker re-runs the search in the background
+        cached = self.search_cache.lookup(cache_key)
+        if cached is not None:
+            searched_at, cached_opportunities = cached
+            stale = self.search_cache.is_stale(searched_at)
+            print(f"✓ Search cache hit ({time.time() - searched_at:.0f}s old{', stale' if stale else ''}): "
+                  f"{enhanced_query}")
+            if stale and self.search_cache.claim_refresh(cache_key):
+                self.refresh_pool.submit(self._refresh_search, cache_key, enhanced_query, opportunity_type)
+            return self._search_response(cached_opportunities, enhanced_query, searched_at)
+        
+        # Then stored opportunities; Google is only asked when they are too few
+        local_opportunities = self._search_local(query, opportunity_type)
+        if local_opportunities is not None:
+            return self._search_response(local_opportunities, enhanced_query, source='local_index')
+        return None
+    
+    def _run_search(self, cache_key, enhanced_query, opportunity_type, usage=None):
+        """
+        Search Google, store the results and cache them
+        
+        Args:
+            usage: Optional dictionary; its 'requests' is set to the Google requests sent
+        
+        Returns:
+            Stored opportunities
+        """
+        with self._counter_lock:
+            self.google_searches += 1
+        # Perform Google search
+        search_results = self._perform_google_search(enhanced_query)
+        if usage is not None:
+            usage['requests'] = search_results.get('requests', 0)
+        
+        # Parse and structure results
+        opportunities = self._parse_search_results(search_results, opportunity_type)
+        
+        return self._store_search(cache_key, opportunities, search_results.get('is_mock', False))
+    
+    def _store_search(self, cache_key, opportunities, is_mock=False):
+        """
+        Store parsed search results and cache them
+        
+        Returns:
+            Stored opportunities
+        """
+        # Store each result once under its content-addressed ID; unchanged
+        # results are not rewritten, new/changed ones go out as one batched commit
+        with self.firebase.batched_writes() as writer:
+            cached_opportunities = self.firebase.upsert_opportunities(opportunities, writer=writer)
+        
+        # Mock fallbacks (API down or out of quota) are not cached, so the next search retries Google
+        if is_mock:
+            self.search_cache.release_refresh(cache_key)
+        else:
+            self.search_cache.store(cache_key, cached_opportunities)
+        
+        return cached_opportunities
+    
+    def _with_canonical_ids(self, opportunities, seen):
+        """
+        Set each opportunity's canonical ID (as upsert_opportunities will store it)
+        
+        Args:
+            opportunities: Parsed opportunities
+            seen: IDs already emitted by this search; repeats are dropped and new IDs added
+        
+        Returns:
+            The opportunities not seen before, with 'id' and 'opportunity_id' set
+        """
+        fresh = []
+        for opportunity in opportunities:
+            opp_id = self.firebase.opportunity_key(
+                opportunity.get('url') or opportunity.get('link') or opportunity.get('title', '')
+            )
+            if opp_id in seen:
+                continue
+            seen.add(opp_id)
+            opportunity['id'] = opp_id
+            opportunity['opportunity_id'] = opp_id
+            fresh.append(opportunity)
+        return fresh
+    
+    def _stream_google_search(self, cache_key, enhanced_query, opportunity_type, opportunities, skipped):
+        """
+        Search Google as the search_flights leader for cache_key, yielding each new opportunity
+        
+        Every kept opportunity is also appended to `opportunities`, which ends up
+        sorted by relevance, and skipped results are counted in `skipped`. Once
+        the pages are exhausted the results are stored on persist_pool, and only
+        then is the flight finished, so joined callers (and the search cache)
+        see the stored results.
+        """
+        try:
+            with self._counter_lock:
+                self.google_searches += 1
+            seen = set()
+            received = 0
+            
+            if self.search_api_keys and self.search_engine_id:
+                pages = self._iter_search_pages(enhanced_query)
+            else:
+                print("⚠️  Missing API credentials - using mock data")
+                pages = []
+            
+            for start_index, items in pages:
+                received += len(items)
+                parsed = []
+                for offset, item in enumerate(items):
+                    opportunity, skip_reason = self._parse_search_item(item, start_index + offset, opportunity_type)
+                    if opportunity is None:
+                        skipped[skip_reason] += 1
+                    else:
+                        parsed.append(opportunity)
+                
+                for opportunity in self._with_canonical_ids(parsed, seen):
+                    opportunities.append(opportunity)
+                    yield opportunity
+            
+            # Nothing came back (API down or out of quota): fall back to mock data, which is not cached
+            is_mock = not received
+            if is_mock:
+                if self.search_api_keys and self.search_engine_id:
+                    print("⚠️  No results from API - using mock data")
+                parsed = self._parse_search_results(self._get_mock_search_results(enhanced_query), opportunity_type)
+                for opportunity in self._with_canonical_ids(parsed, seen):
+                    opportunities.append(opportunity)
+                    yield opportunity
+            
+            opportunities.sort(key=lambda x: x['relevance_score'], reverse=True)
+            print(f"📊 Streamed: {len(opportunities)} kept, {skipped['relevance']} low relevance, "
+                  f"{skipped['expired']} expired")
+        except BaseException as e:
+            self.search_flights.finish(cache_key, exception=e)
+            raise
+        self.persist_pool.submit(self._persist_search, cache_key, opportunities, is_mock)
+    
+    @staticmethod
+    def _drain_search(search):
+        """Run an abandoned _stream_google_search to the end (runs on persist_pool)"""
+        try:
+            for _ in search:
+                pass
+        except Exception as e:
+            print(f"❌ Abandoned streamed search failed: {e}")
+    
+    def _persist_search(self, cache_key, opportunities, is_mock):
+        """Store a streamed search's results, then finish its flight (runs on persist_pool)"""
+        try:
+            self._store_search(cache_key, opportunities, is_mock)
+        except Exception as e:
+            print(f"❌ Storing streamed search results failed: {e}")
+        finally:
+            self.search_flights.finish(cache_key, opportunities)
+    
+    def _refresh_search(self, cache_key, enhanced_query, opportunity_type):
+        """Background refresh of a stale cache entry (runs on refresh_pool)"""
+        try:
+            self.search_flights.do(cache_key, self._run_search, cache_key, enhanced_query, opportunity_type)
+            print(f"✓ Refreshed stale search: {enhanced_query}")
+        except Exception as e:
+            print(f"❌ Background search refresh failed for '{enhanced_query}': {e}")
+            self.search_cache.release_refresh(cache_key)
+    
+    @staticmethod
+    def _search_cache_key(enhanced_query, opportunity_type):
+        """Case- and whitespace-insensitive cache key for a search"""
+        return ' '.join(enhanced_query.lower().split()), (opportunity_type or '').lower() or None
+    
+    def _search_response(self, opportunities, enhanced_query, searched_at=None, source=None):
+        """
+        Build the search_opportunities result
+        
+        Args:
+            searched_at: Set for search cache hits
+            source: 'search_cache', 'local_index' or 'google' (derived from searched_at if omitted)
+        """
+        return {
+            'opportunities': opportunities,
+            'count': len(opportunities),
+            'query': enhanced_query,
+            'cached': True,
+            'from_cache': searched_at is not None,
+            'cache_age_seconds': round(time.time() - searched_at, 1) if searched_at is not None else 0,
+            'source': source or ('search_cache' if searched_at is not None else 'google')
+        }
+    
+    def search_source_stats(self):
+        """How many searches were answered locally vs. sent to Google since startup"""
+        return {
+            'name': 'search_sources',
+            'local_index': self.local_searches,
+            'google': self.google_searches,
+            'google_requests': self.search_requests
+        }
+    
     def _enhance_query(self, query, filters=None):
         """
         SIMPLIFIED query enhancement - less aggressive
@@ -247,87 +804,130 @@ class OpportunityService:
             num_results: Number of results per page (max 10 per API call)
         
         Returns:
-            Search results dictionary
+            Search results dictionary, with 'requests' set to the API requests sent
         """
         if not self.search_api_keys or not self.search_engine_id:
             print("⚠️  Missing API credentials - using mock data")
-            return self._get_mock_search_results(query)
+            return {**self._get_mock_search_results(query), 'requests': 0}
+        
+        # Fetch 2 pages for diverse results (2 pages = 20 results)
+        # Reduced from 5 pages to save API quota. The pages are independent,
+        # so they are requested concurrently and merged back in rank order.
+        tried_keys = {start_index: [] for start_index in self.SEARCH_PAGES}
+        pages = list(self.search_pool.map(
+            lambda start_index: self._fetch_search_page(query, start_index, num_results, tried_keys[start_index]),
+            self.SEARCH_PAGES
+        ))
+        all_items = [item for items in pages for item in items]
+        requests_sent = sum(len(keys) for keys in tried_keys.values())
+        
+        if not all_items:
+            print("⚠️  No results from API - using mock data")
+            return {**self._get_mock_search_results(query), 'requests': requests_sent}
+        
+        print(f"✅ Total results fetched: {len(all_items)}")
+        return {'items': all_items, 'requests': requests_sent}
+    
+    def _iter_search_pages(self, query, num_results=10):
+        """
+        Request every result page concurrently
         
-        try:
-            all_items = []
+        Yields:
+            (start_index, items) for each page as soon as it arrives
+        """
+        futures = {
+            self.search_pool.submit(self._fetch_search_page, query, start_index, num_results): start_index
+            for start_index in self.SEARCH_PAGES
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    
+    def _fetch_search_page(self, query, start_index, num_results, tried_keys=None):
+        """
+        Fetch one page of Google Custom Search results
+        
+        Failures only affect this page. Each attempt uses the API key with the
+        most daily quota left; on a rate limit (429) the key is benched and the
+        same page is retried on another key until every key has been tried.
+        
+        Args:
+            query: Search query
+            start_index: Index of the first result on the page (1, 11, ...)
+            num_results: Number of results per page (max 10)
+            tried_keys: Optional list; each key used is appended, one per request sent
+        
+        Returns:
+            List of result items (empty if the page could not be fetched)
+        """
+        tried_keys = [] if tried_keys is None else tried_keys
+        
+        while True:
+            api_key = self.search_keys.acquire(exclude=tried_keys)
+            if api_key is None:
+                reason = 'tried' if tried_keys else 'cooling down or out of daily quota'
+                print(f"   All API keys {reason}, skipping page {start_index}")
+                return []
+            tried_keys.append(api_key)
             
-            # Fetch 2 pages for diverse results (2 pages = 20 results)
-            # Reduced from 5 pages to save API quota
-            for start_index in [1, 11]:
-                # Get next API key in rotation
-                api_key = self._get_next_api_key()
-                
-                params = {
-                    'key': api_key,
-                    'cx': self.search_engine_id,
-                    'q': f"{query} India",  # Add India filter
-                    'num': num_results,
-                    'start': start_index,
-                    'dateRestrict': 'm6',  # Last 6 months
-                    'sort': 'date:d:s',
-                    'gl': 'in',  # Geographic location: India
-                    'cr': 'countryIN'  # Country restrict: India
-                }
-                
-                print(f"🔍 Google Search (page {start_index}): {query} India")
-                
-                response = requests.get(self.search_url, params=params, timeout=10)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    items = result.get('items', [])
-                    all_items.extend(items)
-                    print(f"✅ Found {len(items)} results on page {start_index}")
-                    
-                    # Debug: Show API response if empty
-                    if not items and start_index == 1:
-                        print(f"⚠️  API Response: {result.get('searchInformation', {})}")
-                        error = result.get('error', {})
-                        if error:
-                            print(f"❌ API Error: {error.get('message', 'Unknown error')}")
-                            
-                elif response.status_code == 429:
-                    print(f"⚠️  Rate limit hit on API key #{self.current_key_index}")
-                    print(f"   Used {len(all_items)} results so far from previous pages")
-                    
-                    # If we have other keys to try, continue with next key
-                    if len(self.search_api_keys) > 1 and start_index == 1:
-                        print(f"   Trying next API key in rotation...")
-                        continue
-                    else:
-                        print(f"   All API keys exhausted or already have results, stopping search")
-                        break
-                else:
-                    print(f"⚠️  API returned status {response.status_code} for page {start_index}")
-                    try:
-                        error_detail = response.json()
-                        print(f"❌ Error details: {error_detail}")
-                    except:
-                        pass
-                    # Continue to next page even if this one fails (unless it's the first page)
-                    if start_index == 1:
-                        print("❌ First page failed, stopping search")
-                        break
-                    else:
-                        print("➡️  Continuing to next page...")
-                        continue
+            params = {
+                'key': api_key,
+                'cx': self.search_engine_id,
+                'q': f"{query} India",  # Add India filter
+                'num': num_results,
+                'start': start_index,
+                'dateRestrict': 'm6',  # Last 6 months
+                'sort': 'date:d:s',
+                'gl': 'in',  # Geographic location: India
+                'cr': 'countryIN'  # Country restrict: India
+            }
             
-            if not all_items:
-                print("⚠️  No results from API - using mock data")
-                return self._get_mock_search_results(query)
+            print(f"🔍 Google Search (page {start_index}): {query} India")
+            with self._counter_lock:
+                self.search_requests += 1
             
-            print(f"✅ Total results fetched: {len(all_items)}")
-            return {'items': all_items}
+            try:
+                response = self.http.get(self.search_url, params=params, timeout=10)
+            except requests.RequestException as e:
+                self.search_keys.report_error(api_key)
+                print(f"❌ Google Search API error on page {start_index}: {e}")
+                return []
             
-        except requests.RequestException as e:
-            print(f"❌ Google Search API error: {e}")
-            print("⚠️  Falling back to mock data")
-            return self._get_mock_search_results(query)
+            if response.status_code == 200:
+                self.search_keys.report_success(api_key)
+                result = response.json()
+                items = result.get('items', [])
+                print(f"✅ Found {len(items)} results on page {start_index}")
+                
+                # Debug: Show API response if empty
+                if not items and start_index == self.SEARCH_PAGES[0]:
+                    print(f"⚠️  API Response: {result.get('searchInformation', {})}")
+                    error = result.get('error', {})
+                    if error:
+                        print(f"❌ API Error: {error.get('message', 'Unknown error')}")
+                return items
+            
+            if response.status_code == 429:
+                self.search_keys.report_rate_limited(api_key, daily_exhausted=self._is_daily_limit(response))
+                print(f"⚠️  Rate limit hit on page {start_index}, retrying with another API key...")
+                continue
+            
+            self.search_keys.report_error(api_key)
+            print(f"⚠️  API returned status {response.status_code} for page {start_index}")
+            try:
+                error_detail = response.json()
+                print(f"❌ Error details: {error_detail}")
+            except:
+                pass
+            return []
+    
+    @staticmethod
+    def _is_daily_limit(response):
+        """True if a 429 response says the key's daily quota is used up (not a per-minute limit)"""
+        try:
+            message = str(response.json().get('error', {}).get('message', '')).lower()
+        except Exception:
+            return False
+        return 'per day' in message or 'daily' in message
     
     
     def _parse_search_results(self, search_results, opportunity_type=None):
@@ -343,112 +943,85 @@ class OpportunityService:
             List of structured opportunity dictionaries (only active/future events)
         """
         opportunities = []
-        skipped_relevance = 0
-        skipped_expired = 0
+        skipped = {'relevance': 0, 'expired': 0}
         
         items = search_results.get('items', [])
         print(f"📄 Parsing {len(items)} search results...")
         
         for idx, item in enumerate(items, 1):
-            title = item.get('title', 'No title')
-            link = item.get('link', '')
-            snippet = item.get('snippet', 'No description')
-            
-            # Calculate relevance score (0-100)
-            relevance_score = self._calculate_relevance_score(item)
-            
-            # More lenient filtering - accept if score > 15
-            if relevance_score < 15:
-                print(f"⏭️  Skipping #{idx}: Low relevance score {relevance_score} ({title[:50]}...)")
-                skipped_relevance += 1
-                continue
-            
-            # Check if opportunity has expired deadline
-            if self._is_opportunity_expired(title, snippet):
-                print(f"⏭️  Skipping #{idx}: Expired deadline ({title[:50]}...)")
-                skipped_expired += 1
+            opportunity, skip_reason = self._parse_search_item(item, idx, opportunity_type)
+            if opportunity is None:
+                skipped[skip_reason] += 1
                 continue
-            
-            # Infer type if not provided
-            inferred_type = opportunity_type or self._infer_opportunity_type(title, snippet)
-            
-            # Extract opportunity details
-            # Combine title and snippet for better deadline extraction
-            combined_text = f"{title} {snippet}"
-            deadline = self._extract_deadline(combined_text)
-            
-            opportunity = {
-                'title': title,
-                'link': link,
-                'description': snippet,
-                'snippet': snippet,
-                'source': self._extract_domain(link),
-                'relevance_score': relevance_score,
-                'discovered_date': datetime.now().isoformat(),
-                'type': inferred_type,
-                'organizer': self._extract_organizer(title, snippet),
-                'eligibility_text': self._extract_eligibility(snippet),
-                'deadline': deadline or 'Not specified',
-                'apply_by': deadline or 'Not specified',
-                'opportunity_id': f"opp_{idx}",  # Use index for consistent IDs
-                'url': link  # Add URL for ID generation
-            }
-            
-            print(f"✅ Added #{idx}: {title[:50]}... (Score: {relevance_score})")
             opportunities.append(opportunity)
         
         # Sort by relevance score
         opportunities.sort(key=lambda x: x['relevance_score'], reverse=True)
-        print(f"📊 Results: {len(opportunities)} kept, {skipped_relevance} low relevance, {skipped_expired} expired")
-        
-        # Save opportunities to database for eligibility checking
-        try:
-            import hashlib
-            for opp in opportunities:
-                # Use URL hash as ID for consistency and deduplication
-                opp_id = hashlib.md5(opp['url'].encode()).hexdigest()[:12]
-                opp['id'] = opp_id
-                opp['opportunity_id'] = opp_id
-                
-                # Save to opportunities collection using firebase service
-                self.firebase.db.collection('opportunities').document(opp_id).set({
-                    'title': opp.get('title'),
-                    'link': opp.get('link'),
-                    'url': opp.get('url'),
-                    'description': opp.get('description'),
-                    'snippet': opp.get('snippet'),
-                    'source': opp.get('source'),
-                    'type': opp.get('type'),
-                    'organizer': opp.get('organizer'),
-                    'eligibility_text': opp.get('eligibility_text'),
-                    'deadline': opp.get('deadline'),
-                    'apply_by': opp.get('apply_by'),
-                    'relevance_score': opp.get('relevance_score'),
-                    'discovered_date': opp.get('discovered_date'),
-                    'created_at': datetime.now().isoformat(),
-                    'source_type': 'search',
-                    'is_cached': True
-                }, merge=True)
-        except Exception as e:
-            print(f"⚠️  Could not save opportunities to DB: {e}")
+        print(f"📊 Results: {len(opportunities)} kept, {skipped['relevance']} low relevance, "
+              f"{skipped['expired']} expired")
         
         return opportunities
     
-    
-    def _cache_opportunities(self, opportunities):
+    def _parse_search_item(self, item, idx, opportunity_type=None):
         """
-        Cache opportunities in Firebase
+        Score, date-check and structure one search result
+        
+        Args:
+            item: One raw Google API result
+            idx: Rank of the result in the search (1-based, for logs and fallback IDs)
+            opportunity_type: Optional type filter
         
         Returns:
-            List of opportunities with IDs
+            (opportunity, None), or (None, 'relevance' | 'expired') if the result is dropped
         """
-        cached = []
-        
-        for opp in opportunities:
-            result = self.firebase.create_opportunity(opp)
-            cached.append(result)
+        title = item.get('title', 'No title')
+        link = item.get('link', '')
+        snippet = item.get('snippet', 'No description')
+        
+        # Scan the result once; relevance, type and eligibility all read these hits
+        hits = self._scan_keywords(title, snippet, link)
+        
+        # Calculate relevance score (0-100)
+        relevance_score = self._calculate_relevance_score(hits)
+        
+        # More lenient filtering - accept if score > 15
+        if relevance_score < 15:
+            print(f"⏭️  Skipping #{idx}: Low relevance score {relevance_score} ({title[:50]}...)")
+            return None, 'relevance'
+        
+        # Scan title + snippet for dates once; expiry and deadline both read the result
+        dates = scan_dates(f"{title} {snippet}")
+        
+        # Check if opportunity has expired deadline
+        if self._is_opportunity_expired(dates):
+            print(f"⏭️  Skipping #{idx}: Expired deadline ({title[:50]}...)")
+            return None, 'expired'
+        
+        # Infer type if not provided
+        inferred_type = opportunity_type or self._infer_opportunity_type(hits)
+        
+        # Extract opportunity details
+        deadline = self._extract_deadline(dates)
+        
+        opportunity = {
+            'title': title,
+            'link': link,
+            'description': snippet,
+            'snippet': snippet,
+            'source': self._extract_domain(link),
+            'relevance_score': relevance_score,
+            'discovered_date': datetime.now().isoformat(),
+            'type': inferred_type,
+            'organizer': self._extract_organizer(title, snippet),
+            'eligibility_text': self._extract_eligibility(snippet, hits),
+            'deadline': deadline or 'Not specified',
+            'apply_by': deadline or 'Not specified',
+            'opportunity_id': f"opp_{idx}",  # Use index for consistent IDs
+            'url': link  # Add URL for ID generation
+        }
         
-        return cached
+        print(f"✅ Added #{idx}: {title[:50]}... (Score: {relevance_score})")
+        return opportunity, None
     
     
     def _extract_organizer(self, title, snippet):
@@ -477,115 +1050,92 @@ class OpportunityService:
         return "Unknown"
     
     
-    def _extract_eligibility(self, snippet):
+    def _extract_eligibility(self, snippet, hits):
         """
         Extract eligibility criteria from snippet
+        
+        Args:
+            snippet: Result snippet
+            hits: Result keyword hits from _scan_keywords
         """
-        # Look for eligibility-related sentences
-        eligibility_keywords = [
-            'eligible', 'eligibility', 'open to', 'for students',
-            'requirements', 'must be', 'should be', 'criteria'
-        ]
+        # Keep the sentences that contain an eligibility keyword
+        starts = hits['hits'].positions('eligibility', *hits['spans']['snippet'])
+        if not starts:
+            # Default: return full snippet
+            return snippet
         
-        sentences = snippet.split('.')
         eligibility_sentences = []
-        
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in eligibility_keywords):
+        offset = 0
+        for sentence in snippet.split('.'):
+            end = offset + len(sentence)
+            index = bisect_left(starts, offset)
+            if index < len(starts) and starts[index] < end:
                 eligibility_sentences.append(sentence.strip())
+            offset = end + 1
         
-        if eligibility_sentences:
-            return ' '.join(eligibility_sentences)
-        
-        # Default: return full snippet
-        return snippet
+        return ' '.join(eligibility_sentences)
     
     
-    def _extract_deadline(self, snippet):
+    def _extract_deadline(self, dates):
         """
-        Extract deadline date from snippet with extensive pattern matching
-        Searches aggressively for any date mentions
-        Returns formatted date string or None
-        """
-        from datetime import datetime
-        import re
+        Pick the deadline out of a result's scanned dates
         
-        # Look in both snippet (title + description are passed together)
-        text = snippet
+        Args:
+            dates: DateScan of the result's title and snippet
         
-        # Extensive date patterns - catch everything possible
-        date_patterns = [
-            # With keywords
-            (r'(?:deadline|apply by|last date|due date|register by|submit by|registration deadline|application deadline|closes on|close date|expiry|expires|ends on|till|before):?\s*([A-Z][a-z]+\s+\d{1,2},?\s+\d{4})', 'keyword_mdy'),
-            (r'(?:deadline|apply by|last date|due date|register by|submit by|registration deadline|application deadline|closes on|close date|expiry|expires|ends on|till|before):?\s*(\d{1,2}\s+[A-Z][a-z]+\s+\d{4})', 'keyword_dmy'),
-            (r'(?:deadline|apply by|last date|due date|register by|submit by):?\s*(\d{1,2}\s+[A-Z][a-z]+\s+\'\d{2})', 'keyword_short_dmy'),
-            (r'(?:deadline|apply by|last date|due date|register by|submit by):?\s*([A-Z][a-z]+\s+\d{1,2}\s+\'\d{2})', 'keyword_short_mdy'),
-            
-            # Standalone dates (more aggressive)
-            (r'\b([A-Z][a-z]+\s+\d{1,2},?\s+20\d{2})\b', 'standalone_mdy'),
-            (r'\b(\d{1,2}\s+[A-Z][a-z]+\s+20\d{2})\b', 'standalone_dmy'),
-            (r'\b(\d{1,2}\s+[A-Z][a-z]+\s+\'\d{2})\b', 'standalone_short_dmy'),
-            (r'\b([A-Z][a-z]+\s+\d{1,2}\s+\'\d{2})\b', 'standalone_short_mdy'),
-            
-            # Numeric formats
-            (r'\b(\d{1,2}/\d{1,2}/20\d{2})\b', 'slash'),
-            (r'\b(\d{1,2}-\d{1,2}-20\d{2})\b', 'dash'),
-            (r'\b(20\d{2}-\d{1,2}-\d{1,2})\b', 'iso'),
-        ]
+        Returns:
+            The deadline as written in the snippet (e.g. "March 15, 2027") or None
+        """
+        deadline = dates.deadline
+        if deadline is None:
+            print("⚠️  No deadline found in snippet")
+            return None
         
-        for pattern, date_type in date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                date_str = match.group(1)
-                
-                # Convert short year to full year
-                if "'" in date_str:
-                    date_str = date_str.replace("'2", "202").replace("'1", "201")
-                
-                print(f"📅 Found deadline: {date_str}")
-                return date_str
+        print(f"📅 Found deadline: {deadline.text}")
+        return deadline.text
+    
+    
+    def _scan_keywords(self, title, snippet, link):
+        """
+        Find every dictionary keyword in a search result with one scan
         
-        print("⚠️  No deadline found in snippet")
-        return None
+        The fields are scanned as "title snippet\0link". The NUL keeps keywords
+        from matching across the snippet and link, while title and snippet are
+        still matched as one text like before.
+        
+        Returns:
+            Dictionary with the KeywordHits ('hits') and the (start, end) offsets of
+            each field in the scanned text ('spans': title, snippet, text, link)
+        """
+        snippet_start = len(title) + 1
+        link_start = snippet_start + len(snippet) + 1
+        return {
+            'hits': RESULT_KEYWORDS.scan(f"{title} {snippet}\0{link}"),
+            'spans': {
+                'title': (0, len(title)),
+                'snippet': (snippet_start, link_start - 1),
+                'text': (0, link_start - 1),
+                'link': (link_start, link_start + len(link))
+            }
+        }
     
     
-    def _calculate_relevance_score(self, item):
+    def _calculate_relevance_score(self, hits):
         """
         Calculate relevance score (0-100) based on multiple factors
         
         Args:
-            item: Search result item
+            hits: Result keyword hits from _scan_keywords
         
         Returns:
             Relevance score (0-100)
         """
         score = 50  # Base score
         
-        title = item.get('title', '').lower()
-        snippet = item.get('snippet', '').lower()
-        link = item.get('link', '').lower()
-        
-        # High-value keywords boost score
-        high_value_keywords = ['apply', 'deadline', 'eligibility', 'register', 'prize', 'stipend', '2026']
-        for keyword in high_value_keywords:
-            if keyword in title:
-                score += 5
-            if keyword in snippet:
-                score += 3
-        
-        # Trusted domains get boost
-        trusted_domains = ['devpost.com', 'devfolio.co', 'unstop.com', 'internshala.com', 
-                          'scholars4dev.com', 'opportunitydesk.org', 'linkedin.com']
-        for domain in trusted_domains:
-            if domain in link:
-                score += 15
-                break
-        
-        # Penalty for irrelevant indicators
-        spam_indicators = ['login', 'signin', 'profile', 'settings', 'terms', 'privacy']
-        for indicator in spam_indicators:
-            if indicator in link:
-                score -= 20
+        for category, _, weights, per_keyword in RELEVANCE_WEIGHTS:
+            for field, points in weights.items():
+                found = hits['hits'].count(category, *hits['spans'][field])
+                score += points * (found if per_keyword else min(found, 1))
         
         return max(0, min(100, score))
     
@@ -599,103 +1149,33 @@ class OpportunityService:
             return 'Unknown'
     
     
-    def _is_opportunity_expired(self, title, snippet):
+    def _is_opportunity_expired(self, dates):
         """
         Check if opportunity deadline has passed
         Dynamically calculates relative to today's date
+        
+        Args:
+            dates: DateScan of the result's title and snippet
         """
-        from datetime import datetime, timedelta
-        import re
-        
-        text = (title + ' ' + snippet).lower()
-        current_date = datetime.now()
-        
-        # Look for "closed", "ended", "expired" keywords
-        expired_keywords = ['closed', 'ended', 'expired', 'registration closed', 'applications closed']
-        if any(keyword in text for keyword in expired_keywords):
-            return True
-        
-        # Extract dates from text with multiple patterns
-        date_patterns = [
-            # Month Day, Year: Jan 15, 2026
-            (r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]* (\d{1,2}),? (\d{4})', 'mdy'),
-            # Day-Month-Year: 15-01-2026 or 15/01/2026
-            (r'(\d{1,2})[-/](\d{1,2})[-/](\d{4})', 'dmy'),
-            # Year-Month-Day: 2026-01-15
-            (r'(\d{4})-(\d{1,2})-(\d{1,2})', 'ymd'),
-            # Deadline: 15 Jan 2026
-            (r'deadline:?\s*(\d{1,2})\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s*(\d{4})', 'dmy_text'),
-        ]
+        reason = dates.expired_by()
+        if reason is None:
+            return False
         
-        month_map = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-                     'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
-        
-        for pattern, format_type in date_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                try:
-                    deadline = None
-                    
-                    if format_type == 'mdy':
-                        # Month Day, Year
-                        month = month_map.get(match[0][:3])
-                        day = int(match[1])
-                        year = int(match[2])
-                        if month:
-                            deadline = datetime(year, month, day)
-                    
-                    elif format_type == 'dmy':
-                        # Day-Month-Year
-                        day = int(match[0])
-                        month = int(match[1])
-                        year = int(match[2])
-                        deadline = datetime(year, month, day)
-                    
-                    elif format_type == 'ymd':
-                        # Year-Month-Day
-                        year = int(match[0])
-                        month = int(match[1])
-                        day = int(match[2])
-                        deadline = datetime(year, month, day)
-                    
-                    elif format_type == 'dmy_text':
-                        # Day Month Year (text)
-                        day = int(match[0])
-                        month = month_map.get(match[1][:3])
-                        year = int(match[2])
-                        if month:
-                            deadline = datetime(year, month, day)
-                    
-                    # Check if deadline is before yesterday
-                    # Filter out anything with deadline on or before day before yesterday
-                    yesterday = current_date - timedelta(days=1)
-                    if deadline and deadline.date() < yesterday.date():
-                        print(f"🚫 Expired: {deadline.date()} is before yesterday {yesterday.date()}")
-                        return True
-                        
-                except Exception as e:
-                    continue
-        
-        return False
-    
-    def _infer_opportunity_type(self, title, snippet):
+        if isinstance(reason, str):
+            print(f"🚫 Expired: snippet says '{reason}'")
+        else:
+            print(f"🚫 Expired: {reason.date} is before yesterday")
+        return True
+    
+    def _infer_opportunity_type(self, hits):
         """
         Infer opportunity type from title and snippet
-        """
-        text = (title + ' ' + snippet).lower()
         
-        # Type keywords
-        type_keywords = {
-            'hackathon': ['hackathon', 'hack'],
-            'internship': ['internship', 'intern', 'summer training'],
-            'fellowship': ['fellowship', 'scholar', 'grant'],
-            'scholarship': ['scholarship', 'financial aid'],
-            'competition': ['competition', 'contest', 'challenge'],
-            'program': ['program', 'workshop', 'bootcamp']
-        }
-        
-        for opp_type, keywords in type_keywords.items():
-            if any(keyword in text for keyword in keywords):
+        Args:
+            hits: Result keyword hits from _scan_keywords
+        """
+        for opp_type in TYPE_KEYWORDS:
+            if hits['hits'].count(f"type_{opp_type}", *hits['spans']['text']):
                 return opp_type
         
         return 'opportunity'
@@ -758,5 +1238,6 @@ class OpportunityService:
                     'link': 'https://ieee-student-congress.org/',
                     'snippet': 'IEEE Student Congress 2026 call for papers! Submit research in Electronics, Computer Science, AI, IoT, Robotics. Eligibility: UG/PG students, IEEE members preferred. Paper submission: January 20 - March 1, 2026. Conference: April 12-14, 2026, IIT Delhi. Publish in IEEE Xplore. Early bird: February 15.'
                 }
-            ]
+            ],
+            'is_mock': True
         }
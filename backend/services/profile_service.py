@@ -8,6 +8,9 @@ import re
 import google.generativeai as genai
 import os
 import json
+from datetime import date
+
+from .date_extraction import parse_date
 
 
 class ProfileService:
@@ -97,11 +100,16 @@ class ProfileService:
         return result
     
     
-    def get_profile(self, profile_id):
+    def get_profile(self, profile_id, fields=None, include_resume=False):
         """
         Get profile by ID
+        
+        Args:
+            profile_id: Student profile ID
+            fields: Optional list of field paths to read
+            include_resume: Also return the raw resume text
         """
-        return self.firebase.get_student_profile(profile_id)
+        return self.firebase.get_student_profile(profile_id, fields=fields, include_resume=include_resume)
     
     
     def update_profile(self, profile_id, profile_data):
@@ -549,23 +557,19 @@ Be honest about the grade - most student resumes are B/B+, not A+. Return ONLY t
             score_breakdown['experience_match'] = 5
         
         # Deadline feasibility
-        deadline = opportunity_data.get('deadline')
-        if deadline:
-            try:
-                from datetime import datetime, timedelta
-                deadline_date = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
-                days_until = (deadline_date - datetime.now()).days
-                
-                if days_until > 30:
-                    score_breakdown['deadline_feasibility'] = 15
-                elif days_until > 14:
-                    score_breakdown['deadline_feasibility'] = 10
-                elif days_until > 7:
-                    score_breakdown['deadline_feasibility'] = 5
-                else:
-                    score_breakdown['deadline_feasibility'] = 0
-            except:
+        # Same parser the search results' deadlines came from, so "March 15, 2027" counts too
+        deadline_date = parse_date(opportunity_data.get('deadline'))
+        if deadline_date:
+            days_until = (deadline_date - date.today()).days
+            
+            if days_until > 30:
+                score_breakdown['deadline_feasibility'] = 15
+            elif days_until > 14:
                 score_breakdown['deadline_feasibility'] = 10
+            elif days_until > 7:
+                score_breakdown['deadline_feasibility'] = 5
+            else:
+                score_breakdown['deadline_feasibility'] = 0
         else:
             score_breakdown['deadline_feasibility'] = 10
         
@@ -11,6 +11,9 @@ from typing import Dict, List
 
 
 class ReasoningService:
+    # The only student-document fields the reasoning path needs
+    PROFILE_FIELDS = ['profile', 'profile_version']
+    
     def __init__(self, firebase_service):
         """
         Initialize Reasoning Service with Gemini AI
@@ -47,21 +50,26 @@ class ReasoningService:
             self._configure_current_key()
     
     
-    def analyze_eligibility(self, profile_id: str, opportunity_id: str) -> Dict:
+    def analyze_eligibility(self, profile_id: str, opportunity_id: str,
+                            profile: Dict = None, opportunity: Dict = None) -> Dict:
         """
         Analyze student eligibility for an opportunity using Gemini AI
         
         Args:
             profile_id: Student profile ID
             opportunity_id: Opportunity ID
+            profile: Optional already-fetched profile document
+            opportunity: Optional already-fetched opportunity document
         
         Returns:
             Dictionary with structured eligibility analysis
         """
         try:
-            # Fetch profile and opportunity
-            profile = self.firebase.get_student_profile(profile_id)
-            opportunity = self.firebase.get_opportunity(opportunity_id)
+            # Fetch profile and opportunity (unless the caller already has them)
+            if profile is None:
+                profile = self.firebase.get_student_profile(profile_id, fields=self.PROFILE_FIELDS)
+            if opportunity is None:
+                opportunity = self.firebase.get_opportunity(opportunity_id)
             
             if not profile:
                 raise Exception(f"Profile {profile_id} not found")
@@ -77,15 +85,19 @@ class ReasoningService:
                 opportunity
             )
             
+            is_fallback = False
             if not analysis:
                 print("Warning: Gemini returned empty analysis, using fallback")
                 analysis = self._create_fallback_analysis()
+                is_fallback = True
             
-            # Store result in Firebase
+            # Store result in Firebase (keyed by the analyzed profile version)
             result = self.firebase.create_reasoning_result(
                 profile_id,
                 opportunity_id,
-                analysis
+                analysis,
+                profile_version=profile.get('profile_version', 0),
+                is_fallback=is_fallback
             )
             
             return result
@@ -98,7 +110,8 @@ class ReasoningService:
                 result = self.firebase.create_reasoning_result(
                     profile_id,
                     opportunity_id,
-                    fallback
+                    fallback,
+                    is_fallback=True
                 )
                 return result
             except:
@@ -123,10 +136,32 @@ class ReasoningService:
         """
         results = []
         
+        # Fetch the profile once, then cached results and opportunities in batched reads
+        profile = self.firebase.get_student_profile(profile_id, fields=self.PROFILE_FIELDS)
+        profile_version = profile.get('profile_version', 0) if profile else 0
+        cached_results = self.firebase.get_cached_reasoning_many(
+            profile_id, opportunity_ids, profile_version=profile_version
+        )
+        uncached_ids = [opp_id for opp_id in opportunity_ids if opp_id not in cached_results]
+        opportunities = self.firebase.get_opportunities(uncached_ids)
+        
+        # Legacy IDs are analyzed (and their results stored) under the canonical ID
+        aliased = {
+            opp_id: opportunity['opportunity_id'] for opp_id, opportunity in opportunities.items()
+            if opportunity['opportunity_id'] != opp_id
+        }
+        if aliased:
+            canonical_results = self.firebase.get_cached_reasoning_many(
+                profile_id, list(aliased.values()), profile_version=profile_version
+            )
+            for opp_id, canonical_id in aliased.items():
+                if canonical_id in canonical_results:
+                    cached_results[opp_id] = canonical_results[canonical_id]
+        
         for opp_id in opportunity_ids:
             try:
                 # Check cache first
-                cached = self.get_cached_reasoning(profile_id, opp_id)
+                cached = cached_results.get(opp_id)
                 if cached:
                     results.append({
                         'opportunity_id': opp_id,
@@ -135,7 +170,12 @@ class ReasoningService:
                     })
                 else:
                     # Perform new analysis
-                    analysis = self.analyze_eligibility(profile_id, opp_id)
+                    analysis = self.analyze_eligibility(
+                        profile_id,
+                        aliased.get(opp_id, opp_id),
+                        profile=profile,
+                        opportunity=opportunities.get(opp_id)
+                    )
                     results.append({
                         'opportunity_id': opp_id,
                         'analysis': analysis,
@@ -443,7 +483,7 @@ OUTPUT ONLY THE JSON. DO NOT ADD ANY EXTRA TEXT BEFORE OR AFTER THE JSON.
         
         This is an optional enhancement for more tailored advice
         """
-        profile = self.firebase.get_student_profile(profile_id)
+        profile = self.firebase.get_student_profile(profile_id, fields=self.PROFILE_FIELDS)
         
         if not profile:
             return {"error": "Profile not found"}
@@ -0,0 +1,126 @@
+"""
+Recent Feed - In-process ring buffers of the newest opportunities per type
+"""
+
+import threading
+import time
+
+
+class RecentOpportunityFeed:
+    """
+    The newest `capacity` opportunities per type (and across all types)
+
+    A buffer only answers requests after it has been primed from the datastore,
+    and only for `ttl` seconds after that. In between, opportunities stored by
+    this process are pushed in as they are written. Opportunities written by
+    other worker processes appear when the buffer is primed again.
+
+    Entries are ordered newest first by (cached_at, opportunity_id), the same
+    order as the datastore query, so cursors work across both.
+    """
+
+    ALL = '*'
+
+    def __init__(self, capacity=100, ttl=300):
+        """
+        Args:
+            capacity: Opportunities kept per buffer
+            ttl: Seconds a primed buffer is trusted before it must be re-primed
+        """
+        self.capacity = capacity
+        self.ttl = ttl
+
+        self._buffers = {}  # key -> {'entries': {id: (cached_at, data)}, 'primed_at', 'complete'}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def is_fresh(self, opportunity_type=None):
+        """Whether the buffer for a type is primed and within its TTL"""
+        with self._lock:
+            return self._fresh_buffer(opportunity_type or self.ALL) is not None
+
+    def prime(self, opportunity_type, rows):
+        """
+        Replace a buffer with the newest rows from the datastore
+
+        Args:
+            opportunity_type: Type the rows were queried for (None for all types)
+            rows: Newest-first list of (opportunity_id, cached_at, data), at most capacity long
+        """
+        with self._lock:
+            self._buffers[opportunity_type or self.ALL] = {
+                'entries': {opp_id: (cached_at, data) for opp_id, cached_at, data in rows},
+                'primed_at': time.monotonic(),
+                # Fewer rows than capacity means the buffer holds every matching opportunity
+                'complete': len(rows) < self.capacity
+            }
+
+    def push(self, opportunity_id, cached_at, data):
+        """Record a freshly stored opportunity in the all-types and its type's buffer"""
+        with self._lock:
+            for key in (self.ALL, data.get('type')):
+                buffer = self._buffers.get(key)
+                if buffer is None:
+                    continue
+                buffer['entries'][opportunity_id] = (cached_at, data)
+                if len(buffer['entries']) > self.capacity:
+                    oldest = min(buffer['entries'].items(), key=lambda item: (item[1][0], item[0]))
+                    del buffer['entries'][oldest[0]]
+                    buffer['complete'] = False
+
+    def page(self, opportunity_type=None, limit=20, after=None):
+        """
+        Serve one page from memory
+
+        Args:
+            opportunity_type: Type to list (None for all types)
+            limit: Page size
+            after: Optional (cached_at, opportunity_id) of the last item of the previous page
+
+        Returns:
+            (items, has_more) where items are (opportunity_id, cached_at, data) tuples,
+            or None if the buffer cannot answer (not primed, expired, or the page
+            runs past what it holds)
+        """
+        with self._lock:
+            buffer = self._fresh_buffer(opportunity_type or self.ALL)
+            if buffer is None:
+                self.misses += 1
+                return None
+
+            ordered = sorted(
+                ((opp_id, cached_at, data) for opp_id, (cached_at, data) in buffer['entries'].items()),
+                key=lambda row: (row[1], row[0]),
+                reverse=True
+            )
+            if after is not None:
+                ordered = [row for row in ordered if (row[1], row[0]) < after]
+
+            if len(ordered) <= limit and not buffer['complete']:
+                # Older opportunities exist beyond the buffer - let the datastore answer
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return ordered[:limit], len(ordered) > limit
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': 'recent_feed',
+                'buffers': {key: len(buffer['entries']) for key, buffer in self._buffers.items()},
+                'capacity': self.capacity,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _fresh_buffer(self, key):
+        buffer = self._buffers.get(key)
+        if buffer is None or time.monotonic() - buffer['primed_at'] > self.ttl:
+            return None
+        return buffer
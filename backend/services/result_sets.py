@@ -0,0 +1,169 @@
+"""
+Result Sets - Ranked search results kept under a search_id, so every page is sliced from the same list
+"""
+
+import base64
+import json
+import re
+import secrets
+import time
+
+from .date_extraction import parse_date
+
+
+YEAR_PATTERN = re.compile(r'\b(20\d{2})\b')
+
+
+def opportunity_year(opportunity):
+    """
+    Year an opportunity belongs to: its deadline's year, else the first year in its title
+
+    Returns:
+        Year as a string (e.g. "2027"), or None if neither gives one
+    """
+    deadline = parse_date(opportunity.get('deadline'))
+    if deadline is not None:
+        return str(deadline.year)
+    match = YEAR_PATTERN.search(opportunity.get('title') or '')
+    return match.group(1) if match else None
+
+
+def matches_filters(opportunity, opportunity_type=None, year=None):
+    """
+    True if an opportunity passes the search type and year filters
+
+    Args:
+        opportunity_type: Lowercased type, or None for any
+        year: Year as a string, or None for any
+    """
+    if opportunity_type and (opportunity.get('type') or '').lower() != opportunity_type:
+        return False
+    return not year or opportunity_year(opportunity) == year
+
+
+class ResultSets:
+    """
+    Search results stored for paging
+
+    A search's ranked opportunities are saved once under a random search_id.
+    Later pages are slices of that saved list, so they cost no Google
+    requests, no parsing and no datastore writes, and the order cannot shift
+    between pages when the search cache refreshes. Type and year filters are
+    applied to the saved list when a page is read.
+
+    Entries live in a SearchCache (memory or SQLite, see search_cache.py)
+    and expire `ttl` seconds after the search.
+    """
+
+    def __init__(self, store):
+        """
+        Args:
+            store: SearchCache holding the result sets (max_stale should be 0)
+        """
+        self.store = store
+        self.created = 0
+        self.pages_served = 0
+        self.expired = 0
+
+    @property
+    def ttl(self):
+        return self.store.ttl
+
+    def create(self, search_result, opportunity_type=None):
+        """
+        Save a search_opportunities result
+
+        Args:
+            search_result: Dictionary returned by OpportunityService.search_opportunities
+            opportunity_type: Type the search was run with
+
+        Returns:
+            New search_id
+        """
+        search_id = secrets.token_urlsafe(12)
+        self.store.store((search_id, None), {
+            'query': search_result['query'],
+            'type': opportunity_type,
+            'source': search_result['source'],
+            'results_at': time.time() - search_result['cache_age_seconds'],
+            'opportunities': search_result['opportunities']
+        })
+        self.created += 1
+        return search_id
+
+    def page(self, search_id, offset=0, limit=10, opportunity_type=None, year=None):
+        """
+        Read one page of a saved search
+
+        Args:
+            search_id: ID returned by create()
+            offset: Position of the first result in the filtered list
+            limit: Page size
+            opportunity_type: Only include opportunities of this type
+            year: Only include opportunities of this year (see opportunity_year)
+
+        Returns:
+            Dictionary with opportunities, total, offset, next_cursor and the
+            saved search's metadata, or None if the search_id has expired
+        """
+        entry = self.store.lookup((search_id, None))
+        if entry is None:
+            self.expired += 1
+            return None
+        saved_at, saved = entry
+
+        opportunity_type = (opportunity_type or '').lower() or None
+        year = str(year) if year else None
+        opportunities = saved['opportunities']
+        if opportunity_type or year:
+            opportunities = [opp for opp in opportunities if matches_filters(opp, opportunity_type, year)]
+
+        offset = max(offset, 0)
+        end = offset + limit
+        next_cursor = None
+        if end < len(opportunities):
+            next_cursor = self.encode_cursor(search_id, end, limit, opportunity_type, year)
+
+        self.pages_served += 1
+        return {
+            'opportunities': opportunities[offset:end],
+            'total': len(opportunities),
+            'offset': offset,
+            'next_cursor': next_cursor,
+            'search_id': search_id,
+            'query': saved['query'],
+            'source': saved['source'],
+            'cache_age_seconds': round(time.time() - saved['results_at'], 1),
+            'expires_in_seconds': round(max(saved_at + self.ttl - time.time(), 0), 1)
+        }
+
+    def stats(self):
+        return {
+            **self.store.stats(),
+            'created': self.created,
+            'pages_served': self.pages_served,
+            'expired': self.expired
+        }
+
+    @staticmethod
+    def encode_cursor(search_id, offset, limit, opportunity_type=None, year=None):
+        """Opaque cursor for the page of a saved search that starts at offset"""
+        raw = json.dumps({'s': search_id, 'o': offset, 'n': limit, 't': opportunity_type, 'y': year})
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Inverse of encode_cursor
+
+        Returns:
+            (search_id, offset, limit, opportunity_type, year)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return str(raw['s']), int(raw['o']), int(raw['n']), raw.get('t'), raw.get('y')
+        except Exception:
+            raise ValueError('Invalid cursor')
@@ -0,0 +1,297 @@
+"""
+Search Cache - Search results shared across requests (and worker processes) with stale-while-revalidate
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+from .cache import TTLCache
+from .storage_backend import decode_value, encode_value
+
+
+class SearchCache:
+    """
+    Base class for search result caches
+
+    An entry is fresh for `ttl` seconds after its search ran. After that it is
+    stale but still served for up to `max_stale` more seconds, while one
+    caller - the one that wins claim_refresh() - searches again in the
+    background and store()s the new results over it. Keys that are not
+    cached yet can be claimed too (see SearchWarmer).
+
+    Subclasses implement _read, _write, _claim and _release.
+    """
+
+    def __init__(self, ttl=3600, max_stale=86400, refresh_lease=60, name='searches'):
+        """
+        Args:
+            ttl: Seconds an entry is fresh
+            max_stale: Seconds past ttl a stale entry may still be served
+            refresh_lease: Seconds a refresh claim blocks other refreshers (covers crashed refreshes)
+            name: Label used in stats()
+        """
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.refresh_lease = refresh_lease
+        self.name = name
+
+        self._counter_lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def lookup(self, key):
+        """
+        Look up a search
+
+        Args:
+            key: (normalized query, opportunity type) tuple
+
+        Returns:
+            (searched_at, opportunities) or None if there is no usable entry
+        """
+        entry = self._read(key)
+        if entry is not None and time.time() - entry[0] > self.ttl + self.max_stale:
+            entry = None
+
+        with self._counter_lock:
+            if entry is None:
+                self.misses += 1
+            elif self.is_stale(entry[0]):
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def peek(self, key):
+        """
+        When a search was cached, without counting a lookup
+
+        Returns:
+            searched_at of the entry, or None if there is no usable entry
+        """
+        entry = self._read(key)
+        if entry is None or time.time() - entry[0] > self.ttl + self.max_stale:
+            return None
+        return entry[0]
+
+    def store(self, key, opportunities, searched_at=None):
+        """Replace the entry for a search (and release any refresh claim on it)"""
+        self._write(key, opportunities, time.time() if searched_at is None else searched_at)
+
+    def is_stale(self, searched_at):
+        return time.time() - searched_at > self.ttl
+
+    def claim_refresh(self, key):
+        """
+        Try to become the one caller that refreshes (or first fills) an entry
+
+        Returns:
+            True if the caller should refresh (and then store() or release_refresh())
+        """
+        claimed = self._claim(key, time.time())
+        if claimed:
+            with self._counter_lock:
+                self.refreshes += 1
+        return claimed
+
+    def release_refresh(self, key):
+        """Give up a refresh claim without storing (e.g. the search failed)"""
+        self._release(key)
+
+    def stats(self):
+        with self._counter_lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'name': self.name,
+                'backend': self.backend,
+                'size': self._size(),
+                'ttl_seconds': self.ttl,
+                'max_stale_seconds': self.max_stale,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'background_refreshes': self.refreshes,
+                'hit_rate': round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+            }
+
+    # Subclass primitives ----------------------------------------------------
+
+    backend = 'base'
+
+    def _read(self, key):
+        raise NotImplementedError
+
+    def _write(self, key, opportunities, searched_at):
+        raise NotImplementedError
+
+    def _claim(self, key, now):
+        raise NotImplementedError
+
+    def _release(self, key):
+        raise NotImplementedError
+
+    def _size(self):
+        raise NotImplementedError
+
+
+class MemorySearchCache(SearchCache):
+    """Per-process cache - each worker keeps (and refreshes) its own copy"""
+
+    backend = 'memory'
+
+    def __init__(self, max_entries=500, **options):
+        super().__init__(**options)
+        self._entries = TTLCache(max_size=max_entries, ttl=self.ttl + self.max_stale, name=self.name)
+        self._claims = {}  # key -> claimed_at
+        self._lock = threading.Lock()
+
+    def _read(self, key):
+        entry = self._entries.get(key)
+        return None if entry is TTLCache.MISSING else entry
+
+    def _write(self, key, opportunities, searched_at):
+        self._entries.set(key, (searched_at, opportunities))
+        self._release(key)
+
+    def _claim(self, key, now):
+        with self._lock:
+            claimed_at = self._claims.get(key)
+            if claimed_at is not None and now - claimed_at < self.refresh_lease:
+                return False
+            self._claims[key] = now
+            return True
+
+    def _release(self, key):
+        with self._lock:
+            self._claims.pop(key, None)
+
+    def _size(self):
+        return len(self._entries)
+
+
+class SQLiteSearchCache(SearchCache):
+    """
+    Cache in a SQLite file shared by every worker process on the host
+
+    Entries are replaced with a single INSERT OR REPLACE, so readers in other
+    processes see either the old or the new results, never a mix. Refresh
+    claims are rows of a side table taken with a conditional upsert, so only
+    one process refreshes a key at a time, whether or not it is cached yet.
+    """
+
+    backend = 'sqlite'
+
+    # Stores between trims of expired and excess entries
+    PRUNE_EVERY = 100
+
+    def __init__(self, path='./search_cache.sqlite3', max_entries=500, table='search_results', **options):
+        super().__init__(**options)
+        self.path = path
+        self.max_entries = max_entries
+        self.table = table
+
+        self._lock = threading.Lock()
+        self._stores = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {table} ('
+            '  cache_key TEXT PRIMARY KEY,'
+            '  opportunities TEXT NOT NULL,'
+            '  searched_at REAL NOT NULL'
+            ')'
+        )
+        self._conn.execute(f'CREATE INDEX IF NOT EXISTS {table}_age ON {table} (searched_at)')
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {table}_claims ('
+            '  cache_key TEXT PRIMARY KEY,'
+            '  claimed_at REAL NOT NULL'
+            ')'
+        )
+
+    @staticmethod
+    def _encode_key(key):
+        return json.dumps(list(key))
+
+    def _read(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT searched_at, opportunities FROM {self.table} WHERE cache_key = ?',
+                (self._encode_key(key),)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], decode_value(json.loads(row[1]))
+
+    def _write(self, key, opportunities, searched_at):
+        payload = json.dumps(encode_value(opportunities), default=str)
+        with self._lock:
+            self._conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (cache_key, opportunities, searched_at) VALUES (?, ?, ?)',
+                (self._encode_key(key), payload, searched_at)
+            )
+            self._conn.execute(f'DELETE FROM {self.table}_claims WHERE cache_key = ?', (self._encode_key(key),))
+            self._stores += 1
+            if self._stores % self.PRUNE_EVERY == 0:
+                self._prune()
+
+    def _claim(self, key, now):
+        with self._lock:
+            # Inserts a new claim, or takes over one whose lease ran out; otherwise changes nothing
+            cursor = self._conn.execute(
+                f'INSERT INTO {self.table}_claims (cache_key, claimed_at) VALUES (?, ?) '
+                'ON CONFLICT (cache_key) DO UPDATE SET claimed_at = excluded.claimed_at '
+                'WHERE claimed_at < ?',
+                (self._encode_key(key), now, now - self.refresh_lease)
+            )
+            return cursor.rowcount == 1
+
+    def _release(self, key):
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {self.table}_claims WHERE cache_key = ?', (self._encode_key(key),))
+
+    def _size(self):
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+
+    def _prune(self):
+        """Drop entries too old to serve, the oldest beyond max_entries and lapsed claims (caller holds the lock)"""
+        self._conn.execute(
+            f'DELETE FROM {self.table} WHERE searched_at < ?',
+            (time.time() - self.ttl - self.max_stale,)
+        )
+        self._conn.execute(
+            f'DELETE FROM {self.table} WHERE cache_key NOT IN '
+            f'(SELECT cache_key FROM {self.table} ORDER BY searched_at DESC LIMIT ?)',
+            (self.max_entries,)
+        )
+        self._conn.execute(
+            f'DELETE FROM {self.table}_claims WHERE claimed_at < ?',
+            (time.time() - self.refresh_lease,)
+        )
+
+
+def create_search_cache(backend, path=None, table='search_results', **options):
+    """
+    Build a search cache by backend name
+
+    Args:
+        backend: 'memory' (per process) or 'sqlite' (shared by all workers on the host)
+        path: Database file for the SQLite cache
+        table: SQLite table, so several caches can share one file
+        **options: max_entries, ttl, max_stale, refresh_lease, name
+
+    Returns:
+        SearchCache instance
+    """
+    backend = (backend or '').lower()
+    if backend == 'memory':
+        return MemorySearchCache(**options)
+    if backend == 'sqlite':
+        return SQLiteSearchCache(path or './search_cache.sqlite3', table=table, **options)
+    raise ValueError(f"Unknown search cache backend: {backend}")
@@ -0,0 +1,242 @@
+"""
+Search Warmer - Re-runs popular and suggested searches in the background so first clicks hit a warm cache
+"""
+
+import threading
+import time
+from datetime import date
+
+
+class SearchWarmer:
+    """
+    Keeps the search cache warm for the queries students are most likely to run
+
+    Every search is recorded with record(). A background thread wakes up every
+    `interval` seconds and warms, in order:
+
+    1. the general suggestion templates every student is shown
+    2. the `top_n` most popular recorded queries
+    3. the branch-specific suggestion templates
+
+    Warming a query means running the normal search (Google fetch, parse,
+    store, cache fill) if its cache entry is missing or will go stale before
+    the next run. Queries the local opportunity index can already answer are
+    skipped, and so are queries another worker has claimed (claims are shared
+    between workers with SEARCH_CACHE_BACKEND=sqlite). Only the Google
+    requests the warmer's own searches send are counted against
+    `daily_budget` per calendar day, and a run stops when the next search
+    could exceed it.
+
+    Popularity counts are halved after every run, so queries that are no
+    longer searched drop out of the top N.
+    """
+
+    # Wait after start() before the first run, so startup is not slowed down
+    STARTUP_DELAY = 15
+
+    # Most queries whose popularity is tracked
+    MAX_TRACKED = 1000
+
+    def __init__(self, opportunity_service, general_templates=(), branch_templates=(), interval=1800,
+                 top_n=20, daily_budget=40):
+        """
+        Args:
+            opportunity_service: OpportunityService whose searches are warmed
+            general_templates: Suggestions shown to every student (warmed first)
+            branch_templates: Branch-specific suggestions (warmed after popular queries)
+            interval: Seconds between runs
+            top_n: Popular queries warmed per run
+            daily_budget: Google Custom Search requests the warmer may use per day
+        """
+        self.opportunities = opportunity_service
+        self.general_templates = list(dict.fromkeys(general_templates))
+        self.branch_templates = list(dict.fromkeys(branch_templates))
+        self.interval = interval
+        self.top_n = top_n
+        self.daily_budget = daily_budget
+
+        self._popularity = {}  # (query, type) -> decayed search count
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._budget_day = date.today()
+        self.requests_today = 0
+        self.runs = 0
+        self.warmed = 0
+        self.skipped_fresh = 0
+        self.skipped_local = 0
+        self.skipped_claimed = 0
+        self.failed = 0
+        self.last_run_at = None
+
+    # ========================================================================
+    # LIFECYCLE
+    # ========================================================================
+
+    def start(self):
+        """Start the background thread (no-op without Google API credentials)"""
+        if self._thread is not None:
+            return
+        if not self.opportunities.search_api_keys or not self.opportunities.search_engine_id:
+            print("⚠️  Search warmer disabled: Google Search API credentials not configured")
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='search-warmer', daemon=True)
+        self._thread.start()
+        templates = len(self.general_templates) + len(self.branch_templates)
+        print(f"✓ Search warmer started ({templates} templates + top {self.top_n} queries "
+              f"every {self.interval:.0f}s, {self.daily_budget} requests/day)")
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    # ========================================================================
+    # POPULARITY
+    # ========================================================================
+
+    def record(self, query, opportunity_type=None):
+        """Count one search for a query (case- and whitespace-insensitive)"""
+        key = (' '.join(query.lower().split()), (opportunity_type or '').lower() or None)
+        if not key[0]:
+            return
+        with self._lock:
+            self._popularity[key] = self._popularity.get(key, 0.0) + 1.0
+
+            if len(self._popularity) > self.MAX_TRACKED:
+                least = min(self._popularity, key=self._popularity.get)
+                del self._popularity[least]
+
+    def popular(self, limit=None):
+        """
+        Most searched queries
+
+        Returns:
+            List of ((query, opportunity_type), decayed count), most popular first
+        """
+        with self._lock:
+            ranked = sorted(self._popularity.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit] if limit is not None else ranked
+
+    # ========================================================================
+    # WARMING
+    # ========================================================================
+
+    def run_once(self):
+        """
+        Warm every target that needs it, within today's budget
+
+        Returns:
+            Number of searches run against Google
+        """
+        self._roll_budget()
+        self.runs += 1
+        self.last_run_at = time.time()
+        warmed = 0
+
+        cost = len(self.opportunities.SEARCH_PAGES)
+        for query, opportunity_type in self._targets():
+            if self._stop.is_set():
+                break
+            if self.requests_today + cost > self.daily_budget:
+                print(f"⚠️  Search warmer budget used ({self.requests_today}/{self.daily_budget} today)")
+                break
+
+            try:
+                outcome, requests_sent = self.opportunities.warm_search(
+                    query, opportunity_type, fresh_for=self.interval
+                )
+            except Exception as e:
+                print(f"❌ Search warmer failed for '{query}': {e}")
+                self.failed += 1
+                # How many requests went out is unknown; charge a full search
+                outcome, requests_sent = None, cost
+            self.requests_today += requests_sent
+
+            if outcome == 'warmed':
+                self.warmed += 1
+                warmed += 1
+            elif outcome == 'fresh':
+                self.skipped_fresh += 1
+            elif outcome == 'local':
+                self.skipped_local += 1
+            elif outcome == 'claimed':
+                self.skipped_claimed += 1
+
+        self._decay()
+        if warmed:
+            print(f"✓ Search warmer refreshed {warmed} searches ({self.requests_today}/{self.daily_budget} "
+                  f"requests today)")
+        return warmed
+
+    def stats(self):
+        with self._lock:
+            tracked = len(self._popularity)
+        return {
+            'name': 'search_warmer',
+            'running': self._thread is not None,
+            'templates': len(self.general_templates) + len(self.branch_templates),
+            'tracked_queries': tracked,
+            'top_queries': [
+                {'query': query, 'type': opportunity_type, 'score': round(score, 2)}
+                for (query, opportunity_type), score in self.popular(5)
+            ],
+            'runs': self.runs,
+            'warmed': self.warmed,
+            'skipped_fresh': self.skipped_fresh,
+            'skipped_local': self.skipped_local,
+            'skipped_claimed': self.skipped_claimed,
+            'failed': self.failed,
+            'requests_today': self.requests_today,
+            'daily_budget': self.daily_budget,
+            'last_run_age_seconds': round(time.time() - self.last_run_at, 1) if self.last_run_at else None
+        }
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    def _loop(self):
+        if self._stop.wait(self.STARTUP_DELAY):
+            return
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"❌ Search warmer run failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def _targets(self):
+        """(query, type) pairs to warm this run, most important first, without duplicates"""
+        targets = [(query, None) for query in self.general_templates]
+        targets += [key for key, _ in self.popular(self.top_n)]
+        targets += [(query, None) for query in self.branch_templates]
+
+        seen = set()
+        unique = []
+        for query, opportunity_type in targets:
+            normalized = (' '.join(query.lower().split()), opportunity_type)
+            if normalized not in seen:
+                seen.add(normalized)
+                unique.append((query, opportunity_type))
+        return unique
+
+    def _decay(self):
+        """Halve every popularity count and forget queries that fall below one half"""
+        with self._lock:
+            self._popularity = {
+                key: count / 2 for key, count in self._popularity.items() if count / 2 >= 0.5
+            }
+
+    def _roll_budget(self):
+        """Reset the request count when the day changes"""
+        today = date.today()
+        if today != self._budget_day:
+            self._budget_day = today
+            self.requests_today = 0
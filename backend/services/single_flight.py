@@ -0,0 +1,82 @@
+"""
+Single Flight - Coalesces concurrent identical calls into one
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time
+
+    The first caller for a key (the leader) runs the function. Callers that
+    arrive with the same key while it is running wait on the leader's future
+    and receive the same result - or the same exception. Once the call
+    finishes the key is forgotten, so later callers start a new call.
+    """
+
+    def __init__(self, name='single_flight'):
+        self.name = name
+
+        self._calls = {}  # key -> Future of the in-flight call
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, function, *args, **kwargs):
+        """
+        Call function(*args, **kwargs), or wait for the in-flight call with the same key
+
+        Returns:
+            (result, shared) where shared is True if another caller's result was reused
+        """
+        future = self.begin(key)
+        if future is not None:
+            return future.result(), True
+
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, exception=e)
+            raise
+        self.finish(key, result)
+        return result, False
+
+    def begin(self, key):
+        """
+        Become the leader for a key without handing over a function
+
+        For leaders that produce their result piece by piece (e.g. a streamed
+        search). The leader must call finish() exactly once.
+
+        Returns:
+            None if the caller is the leader, else the in-flight call's Future
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future
+            self._calls[key] = Future()
+            self.calls += 1
+            return None
+
+    def finish(self, key, result=None, exception=None):
+        """Publish the leader's result (or exception) to waiting callers and forget the key"""
+        with self._lock:
+            future = self._calls.pop(key)
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'in_flight': len(self._calls),
+                'calls': self.calls,
+                'shared': self.shared
+            }
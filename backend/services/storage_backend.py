@@ -0,0 +1,966 @@
+"""
+Storage Backend - Local, Firestore-compatible document stores
+
+Implements the subset of the Firestore client API the services actually use
+(collection/document references, where/order_by/limit queries, stream, get_all,
+batched writes and collection snapshot listeners) on top of pluggable local engines. FirebaseService hands one
+of these out as `db` when DATASTORE_BACKEND is 'memory' or 'sqlite', so every
+service keeps calling `db.collection(...)` unchanged.
+"""
+
+import base64
+import copy
+import json
+import queue
+import secrets
+import sqlite3
+import string
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from firebase_admin import firestore
+from google.api_core import exceptions as google_exceptions
+from google.cloud.firestore_v1.watch import ChangeType, DocumentChange
+
+
+AUTO_ID_ALPHABET = string.ascii_letters + string.digits
+
+# Firestore's cross-type ordering: null < bool < number < timestamp < string < bytes < array < map
+_TYPE_ORDER = [
+    (type(None), 0),
+    (bool, 1),
+    ((int, float), 2),
+    (datetime, 3),
+    (str, 4),
+    (bytes, 5),
+    ((list, tuple), 7),
+    (dict, 8),
+]
+
+# The Python client spells these with underscores; the REST API and other SDKs with hyphens
+_OPERATOR_ALIASES = {'array_contains': 'array-contains', 'array_contains_any': 'array-contains-any'}
+
+
+def generate_document_id():
+    """Generate a 20 character ID in the same alphabet as Firestore auto IDs"""
+    return ''.join(secrets.choice(AUTO_ID_ALPHABET) for _ in range(20))
+
+
+# ============================================================================
+# VALUE ENCODING (JSON-safe representation of Firestore values)
+# ============================================================================
+
+def encode_value(value):
+    """Convert a Firestore value into a JSON-serializable structure"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, dict):
+        return {key: encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    if hasattr(value, 'path') and hasattr(value, 'id') and hasattr(value, 'get'):
+        # Document references are stored by path
+        return {'__reference__': value.path}
+    return value
+
+
+def decode_value(value):
+    """Inverse of encode_value (references come back as their path string)"""
+    if isinstance(value, dict):
+        if len(value) == 1:
+            if '__datetime__' in value:
+                return datetime.fromisoformat(value['__datetime__'])
+            if '__bytes__' in value:
+                return base64.b64decode(value['__bytes__'])
+            if '__reference__' in value:
+                return value['__reference__']
+        return {key: decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    return value
+
+
+# ============================================================================
+# FIELD PATH HELPERS
+# ============================================================================
+
+def _split_path(field_path):
+    return field_path.split('.') if isinstance(field_path, str) else list(field_path)
+
+
+def get_field(data, field_path):
+    """Return (found, value) for a dotted field path"""
+    node = data
+    for part in _split_path(field_path):
+        if not isinstance(node, dict) or part not in node:
+            return False, None
+        node = node[part]
+    return True, node
+
+
+def project_fields(data, field_paths):
+    """Return a copy of data containing only the given field paths"""
+    if data is None or field_paths is None:
+        return data
+    projected = {}
+    for field_path in field_paths:
+        found, value = get_field(data, field_path)
+        if not found:
+            continue
+        parts = _split_path(field_path)
+        node = projected
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = copy.deepcopy(value)
+    return projected
+
+
+def _resolve_value(value, current=None):
+    """Materialize Firestore sentinels/transforms against the current value"""
+    if value is firestore.SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc)
+    if isinstance(value, firestore.Increment):
+        base = current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0
+        return base + value.value
+    if isinstance(value, firestore.ArrayUnion):
+        merged = list(current) if isinstance(current, list) else []
+        merged.extend(item for item in value.values if item not in merged)
+        return merged
+    if isinstance(value, firestore.ArrayRemove):
+        existing = list(current) if isinstance(current, list) else []
+        return [item for item in existing if item not in value.values]
+    if isinstance(value, dict):
+        return {
+            key: _resolve_value(item)
+            for key, item in value.items()
+            if item is not firestore.DELETE_FIELD
+        }
+    if isinstance(value, (list, tuple)):
+        return [_resolve_value(item) for item in value]
+    return copy.deepcopy(value)
+
+
+def _assign(target, parts, value):
+    node = target
+    for part in parts[:-1]:
+        child = node.get(part)
+        if not isinstance(child, dict):
+            child = {}
+            node[part] = child
+        node = child
+    leaf = parts[-1]
+    if value is firestore.DELETE_FIELD:
+        node.pop(leaf, None)
+    else:
+        node[leaf] = _resolve_value(value, node.get(leaf))
+
+
+def _merge(target, data):
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            _assign(target, [key], value)
+
+
+def apply_write(current, op, data=None, merge=False):
+    """
+    Compute the new state of a document for a single write
+
+    Args:
+        current: Existing document data (None if it does not exist)
+        op: 'set', 'create', 'update' or 'delete'
+        data: Write payload
+        merge: For 'set', merge into the existing document
+
+    Returns:
+        New document data, or None if the document is deleted
+    """
+    if op == 'delete':
+        return None
+    if op == 'create' and current is not None:
+        raise google_exceptions.AlreadyExists('Document already exists')
+    if op == 'update':
+        if current is None:
+            raise google_exceptions.NotFound('No document to update')
+        updated = copy.deepcopy(current)
+        for field_path, value in data.items():
+            _assign(updated, _split_path(field_path), value)
+        return updated
+    if op == 'set' and merge and current is not None:
+        merged = copy.deepcopy(current)
+        _merge(merged, data)
+        return merged
+    document = {}
+    for key, value in data.items():
+        _assign(document, [key], value)
+    return document
+
+
+# ============================================================================
+# QUERY EVALUATION
+# ============================================================================
+
+def _type_rank(value):
+    for types, rank in _TYPE_ORDER:
+        if isinstance(value, types):
+            return rank
+    return 9
+
+
+def _compare(left, right):
+    """Three-way comparison following Firestore's cross-type ordering"""
+    left_rank, right_rank = _type_rank(left), _type_rank(right)
+    if left_rank != right_rank:
+        return -1 if left_rank < right_rank else 1
+    if left_rank == 7:
+        # Arrays compare element by element, then by length
+        for left_item, right_item in zip(left, right):
+            result = _compare(left_item, right_item)
+            if result:
+                return result
+        return (len(left) > len(right)) - (len(left) < len(right))
+    if left_rank == 8:
+        left, right = json.dumps(encode_value(left), sort_keys=True), json.dumps(encode_value(right), sort_keys=True)
+    if isinstance(left, datetime) and isinstance(right, datetime):
+        if (left.tzinfo is None) != (right.tzinfo is None):
+            left, right = left.replace(tzinfo=None), right.replace(tzinfo=None)
+    if left == right:
+        return 0
+    return -1 if left < right else 1
+
+
+def _reference_id(value):
+    return getattr(value, 'id', None) or str(value).split('/')[-1]
+
+
+def _field_value(doc_id, data, field_path):
+    if field_path == '__name__':
+        return True, doc_id
+    return get_field(data, field_path)
+
+
+def matches_filter(doc_id, data, field_path, op, value):
+    """Evaluate a single Firestore field filter against a document"""
+    op = _OPERATOR_ALIASES.get(op, op)
+    found, current = _field_value(doc_id, data, field_path)
+    if not found:
+        return False
+    if field_path == '__name__':
+        value = [_reference_id(v) for v in value] if op in ('in', 'not-in') else _reference_id(value)
+
+    try:
+        if op == '==':
+            return _compare(current, value) == 0
+        if op == '!=':
+            return _compare(current, value) != 0
+        if op in ('<', '<=', '>', '>='):
+            # Range filters only match values of the same type
+            if _type_rank(current) != _type_rank(value):
+                return False
+            result = _compare(current, value)
+            return {'<': result < 0, '<=': result <= 0, '>': result > 0, '>=': result >= 0}[op]
+        if op == 'in':
+            return any(_compare(current, candidate) == 0 for candidate in value)
+        if op == 'not-in':
+            return all(_compare(current, candidate) != 0 for candidate in value)
+        if op == 'array-contains':
+            return isinstance(current, list) and any(_compare(item, value) == 0 for item in current)
+        if op == 'array-contains-any':
+            return isinstance(current, list) and any(
+                _compare(item, candidate) == 0 for item in current for candidate in value
+            )
+    except TypeError:
+        return False
+
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+class _SortKey:
+    """Orders (doc_id, data) rows by a list of (field_path, direction) pairs"""
+
+    __slots__ = ('values', 'directions')
+
+    def __init__(self, values, directions):
+        self.values = values
+        self.directions = directions
+
+    def compare(self, other_values):
+        for value, other, direction in zip(self.values, other_values, self.directions):
+            result = _compare(value, other)
+            if result:
+                return -result if direction == firestore.Query.DESCENDING else result
+        return 0
+
+    def __lt__(self, other):
+        return self.compare(other.values) < 0
+
+
+# ============================================================================
+# FIRESTORE-STYLE CLIENT OBJECTS
+# ============================================================================
+
+class LocalDocumentSnapshot:
+    """Mirror of firestore.DocumentSnapshot"""
+
+    def __init__(self, reference, data):
+        self.reference = reference
+        self._data = data
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path):
+        found, value = get_field(self._data or {}, field_path)
+        if not found:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class LocalQuery:
+    """Immutable query over one collection, mirroring firestore.Query"""
+
+    ASCENDING = firestore.Query.ASCENDING
+    DESCENDING = firestore.Query.DESCENDING
+
+    def __init__(self, backend, collection_path, filters=(), orders=(), limit=None,
+                 offset=0, start=None, end=None, projection=None):
+        self._backend = backend
+        self._collection_path = collection_path
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._offset = offset
+        self._start = start
+        self._end = end
+        self._projection = projection
+
+    def _copy(self, **changes):
+        state = {
+            'filters': self._filters,
+            'orders': self._orders,
+            'limit': self._limit,
+            'offset': self._offset,
+            'start': self._start,
+            'end': self._end,
+            'projection': self._projection,
+        }
+        state.update(changes)
+        return LocalQuery(self._backend, self._collection_path, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            if not hasattr(filter, 'op_string'):
+                raise NotImplementedError("Composite filters are not supported by local backends")
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((str(field_path), op_string, value),))
+
+    def order_by(self, field_path, direction=firestore.Query.ASCENDING):
+        direction = str(direction).upper()
+        return self._copy(orders=self._orders + ((str(field_path), direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def offset(self, num_to_skip):
+        return self._copy(offset=num_to_skip)
+
+    def select(self, field_paths):
+        return self._copy(projection=list(field_paths))
+
+    def start_at(self, document_fields_or_snapshot):
+        return self._copy(start=(document_fields_or_snapshot, True))
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(start=(document_fields_or_snapshot, False))
+
+    def end_at(self, document_fields_or_snapshot):
+        return self._copy(end=(document_fields_or_snapshot, True))
+
+    def end_before(self, document_fields_or_snapshot):
+        return self._copy(end=(document_fields_or_snapshot, False))
+
+    def _cursor_values(self, cursor, orders):
+        if isinstance(cursor, LocalDocumentSnapshot):
+            data = cursor.to_dict() or {}
+            return [_field_value(cursor.id, data, field)[1] for field, _ in orders]
+        values = []
+        for field, _ in orders:
+            if field not in cursor:
+                break
+            value = cursor[field]
+            values.append(_reference_id(value) if field == '__name__' else value)
+        return values
+
+    def _run(self):
+        equals = [
+            (field, value) for field, op, value in self._filters
+            if op == '==' and field != '__name__' and isinstance(value, (str, int, float, bool))
+        ]
+        rows = [
+            (doc_id, data)
+            for doc_id, data in self._backend._scan(self._collection_path, equals)
+            if all(matches_filter(doc_id, data, field, op, value) for field, op, value in self._filters)
+        ]
+
+        # Documents missing an order_by field are excluded, as in Firestore
+        orders = list(self._orders)
+        rows = [row for row in rows if all(_field_value(row[0], row[1], field)[0] for field, _ in orders)]
+        if not any(field == '__name__' for field, _ in orders):
+            last_direction = orders[-1][1] if orders else self.ASCENDING
+            orders.append(('__name__', last_direction))
+        directions = [direction for _, direction in orders]
+
+        keyed = [
+            (_SortKey([_field_value(doc_id, data, field)[1] for field, _ in orders], directions), doc_id, data)
+            for doc_id, data in rows
+        ]
+        keyed.sort(key=lambda item: item[0])
+
+        if self._start is not None:
+            cursor, inclusive = self._start
+            values = self._cursor_values(cursor, orders)
+            keyed = [
+                item for item in keyed
+                if (item[0].compare(values) >= 0 if inclusive else item[0].compare(values) > 0)
+            ]
+        if self._end is not None:
+            cursor, inclusive = self._end
+            values = self._cursor_values(cursor, orders)
+            keyed = [
+                item for item in keyed
+                if (item[0].compare(values) <= 0 if inclusive else item[0].compare(values) < 0)
+            ]
+
+        keyed = keyed[self._offset:]
+        if self._limit is not None:
+            keyed = keyed[:self._limit]
+
+        collection = LocalCollectionReference(self._backend, self._collection_path)
+        for _, doc_id, data in keyed:
+            yield LocalDocumentSnapshot(collection.document(doc_id), project_fields(data, self._projection))
+
+    def stream(self, transaction=None):
+        return self._run()
+
+    def get(self, transaction=None):
+        return list(self._run())
+
+
+class LocalCollectionReference(LocalQuery):
+    """Mirror of firestore.CollectionReference"""
+
+    def __init__(self, backend, collection_path):
+        super().__init__(backend, collection_path)
+
+    @property
+    def id(self):
+        return self._collection_path.split('/')[-1]
+
+    def document(self, document_id=None):
+        return LocalDocumentReference(self._backend, self._collection_path, document_id or generate_document_id())
+
+    def add(self, document_data, document_id=None):
+        doc_ref = self.document(document_id)
+        doc_ref.create(document_data)
+        return datetime.now(timezone.utc), doc_ref
+
+    def list_documents(self, page_size=None):
+        for doc_id, _ in self._backend._scan(self._collection_path, []):
+            yield self.document(doc_id)
+
+    def on_snapshot(self, callback):
+        return self._backend.watch_collection(self._collection_path, callback)
+
+
+class LocalDocumentReference:
+    """Mirror of firestore.DocumentReference"""
+
+    def __init__(self, backend, collection_path, document_id):
+        self._backend = backend
+        self._collection_path = collection_path
+        self.id = document_id
+
+    @property
+    def path(self):
+        return f"{self._collection_path}/{self.id}"
+
+    @property
+    def parent(self):
+        return LocalCollectionReference(self._backend, self._collection_path)
+
+    def collection(self, collection_id):
+        return LocalCollectionReference(self._backend, f"{self.path}/{collection_id}")
+
+    def get(self, field_paths=None, transaction=None):
+        data = self._backend._read(self._collection_path, self.id)
+        return LocalDocumentSnapshot(self, project_fields(data, field_paths))
+
+    def set(self, document_data, merge=False):
+        return self._backend.commit_writes([('set', self, document_data, merge)])[0]
+
+    def create(self, document_data):
+        return self._backend.commit_writes([('create', self, document_data, False)])[0]
+
+    def update(self, field_updates):
+        return self._backend.commit_writes([('update', self, field_updates, False)])[0]
+
+    def delete(self):
+        return self._backend.commit_writes([('delete', self, None, False)])[0]
+
+    def __eq__(self, other):
+        return isinstance(other, LocalDocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+
+class LocalWriteBatch:
+    """Mirror of firestore.WriteBatch - all writes commit atomically"""
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(('set', reference, document_data, merge))
+        return self
+
+    def create(self, reference, document_data):
+        self._writes.append(('create', reference, document_data, False))
+        return self
+
+    def update(self, reference, field_updates):
+        self._writes.append(('update', reference, field_updates, False))
+        return self
+
+    def delete(self, reference):
+        self._writes.append(('delete', reference, None, False))
+        return self
+
+    def __len__(self):
+        return len(self._writes)
+
+    def commit(self):
+        writes, self._writes = self._writes, []
+        return self._backend.commit_writes(writes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+
+
+class LocalWatch:
+    """
+    Mirror of firestore Watch for a collection listener
+
+    As with Firestore, the callback receives (documents, changes, read_time)
+    on a background thread: first every existing document as ADDED, then
+    only the documents each commit added, modified or removed.
+    """
+
+    def __init__(self, backend, collection_path, callback):
+        self._backend = backend
+        self.collection_path = collection_path
+        self._callback = callback
+        self._known = {}  # doc_id -> data as last delivered
+        self._pushed = False
+        self._active = True
+
+    @property
+    def is_active(self):
+        return self._active
+
+    def unsubscribe(self):
+        self._active = False
+        self._backend._remove_watch(self)
+
+    def _deliver(self, updates, complete=False):
+        """
+        Diff updates against the documents already delivered and invoke the callback
+
+        Args:
+            updates: (doc_id, data) pairs, data None for deleted documents
+            complete: updates holds the whole collection, so known documents missing from it were deleted
+        """
+        collection = LocalCollectionReference(self._backend, self.collection_path)
+        changes = []
+        seen = set()
+
+        for doc_id, data in updates:
+            seen.add(doc_id)
+            previous = self._known.get(doc_id)
+            if data is None:
+                if previous is not None:
+                    del self._known[doc_id]
+                    changes.append((ChangeType.REMOVED, doc_id, previous))
+            elif previous != data:
+                self._known[doc_id] = data
+                changes.append((ChangeType.MODIFIED if previous is not None else ChangeType.ADDED, doc_id, data))
+
+        if complete:
+            for doc_id in [doc_id for doc_id in self._known if doc_id not in seen]:
+                changes.append((ChangeType.REMOVED, doc_id, self._known.pop(doc_id)))
+
+        # The first snapshot is always delivered, even for an empty collection
+        if not changes and self._pushed:
+            return
+        self._pushed = True
+
+        documents = [
+            LocalDocumentSnapshot(collection.document(doc_id), data) for doc_id, data in self._known.items()
+        ]
+        document_changes = [
+            DocumentChange(change_type, LocalDocumentSnapshot(collection.document(doc_id), data), -1, -1)
+            for change_type, doc_id, data in changes
+        ]
+        self._callback(documents, document_changes, datetime.now(timezone.utc))
+
+
+# ============================================================================
+# STORAGE ENGINES
+# ============================================================================
+
+class StorageBackend:
+    """
+    Base class for local document stores
+
+    Subclasses implement four primitives (_read, _scan, _store, _transaction),
+    and may override _scan_page with an indexed ID-order read;
+    everything else - references, queries, batches, listeners - is shared and
+    behaves like the Firestore client, including SERVER_TIMESTAMP/Increment/
+    ArrayUnion transforms and NotFound/AlreadyExists preconditions.
+
+    Listener notifications are queued while the commit still holds the lock,
+    so one dispatcher thread delivers them in commit order.
+    """
+
+    name = 'local'
+
+    # Seconds between checks for writes made by other processes (see _external_version)
+    poll_interval = 1.0
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._watches = []
+        self._notifications = None  # Queue of (watch, updates, complete), created with the dispatcher
+
+    # Engine primitives ------------------------------------------------------
+
+    def _read(self, collection_path, doc_id):
+        """Return document data or None"""
+        raise NotImplementedError
+
+    def _scan(self, collection_path, equals):
+        """Yield (doc_id, data) for a collection; `equals` is an optional pushdown hint"""
+        raise NotImplementedError
+
+    def _scan_page(self, collection_path, after, limit):
+        """Return up to limit (doc_id, data) rows in document-ID order with IDs after `after`"""
+        rows = sorted(
+            (row for row in self._scan(collection_path, []) if after is None or row[0] > after),
+            key=lambda row: row[0]
+        )
+        return rows[:limit]
+
+    def _store(self, collection_path, doc_id, data):
+        """Persist data for a document (None deletes it)"""
+        raise NotImplementedError
+
+    @contextmanager
+    def _transaction(self):
+        yield
+
+    def _external_version(self):
+        """Token that changes when another process writes, or None if that cannot happen"""
+        return None
+
+    # Firestore client surface -----------------------------------------------
+
+    def collection(self, collection_path):
+        return LocalCollectionReference(self, collection_path)
+
+    def document(self, document_path):
+        collection_path, _, doc_id = document_path.rpartition('/')
+        return LocalDocumentReference(self, collection_path, doc_id)
+
+    def batch(self):
+        return LocalWriteBatch(self)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        for reference in references:
+            yield reference.get(field_paths=field_paths)
+
+    def iter_documents(self, collection_path, after=None, page_size=500):
+        """
+        Yield (doc_id, data) for every document of a collection in ID order
+
+        Bulk readers (e.g. datastore_dump) use this instead of paging a query
+        with start_after(), which re-scans and re-sorts the whole collection
+        for every page.
+
+        Args:
+            collection_path: Collection to read
+            after: Only yield documents whose ID sorts after this one
+            page_size: Documents read from the engine at a time
+        """
+        while True:
+            rows = self._scan_page(collection_path, after, page_size)
+            yield from rows
+            if len(rows) < page_size:
+                return
+            after = rows[-1][0]
+
+    def commit_writes(self, writes):
+        """
+        Apply a list of (op, reference, data, merge) writes atomically
+
+        Preconditions are checked for every write before anything is stored.
+        """
+        with self._lock, self._transaction():
+            pending = {}
+            for op, reference, data, merge in writes:
+                key = (reference._collection_path, reference.id)
+                current = pending[key] if key in pending else self._read(*key)
+                pending[key] = apply_write(current, op, data, merge)
+            for (collection_path, doc_id), data in pending.items():
+                self._store(collection_path, doc_id, data)
+            if self._watches:
+                self._notify(pending)
+        now = datetime.now(timezone.utc)
+        return [now for _ in writes]
+
+    def close(self):
+        with self._lock:
+            self._watches = []
+
+    # Listeners --------------------------------------------------------------
+
+    def watch_collection(self, collection_path, callback):
+        """
+        Listen to every document of a collection (CollectionReference.on_snapshot)
+
+        Returns:
+            LocalWatch; call unsubscribe() to stop listening
+        """
+        watch = LocalWatch(self, collection_path, callback)
+        with self._lock:
+            if self._notifications is None:
+                self._notifications = queue.Queue()
+                threading.Thread(target=self._dispatch, name='local-listeners', daemon=True).start()
+            self._watches.append(watch)
+            self._notifications.put((watch, list(self._scan(collection_path, [])), True))
+        return watch
+
+    def _remove_watch(self, watch):
+        with self._lock:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+    def _notify(self, pending):
+        """Queue committed documents for the listeners of their collections (caller holds the lock)"""
+        for watch in self._watches:
+            updates = [
+                (doc_id, data) for (collection_path, doc_id), data in pending.items()
+                if collection_path == watch.collection_path
+            ]
+            if updates:
+                self._notifications.put((watch, updates, False))
+
+    def _dispatch(self):
+        """Deliver queued notifications; periodically rescan if another process wrote"""
+        with self._lock:
+            version = self._external_version()
+        last_poll = time.monotonic()
+
+        while True:
+            try:
+                watch, updates, complete = self._notifications.get(timeout=self.poll_interval)
+                if watch.is_active:
+                    watch._deliver(updates, complete)
+            except queue.Empty:
+                pass
+            except Exception as e:
+                print(f"❌ Snapshot listener failed for {watch.collection_path}: {e}")
+
+            if time.monotonic() - last_poll >= self.poll_interval:
+                last_poll = time.monotonic()
+                try:
+                    version = self._poll_external(version)
+                except Exception as e:
+                    print(f"⚠️  Could not check for external datastore writes: {e}")
+
+    def _poll_external(self, version):
+        """Queue a full rescan for every listener if another process wrote since version"""
+        with self._lock:
+            if not self._watches:
+                return version
+            current = self._external_version()
+            if current is None or current == version:
+                return current
+            for watch in self._watches:
+                self._notifications.put((watch, list(self._scan(watch.collection_path, [])), True))
+            return current
+
+
+class MemoryBackend(StorageBackend):
+    """Process-local dictionary store - fastest option for load tests"""
+
+    name = 'memory'
+
+    def __init__(self):
+        super().__init__()
+        self._collections = {}
+
+    def _read(self, collection_path, doc_id):
+        with self._lock:
+            data = self._collections.get(collection_path, {}).get(doc_id)
+            return copy.deepcopy(data)
+
+    def _scan(self, collection_path, equals):
+        with self._lock:
+            documents = list(self._collections.get(collection_path, {}).items())
+        for doc_id, data in documents:
+            yield doc_id, copy.deepcopy(data)
+
+    def iter_documents(self, collection_path, after=None, page_size=500):
+        # Sort the IDs once, then copy documents as they are consumed
+        with self._lock:
+            ids = sorted(doc_id for doc_id in self._collections.get(collection_path, {})
+                         if after is None or doc_id > after)
+        for doc_id in ids:
+            data = self._read(collection_path, doc_id)
+            if data is not None:
+                yield doc_id, data
+
+    def _store(self, collection_path, doc_id, data):
+        documents = self._collections.setdefault(collection_path, {})
+        if data is None:
+            documents.pop(doc_id, None)
+        else:
+            documents[doc_id] = data
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Single-file SQLite store - a persistent local mirror usable when Firestore
+    quota is exhausted. Equality filters are pushed down with json_extract.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path='./datastore.sqlite3'):
+        super().__init__()
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS documents ('
+            '  collection TEXT NOT NULL,'
+            '  doc_id TEXT NOT NULL,'
+            '  data TEXT NOT NULL,'
+            '  PRIMARY KEY (collection, doc_id)'
+            ')'
+        )
+
+    @staticmethod
+    def _json_path(field_path):
+        return '$' + ''.join(f'."{part}"' for part in _split_path(field_path))
+
+    def _read(self, collection_path, doc_id):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM documents WHERE collection = ? AND doc_id = ?',
+                (collection_path, doc_id)
+            ).fetchone()
+        return decode_value(json.loads(row[0])) if row else None
+
+    def _scan(self, collection_path, equals):
+        sql = 'SELECT doc_id, data FROM documents WHERE collection = ?'
+        params = [collection_path]
+        for field_path, value in equals:
+            sql += ' AND json_extract(data, ?) = ?'
+            params.extend([self._json_path(field_path), value])
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        for doc_id, data in rows:
+            yield doc_id, decode_value(json.loads(data))
+
+    def _scan_page(self, collection_path, after, limit):
+        # Keyset page on the (collection, doc_id) primary key
+        sql = 'SELECT doc_id, data FROM documents WHERE collection = ?'
+        params = [collection_path]
+        if after is not None:
+            sql += ' AND doc_id > ?'
+            params.append(after)
+        sql += ' ORDER BY doc_id LIMIT ?'
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(doc_id, decode_value(json.loads(data))) for doc_id, data in rows]
+
+    def _external_version(self):
+        # Changes whenever another connection (i.e. another worker process) commits
+        return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _store(self, collection_path, doc_id, data):
+        if data is None:
+            self._conn.execute(
+                'DELETE FROM documents WHERE collection = ? AND doc_id = ?',
+                (collection_path, doc_id)
+            )
+        else:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO documents (collection, doc_id, data) VALUES (?, ?, ?)',
+                (collection_path, doc_id, json.dumps(encode_value(data)))
+            )
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+    def close(self):
+        with self._lock:
+            super().close()
+            self._conn.close()
+
+
+def create_storage_backend(name, sqlite_path=None):
+    """
+    Build a local storage backend by name
+
+    Args:
+        name: 'memory' or 'sqlite'
+        sqlite_path: Database file for the SQLite backend
+
+    Returns:
+        StorageBackend instance
+    """
+    name = (name or '').lower()
+    if name == 'memory':
+        return MemoryBackend()
+    if name == 'sqlite':
+        return SQLiteBackend(sqlite_path or './datastore.sqlite3')
+    raise ValueError(f"Unknown storage backend: {name}")
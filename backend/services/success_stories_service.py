@@ -1,4 +1,5 @@
 """Success Stories Service - Inspire users with peer achievements"""
+import asyncio
 from datetime import datetime, timedelta
 import random
 
@@ -28,6 +29,20 @@ class SuccessStoriesService:
             # Fallback to synthetic stories
             return self._get_synthetic_success_stories(limit)
     
+    async def get_success_stories_async(self, user_id, limit=5):
+        """Async get_success_stories"""
+        try:
+            real_stories = await self._find_real_success_stories_async(user_id, limit)
+            
+            if len(real_stories) < limit:
+                return real_stories + self._get_synthetic_success_stories(limit - len(real_stories))
+            
+            return real_stories[:limit]
+        
+        except Exception as e:
+            print(f"Error fetching success stories: {str(e)}")
+            return self._get_synthetic_success_stories(limit)
+    
     def _find_real_success_stories(self, db, user_id, limit):
         """Find actual users who learned skills and achieved something"""
         stories = []
@@ -54,15 +69,13 @@ class SuccessStoriesService:
                     continue
                 
                 gami_data = gami_doc.to_dict()
-                achievements = gami_data.get('achievements', [])
-                points = gami_data.get('total_points', 0)
                 
                 # Check for applications/success
                 apps_query = db.collection('applications').where('user_id', '==', profile_user_id).where('status', '==', 'accepted').limit(1).stream()
                 has_success = len(list(apps_query)) > 0
                 
                 # Create story if user has shown growth
-                if len(skills) >= 2 and (points >= 800 or has_success or len(achievements) >= 5):
+                if self._shows_growth(skills, gami_data, has_success):
                     story = self._create_story_from_profile(profile_data, gami_data, skills, has_success)
                     stories.append(story)
                     
@@ -74,6 +87,73 @@ class SuccessStoriesService:
         
         return stories
     
+    async def _find_real_success_stories_async(self, user_id, limit):
+        """
+        Async _find_real_success_stories
+        
+        Instead of one gamification read and one applications query per
+        candidate in turn, all candidates' gamification documents come from one
+        batched read and the accepted-application queries run concurrently.
+        """
+        aio = self.firebase.async_service
+        stories = []
+        
+        try:
+            profile_rows = await aio.query('profiles', filters=[('skills', '>', [])], limit=50)
+            candidates = [
+                (profile_user_id, profile_data) for profile_user_id, profile_data in profile_rows
+                if profile_user_id != user_id and len(profile_data.get('skills', [])) >= 1
+            ]
+            
+            gamification = await aio.get_many('gamification', [doc_id for doc_id, _ in candidates])
+            
+            # An accepted application changes the story text, so every candidate that
+            # could be shown needs the check - i.e. those before the limit-th one that
+            # qualifies on points or achievements alone
+            needs_success_check = []
+            qualified = 0
+            for doc_id, profile_data in candidates:
+                if doc_id not in gamification or len(profile_data['skills']) < 2:
+                    continue
+                needs_success_check.append(doc_id)
+                if self._shows_growth(profile_data['skills'], gamification[doc_id], False):
+                    qualified += 1
+                    if qualified >= limit:
+                        break
+            
+            accepted = await asyncio.gather(*(
+                aio.query('applications',
+                          filters=[('user_id', '==', doc_id), ('status', '==', 'accepted')],
+                          limit=1, fields=['user_id'])
+                for doc_id in needs_success_check
+            ))
+            has_success = {doc_id: bool(rows) for doc_id, rows in zip(needs_success_check, accepted)}
+            
+            for doc_id, profile_data in candidates:
+                gami_data = gamification.get(doc_id)
+                if gami_data is None:
+                    continue
+                
+                skills = profile_data.get('skills', [])
+                success = has_success.get(doc_id, False)
+                if self._shows_growth(skills, gami_data, success):
+                    stories.append(self._create_story_from_profile(profile_data, gami_data, skills, success))
+                    
+                    if len(stories) >= limit:
+                        break
+        
+        except Exception as e:
+            print(f"Error finding real stories: {str(e)}")
+        
+        return stories
+    
+    @staticmethod
+    def _shows_growth(skills, gami_data, has_success):
+        """Whether a peer qualifies as a success story"""
+        points = gami_data.get('total_points', 0)
+        achievements = gami_data.get('achievements', [])
+        return len(skills) >= 2 and (points >= 800 or has_success or len(achievements) >= 5)
+    
     def _create_story_from_profile(self, profile, gami_data, skills, has_success):
         """Create a success story from real user data"""
         # Get name from personal_info if nested, otherwise top level
@@ -228,31 +308,7 @@ class SuccessStoriesService:
             # Get user's current stats
             user_gami = db.collection('gamification').document(user_id).get()
             if not user_gami.exists:
-                return {
-                    'your_stats': {'points': 0, 'streak': 0, 'achievements': 0},
-                    'peer_averages': {
-                        'same_college': {'points': 500, 'streak': 5, 'achievements': 3},
-                        'all_peers': {'points': 600, 'streak': 7, 'achievements': 4},
-                        'total_peers': 100,
-                        'college_peers': 15
-                    },
-                    'insights': [],
-                    'recommendations': []
-                }
-            
-            user_data = user_gami.to_dict()
-            if not isinstance(user_data, dict):
-                raise ValueError("Invalid user gamification data format")
-                
-            user_points = user_data.get('total_points', 0)
-            user_streak = user_data.get('login_streak', 0)
-            
-            # Safely get achievements count
-            achievements = user_data.get('achievements', [])
-            if isinstance(achievements, list):
-                user_achievements = len(achievements)
-            else:
-                user_achievements = 0
+                return self._empty_peer_insights()
             
             # Get user profile for college
             user_profile = db.collection('profiles').document(user_id).get()
@@ -266,111 +322,201 @@ class SuccessStoriesService:
             # Get peer statistics
             peer_stats = self._get_peer_statistics(db, user_college)
             
-            # Generate insights
-            insights = self._generate_growth_insights(
-                user_points, user_streak, user_achievements,
-                peer_stats
-            )
-            
-            return {
-                'your_stats': {
-                    'points': user_points,
-                    'streak': user_streak,
-                    'achievements': user_achievements
-                },
-                'peer_averages': peer_stats,
-                'insights': insights,
-                'recommendations': self._get_recommendations(user_data, peer_stats)
-            }
+            return self._build_peer_growth_insights(user_gami.to_dict(), peer_stats)
         
         except Exception as e:
             print(f"Error getting peer insights: {str(e)}")
             import traceback
             traceback.print_exc()
             # Return default data structure instead of error
-            return {
-                'your_stats': {'points': 0, 'streak': 0, 'achievements': 0},
-                'peer_averages': {
-                    'same_college': {'points': 500, 'streak': 5, 'achievements': 3},
-                    'all_peers': {'points': 600, 'streak': 7, 'achievements': 4},
-                    'total_peers': 100,
-                    'college_peers': 15
-                },
-                'insights': [{
-                    'type': 'overall',
-                    'icon': '💪',
-                    'message': 'Start your journey today!',
-                    'motivation': 'Complete your first task to begin earning points.',
-                    'status': 'growth_potential'
-                }],
-                'recommendations': [{
-                    'priority': 'high',
-                    'category': 'Getting Started',
-                    'action': 'Complete your profile and take your first eligibility check',
-                    'impact': 'Unlock personalized opportunities',
-                    'time': '10 minutes'
-                }]
-            }
+            return self._fallback_peer_insights()
     
-    def _get_peer_statistics(self, db, user_college):
-        """Get average statistics from peers"""
+    async def get_peer_growth_insights_async(self, user_id):
+        """
+        Async get_peer_growth_insights
+        
+        The user's gamification document, their college and every peer's
+        gamification data are read concurrently; only the peers' colleges
+        wait on the peer list.
+        """
+        aio = self.firebase.async_service
+        mirror = self.firebase.gamification_mirror
         try:
-            # Get all gamification data
-            gami_docs = db.collection('gamification').stream()
+            if mirror.ready:
+                # Peers come from memory - only the user's own documents are read
+                user_data, user_profile = await asyncio.gather(
+                    aio.get_document('gamification', user_id),
+                    aio.get_document('profiles', user_id, fields=['education.institution'])
+                )
+                peer_rows = mirror.rows()
+            else:
+                user_data, user_profile, peer_rows = await asyncio.gather(
+                    aio.get_document('gamification', user_id),
+                    aio.get_document('profiles', user_id, fields=['education.institution']),
+                    aio.query('gamification')
+                )
+            if user_data is None:
+                return self._empty_peer_insights()
             
-            same_college_stats = []
-            all_peers_stats = []
+            user_college = (user_profile or {}).get('education', {}).get('institution', 'Unknown')
             
-            for doc in gami_docs:
-                data = doc.to_dict()
-                points = data.get('total_points', 0)
-                streak = data.get('login_streak', 0)
-                achievements = len(data.get('achievements', []))
-                
-                all_peers_stats.append({
-                    'points': points,
-                    'streak': streak,
-                    'achievements': achievements
-                })
-                
-                # Check if same college
-                profile = db.collection('profiles').document(doc.id).get()
-                if profile.exists:
-                    profile_data = profile.to_dict()
-                    education = profile_data.get('education', {})
-                    profile_college = education.get('institution', '')
-                    if profile_college == user_college:
-                        same_college_stats.append({
-                            'points': points,
-                            'streak': streak,
-                            'achievements': achievements
-                        })
+            try:
+                if mirror.ready:
+                    profiles = mirror.profiles()
+                else:
+                    profiles = await aio.get_many(
+                        'profiles', [doc_id for doc_id, _ in peer_rows], fields=['education.institution']
+                    )
+                peer_stats = self._compute_peer_statistics(peer_rows, profiles, user_college)
+            except Exception as e:
+                print(f"Error calculating peer stats: {str(e)}")
+                peer_stats = self._default_peer_statistics()
             
-            # Calculate averages
-            def calc_avg(stats_list):
-                if not stats_list:
-                    return {'points': 0, 'streak': 0, 'achievements': 0}
-                return {
-                    'points': sum(s['points'] for s in stats_list) // len(stats_list),
-                    'streak': sum(s['streak'] for s in stats_list) // len(stats_list),
-                    'achievements': sum(s['achievements'] for s in stats_list) // len(stats_list)
-                }
+            return self._build_peer_growth_insights(user_data, peer_stats)
+        
+        except Exception as e:
+            print(f"Error getting peer insights: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return self._fallback_peer_insights()
+    
+    def _build_peer_growth_insights(self, user_data, peer_stats):
+        """Compare a user's gamification data against peer averages"""
+        if not isinstance(user_data, dict):
+            raise ValueError("Invalid user gamification data format")
             
-            return {
-                'same_college': calc_avg(same_college_stats),
-                'all_peers': calc_avg(all_peers_stats),
-                'total_peers': len(all_peers_stats),
-                'college_peers': len(same_college_stats)
-            }
+        user_points = user_data.get('total_points', 0)
+        user_streak = user_data.get('login_streak', 0)
+        
+        # Safely get achievements count
+        achievements = user_data.get('achievements', [])
+        if isinstance(achievements, list):
+            user_achievements = len(achievements)
+        else:
+            user_achievements = 0
+        
+        # Generate insights
+        insights = self._generate_growth_insights(
+            user_points, user_streak, user_achievements,
+            peer_stats
+        )
+        
+        return {
+            'your_stats': {
+                'points': user_points,
+                'streak': user_streak,
+                'achievements': user_achievements
+            },
+            'peer_averages': peer_stats,
+            'insights': insights,
+            'recommendations': self._get_recommendations(user_data, peer_stats)
+        }
+    
+    def _empty_peer_insights(self):
+        """Peer insights for users without gamification data"""
+        return {
+            'your_stats': {'points': 0, 'streak': 0, 'achievements': 0},
+            'peer_averages': self._default_peer_statistics(),
+            'insights': [],
+            'recommendations': []
+        }
+    
+    def _fallback_peer_insights(self):
+        """Peer insights returned when the datastore cannot be read"""
+        return {
+            'your_stats': {'points': 0, 'streak': 0, 'achievements': 0},
+            'peer_averages': self._default_peer_statistics(),
+            'insights': [{
+                'type': 'overall',
+                'icon': '💪',
+                'message': 'Start your journey today!',
+                'motivation': 'Complete your first task to begin earning points.',
+                'status': 'growth_potential'
+            }],
+            'recommendations': [{
+                'priority': 'high',
+                'category': 'Getting Started',
+                'action': 'Complete your profile and take your first eligibility check',
+                'impact': 'Unlock personalized opportunities',
+                'time': '10 minutes'
+            }]
+        }
+    
+    def _get_peer_statistics(self, db, user_college):
+        """Get average statistics from peers"""
+        try:
+            mirror = self.firebase.gamification_mirror
+            if mirror.ready:
+                # Listener-backed copy: no reads at all
+                peer_rows = mirror.rows()
+                profiles = mirror.profiles()
+            else:
+                # Get all gamification data
+                peer_rows = [(doc.id, doc.to_dict()) for doc in db.collection('gamification').stream()]
+                
+                # Colleges for every peer in one batched profile read
+                profiles = self.firebase.get_many(
+                    'profiles', [doc_id for doc_id, _ in peer_rows], fields=['education.institution']
+                )
+            
+            return self._compute_peer_statistics(peer_rows, profiles, user_college)
         
         except Exception as e:
             print(f"Error calculating peer stats: {str(e)}")
+            return self._default_peer_statistics()
+    
+    def _compute_peer_statistics(self, peer_rows, profiles, user_college):
+        """Average points/streak/achievements over all peers and over same-college peers"""
+        same_college_stats = []
+        all_peers_stats = []
+        
+        for doc_id, data in peer_rows:
+            points = data.get('total_points', 0)
+            streak = data.get('login_streak', 0)
+            achievements = len(data.get('achievements', []))
+            
+            all_peers_stats.append({
+                'points': points,
+                'streak': streak,
+                'achievements': achievements
+            })
+            
+            # Check if same college
+            profile_data = profiles.get(doc_id)
+            if profile_data is not None:
+                education = profile_data.get('education', {})
+                profile_college = education.get('institution', '')
+                if profile_college == user_college:
+                    same_college_stats.append({
+                        'points': points,
+                        'streak': streak,
+                        'achievements': achievements
+                    })
+        
+        # Calculate averages
+        def calc_avg(stats_list):
+            if not stats_list:
+                return {'points': 0, 'streak': 0, 'achievements': 0}
             return {
-                'same_college': {'points': 500, 'streak': 5, 'achievements': 3},
-                'all_peers': {'points': 600, 'streak': 7, 'achievements': 4},
-                'total_peers': 100,
-                'college_peers': 15
+                'points': sum(s['points'] for s in stats_list) // len(stats_list),
+                'streak': sum(s['streak'] for s in stats_list) // len(stats_list),
+                'achievements': sum(s['achievements'] for s in stats_list) // len(stats_list)
             }
+        
+        return {
+            'same_college': calc_avg(same_college_stats),
+            'all_peers': calc_avg(all_peers_stats),
+            'total_peers': len(all_peers_stats),
+            'college_peers': len(same_college_stats)
+        }
+    
+    def _default_peer_statistics(self):
+        return {
+            'same_college': {'points': 500, 'streak': 5, 'achievements': 3},
+            'all_peers': {'points': 600, 'streak': 7, 'achievements': 4},
+            'total_peers': 100,
+            'college_peers': 15
+        }
     
     def _generate_growth_insights(self, user_points, user_streak, user_achievements, peer_stats):
         """Generate personalized insights for healthy competition"""
@@ -0,0 +1,57 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# Tests import backend modules the same way the scripts do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeSearchResponse:
+    """One Google Custom Search result page of ten hackathons"""
+
+    status_code = 200
+
+    def __init__(self, start):
+        self.start = start
+
+    def json(self):
+        return {
+            'items': [
+                {
+                    'title': f'AI Hackathon {self.start + i} 2027',
+                    'link': f'https://unstop.com/hackathons/ai-hackathon-{self.start + i}',
+                    'snippet': 'Registration deadline: 15 March 2027. Open to students across India.'
+                }
+                for i in range(10)
+            ],
+            'searchInformation': {'totalResults': '10'}
+        }
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture(scope='session')
+def appmod():
+    """The Flask app module on a memory datastore, with Google Search and Gemini stubbed"""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('DATASTORE_BACKEND', 'memory')
+        patch.setenv('GAMIFICATION_MIRROR', 'true')
+        patch.setenv('OPPORTUNITY_INDEX', 'false')
+        patch.setenv('SEARCH_WARMER', 'false')
+        patch.setenv('GOOGLE_SEARCH_API_KEY', 'test-key')
+        patch.setenv('GOOGLE_SEARCH_ENGINE_ID', 'test-cx')
+        module = importlib.import_module('app')
+        patch.setattr(module.opportunity_service.http, 'get',
+                      lambda url, params=None, timeout=None: FakeSearchResponse(params.get('start', 1)))
+        patch.setattr(module.reasoning_service, '_perform_gemini_reasoning',
+                      lambda profile, opportunity: {'eligible': True, 'eligibility_score': 80})
+        yield module
+        module.firebase_service.gamification_mirror.stop()
+
+
+@pytest.fixture(scope='session')
+def client(appmod):
+    return appmod.app.test_client()
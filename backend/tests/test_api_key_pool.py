@@ -0,0 +1,152 @@
+"""
+Tests for ApiKeyPool scheduling and the search page retry on another key
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from services import api_key_pool
+from services.api_key_pool import ApiKeyPool
+from services.firebase_service import FirebaseService
+from services.opportunity_service import OpportunityService
+
+
+class FakeClock:
+    """Stands in for the time module and quota_day() inside api_key_pool"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.day = date(2027, 3, 1)
+
+    def time(self):
+        return self.now
+
+    def quota_day(self):
+        return self.day
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(api_key_pool, 'time', clock)
+    monkeypatch.setattr(api_key_pool, 'quota_day', clock.quota_day)
+    return clock
+
+
+def test_acquire_prefers_most_remaining_quota(clock):
+    pool = ApiKeyPool(['k1', 'k2', 'k3'], daily_quota=3)
+
+    picked = []
+    for _ in range(9):
+        picked.append(pool.acquire())
+        clock.now += 1
+
+    # Least used first, ties broken by the key used longest ago
+    assert picked == ['k1', 'k2', 'k3'] * 3
+    assert pool.acquire() is None
+    assert pool.remaining_today() == 0
+    assert pool.acquire(exclude=['k1']) is None
+
+
+def test_acquire_skips_excluded_keys(clock):
+    pool = ApiKeyPool(['k1', 'k2'], daily_quota=10)
+    pool.acquire()
+
+    assert pool.acquire(exclude=['k2']) == 'k1'
+    assert pool.acquire(exclude=['k1', 'k2']) is None
+
+
+def test_rate_limit_cooldown_doubles_until_success(clock):
+    pool = ApiKeyPool(['k1'], daily_quota=100, cooldown=60, max_cooldown=200)
+    benches = []
+    for _ in range(4):
+        key = pool.acquire()
+        assert key == 'k1'
+        pool.report_rate_limited(key)
+        benches.append(pool.stats()['keys'][0]['cooldown_seconds'])
+        assert pool.acquire() is None
+        clock.now += benches[-1]
+
+    assert benches == [60, 120, 200, 200]
+
+    pool.report_success(pool.acquire())
+    pool.report_rate_limited('k1')
+    assert pool.stats()['keys'][0]['cooldown_seconds'] == 60
+
+
+def test_daily_exhausted_benches_key_until_quota_day_rolls(clock):
+    pool = ApiKeyPool(['k1', 'k2'], daily_quota=100, cooldown=60)
+    key = pool.acquire()
+    pool.report_rate_limited(key, daily_exhausted=True)
+
+    clock.now += 3600
+    assert [pool.acquire(), pool.acquire()] == ['k2', 'k2']
+    assert pool.stats()['keys'][0]['remaining_today'] == 0
+
+    # A new quota day resets usage, streaks and cooldowns
+    pool.report_rate_limited('k2')
+    clock.day += timedelta(days=1)
+    stats = pool.stats()
+    assert stats['quota_day'] == '2027-03-02'
+    assert stats['remaining_today'] == 200
+    assert stats['keys_available'] == 2
+    assert pool.acquire() in ('k1', 'k2')
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+class FakeHttp:
+    """Answers each search request from a key -> response table"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append((params['key'], params['start']))
+        return self.responses[params['key']]
+
+
+@pytest.fixture
+def opportunity_service(monkeypatch, clock):
+    monkeypatch.setenv('DATASTORE_BACKEND', 'memory')
+    service = OpportunityService(FirebaseService())
+    service.search_keys = ApiKeyPool(['k1', 'k2', 'k3'], daily_quota=100, cooldown=60)
+    return service
+
+
+def test_fetch_search_page_retries_same_page_on_another_key(opportunity_service):
+    item = {'title': 'Robotics Challenge 2027', 'link': 'https://unstop.com/robotics-2027'}
+    opportunity_service.http = FakeHttp({
+        'k1': FakeResponse(429, {'error': {'message': 'Quota exceeded for quota metric per minute'}}),
+        'k2': FakeResponse(429, {'error': {'message': 'Quota exceeded for quota metric per day'}}),
+        'k3': FakeResponse(200, {'items': [item]})
+    })
+    tried = []
+
+    items = opportunity_service._fetch_search_page('robotics', 11, 10, tried_keys=tried)
+
+    assert items == [item]
+    assert tried == ['k1', 'k2', 'k3']
+    assert opportunity_service.http.requests == [('k1', 11), ('k2', 11), ('k3', 11)]
+    keys = opportunity_service.search_keys.stats()['keys']
+    assert keys[0]['cooldown_seconds'] == 60
+    assert keys[1]['remaining_today'] == 0 and keys[1]['cooldown_seconds'] == 0
+    assert opportunity_service.search_keys.acquire() == 'k3'
+
+
+def test_fetch_search_page_gives_up_after_every_key_is_rate_limited(opportunity_service):
+    limited = FakeResponse(429, {'error': {'message': 'Rate limit exceeded'}})
+    opportunity_service.http = FakeHttp({'k1': limited, 'k2': limited, 'k3': limited})
+
+    assert opportunity_service._fetch_search_page('robotics', 1, 10) == []
+    assert [key for key, _ in opportunity_service.http.requests] == ['k1', 'k2', 'k3']
+    assert opportunity_service.search_keys.acquire() is None
@@ -0,0 +1,37 @@
+"""
+Tests for buffered writes and cache invalidation on commit
+"""
+
+from services.batch_writer import BufferedWriter
+from services.firebase_service import FirebaseService
+from services.storage_backend import create_storage_backend
+
+
+def test_on_commit_receives_committed_references():
+    backend = create_storage_backend('memory')
+    committed = []
+    writer = BufferedWriter(backend, on_commit=committed.extend)
+    reference = backend.collection('opportunities').document('abc')
+
+    writer.set(reference, {'title': 'Robotics Challenge 2027'})
+    assert committed == []
+
+    writer.flush()
+    assert [ref.path for ref in committed] == ['opportunities/abc']
+
+
+def test_read_between_buffering_and_commit_is_not_served_stale(monkeypatch):
+    monkeypatch.setenv('DATASTORE_BACKEND', 'memory')
+    service = FirebaseService()
+    writer = service.get_writer()
+
+    [created] = service.upsert_opportunities(
+        [{'title': 'Robotics Challenge 2027', 'url': 'https://unstop.com/robotics-challenge-2027'}], writer=writer
+    )
+    opportunity_id = created['opportunity_id']
+    # Not committed yet: the miss is cached
+    assert service.get_opportunity(opportunity_id) is None
+
+    service.flush_writes()
+
+    assert service.get_opportunity(opportunity_id)['title'] == 'Robotics Challenge 2027'
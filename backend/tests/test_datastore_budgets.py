@@ -0,0 +1,67 @@
+"""
+Datastore operation budgets of the hot endpoints, read from X-Datastore-Ops
+"""
+
+import time
+
+import pytest
+
+from services.datastore_metrics import assert_datastore_budget
+
+
+@pytest.fixture(scope='module')
+def opportunity_ids(client):
+    response = client.post('/api/opportunities/search', json={'query': 'AI hackathon'})
+    assert response.status_code == 200
+    ids = [opp['opportunity_id'] for opp in response.get_json()['opportunities']]
+    assert len(ids) == 10
+    return ids
+
+
+def test_leaderboard_reads_nothing_once_mirror_is_ready(appmod, client):
+    gamification = appmod.firebase_service.db.collection('gamification')
+    for n in range(15):
+        gamification.document(f'user{n}').set({'user_id': f'user{n}', 'total_points': n * 10, 'level': 1})
+    mirror = appmod.firebase_service.gamification_mirror
+    deadline = time.time() + 5
+    while len(mirror.rows()) < 15 and time.time() < deadline:
+        time.sleep(0.01)
+    assert mirror.ready
+
+    response = client.get('/api/gamification/leaderboard?user_id=user3')
+
+    assert response.status_code == 200
+    # Top 10 plus user3 appended below them
+    assert len(response.get_json()['leaderboard']) == 11
+    assert_datastore_budget(response, max_reads=0, max_writes=0, max_queries=0)
+
+
+def test_cached_search_reads_nothing(client, opportunity_ids):
+    response = client.post('/api/opportunities/search', json={'query': 'AI hackathon'})
+
+    assert response.get_json()['from_cache']
+    assert_datastore_budget(response, max_reads=0, max_writes=0, max_queries=0)
+
+
+def test_opportunity_batch_reads_each_document_once(client, opportunity_ids):
+    response = client.post('/api/opportunities/batch',
+                           json={'opportunity_ids': opportunity_ids + ['missing'], 'fields': ['title']})
+
+    assert response.get_json()['count'] == 10
+    assert_datastore_budget(response, max_reads=len(opportunity_ids) + 1, max_writes=0, max_queries=0)
+
+
+def test_reasoning_batch_budget(appmod, client, opportunity_ids):
+    profile = appmod.firebase_service.create_student_profile({'personal_info': {'name': 'Asha'}})
+    body = {'profile_id': profile['profile_id'], 'opportunity_ids': opportunity_ids}
+
+    # Profile, cached reasoning lookups and opportunities: all batched
+    response = client.post('/api/reasoning/batch', json=body)
+    assert response.status_code == 200
+    assert_datastore_budget(response, max_reads=2 * len(opportunity_ids) + 1,
+                            max_writes=len(opportunity_ids), max_queries=0)
+
+    # Everything is cached now: one read per stored result and nothing else
+    response = client.post('/api/reasoning/batch', json=body)
+    assert all(result['cached'] for result in response.get_json()['results'])
+    assert_datastore_budget(response, max_reads=len(opportunity_ids), max_writes=0, max_queries=0)
@@ -0,0 +1,111 @@
+"""
+Tests for datastore_dump partition planning and export
+"""
+
+import gzip
+import json
+
+import pytest
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import firestore
+
+from datastore_dump import export_partition, plan_partitions
+from services.storage_backend import create_storage_backend
+
+
+class FakePartition:
+    def __init__(self, end_at):
+        self.end_at = end_at
+
+
+class FakeCollectionGroup:
+    def __init__(self, partitions):
+        self.partitions = partitions
+
+    def get_partitions(self, count):
+        return iter(self.partitions)
+
+
+class FakeDatabase:
+    def __init__(self, partitions):
+        self.partitions = partitions
+
+    def collection_group(self, collection_id):
+        return FakeCollectionGroup(self.partitions)
+
+
+class FakeFirebaseService:
+    backend_name = 'firestore'
+
+    def __init__(self, partitions):
+        self.db = FakeDatabase(partitions)
+
+
+def _client():
+    return firestore.Client(project='test-project', credentials=AnonymousCredentials())
+
+
+def test_plan_partitions_uses_top_level_split_points():
+    client = _client()
+    partitions = [
+        FakePartition(client.collection('students').document('m')),
+        FakePartition(client.collection('users').document('u1').collection('students').document('c')),
+        FakePartition(client.collection('students').document('t')),
+        FakePartition(None),
+    ]
+
+    plan = plan_partitions(FakeFirebaseService(partitions), 'students', 4)
+
+    assert plan == [(None, 'm'), ('m', 't'), ('t', None)]
+
+
+def test_plan_partitions_single_range_for_local_backends():
+    service = FakeFirebaseService([])
+    service.backend_name = 'sqlite'
+
+    assert plan_partitions(service, 'students', 4) == [(None, None)]
+
+
+def _fill(backend, count):
+    batch = backend.batch()
+    for number in range(count):
+        batch.set(backend.collection('students').document(f"s{number:04d}"), {'number': number})
+    batch.commit()
+
+
+def _export(backend, directory):
+    partition = {'file': 'students/part-00000.jsonl.gz', 'start': None, 'end': None}
+    (directory / 'students').mkdir(parents=True)
+    documents = export_partition(backend, str(directory), 'students', partition, page_size=7)
+
+    with gzip.open(directory / partition['file'], 'rt', encoding='utf-8') as lines:
+        records = [json.loads(line) for line in lines]
+    return documents, records
+
+
+@pytest.mark.parametrize('backend_name', ['memory', 'sqlite'])
+def test_export_partition_streams_local_backend_in_id_order(tmp_path, backend_name):
+    backend = create_storage_backend(backend_name, str(tmp_path / 'datastore.sqlite3'))
+    _fill(backend, 50)
+    scans = []
+    original_scan = backend._scan
+    backend._scan = lambda *args: scans.append(args) or original_scan(*args)
+
+    documents, records = _export(backend, tmp_path / 'dump')
+
+    assert documents == 50
+    assert [record['id'] for record in records] == [f"s{number:04d}" for number in range(50)]
+    assert records[3]['data'] == {'number': 3}
+    # No full-collection scans per page
+    assert scans == []
+    backend.close()
+
+
+def test_iter_documents_resumes_after_id(tmp_path):
+    backend = create_storage_backend('sqlite', str(tmp_path / 'datastore.sqlite3'))
+    _fill(backend, 12)
+
+    ids = [doc_id for doc_id, _ in backend.iter_documents('students', after='s0004', page_size=3)]
+
+    assert ids == [f"s{number:04d}" for number in range(5, 12)]
+    backend.close()
@@ -0,0 +1,102 @@
+"""
+Tests for KeywordMatcher, against plain `keyword in text.lower()` substring checks
+"""
+
+import random
+
+import pytest
+
+from services import keyword_matcher
+from services.keyword_matcher import KeywordMatcher
+
+
+@pytest.fixture(params=['pyahocorasick', 'python'])
+def make_matcher(request):
+    if request.param == 'pyahocorasick' and keyword_matcher.ahocorasick is None:
+        pytest.skip('pyahocorasick is not installed')
+
+    def make(categories):
+        matcher = KeywordMatcher(categories)
+        if request.param == 'python':
+            # Same as running without pyahocorasick: scan() builds the table on first use
+            matcher._automaton = None
+        assert matcher.engine == request.param
+        return matcher
+
+    return make
+
+
+def occurrences(keywords, text):
+    """Every (start, end, keyword) occurrence, overlapping ones included"""
+    lowered = text.lower()
+    return sorted(
+        (start, start + len(keyword), keyword)
+        for keyword in set(keyword.lower() for keyword in keywords)
+        for start in range(len(lowered))
+        if lowered.startswith(keyword, start)
+    )
+
+
+def test_random_texts_agree_with_substring_checks(make_matcher):
+    rng = random.Random(2027)
+    # A tiny alphabet makes keywords overlap and share prefixes and suffixes,
+    # which is where failure links matter
+    for _ in range(200):
+        categories = {
+            f'category{n}': [''.join(rng.choice('ab c') for _ in range(rng.randint(1, 4)))
+                             for _ in range(rng.randint(1, 4))]
+            for n in range(rng.randint(1, 3))
+        }
+        matcher = make_matcher(categories)
+        for _ in range(10):
+            text = ''.join(rng.choice('abAB c') for _ in range(rng.randint(0, 40)))
+            hits = matcher.scan(text)
+
+            all_keywords = [keyword for keywords in categories.values() for keyword in keywords]
+            assert sorted(hits.matches) == occurrences(all_keywords, text)
+            for category, keywords in categories.items():
+                assert hits.keywords(category) == {k.lower() for k in keywords if k.lower() in text.lower()}
+
+
+def test_failure_links_report_overlapping_keywords(make_matcher):
+    matcher = make_matcher({'words': ['he', 'she', 'his', 'hers']})
+
+    hits = matcher.scan('ushers')
+
+    assert sorted(hits.matches) == [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]
+
+
+def test_upper_case_text_and_keywords_are_folded(make_matcher):
+    matcher = make_matcher({'fields': ['Machine Learning', 'robotics'], 'events': ['HACKATHON']})
+
+    hits = matcher.scan('MACHINE LEARNING and Robotics Hackathon')
+
+    assert hits.keywords('fields') == {'machine learning', 'robotics'}
+    assert hits.keywords('events') == {'hackathon'}
+    assert hits.positions('events') == [30]
+
+
+def test_offsets_index_original_text_when_lower_changes_its_length(make_matcher):
+    text = 'İstanbul İİT robotics challenge'
+    assert len(text.lower()) != len(text)
+    matcher = make_matcher({'fields': ['robotics'], 'events': ['challenge']})
+
+    hits = matcher.scan(text)
+
+    for start, end, keyword in hits.matches:
+        assert text[start:end].lower() == keyword
+    assert hits.positions('fields') == [text.index('robotics')]
+    assert hits.count('events', start=text.index('challenge')) == 1
+
+
+def test_keyword_shared_by_categories_and_ranges(make_matcher):
+    matcher = make_matcher({'ai': ['deep learning'], 'ml': ['deep learning', 'svm']})
+
+    hits = matcher.scan('svm first, deep learning later')
+
+    assert hits.categories == {'ai', 'ml'}
+    assert hits.count('ml') == 2
+    assert hits.count('ml', start=5) == 1
+    assert hits.keywords('ml', end=10) == {'svm'}
+    assert 'vision' not in hits
+    assert matcher.scan('').matches == []
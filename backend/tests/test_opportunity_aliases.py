@@ -0,0 +1,57 @@
+"""
+Tests for resolving legacy opportunity IDs to their canonical records
+"""
+
+import pytest
+
+from services.firebase_service import FirebaseService
+from services.reasoning_service import ReasoningService
+
+
+URL = 'https://unstop.com/hackathons/robotics-challenge-2027'
+
+
+@pytest.fixture
+def firebase(monkeypatch):
+    monkeypatch.setenv('DATASTORE_BACKEND', 'memory')
+    service = FirebaseService()
+    [stored] = service.upsert_opportunities([{
+        'title': 'Robotics Challenge 2027', 'url': URL, 'type': 'hackathon', 'relevance_score': 60
+    }])
+    opportunities = service.db.collection('opportunities')
+    opportunities.document('legacy1').set({'alias_of': stored['opportunity_id']})
+    opportunities.document('legacy2').set({'title': 'Robotics Challenge 2027 (old copy)', 'url': URL})
+    service.canonical_id = stored['opportunity_id']
+    return service
+
+
+def test_get_opportunities_resolves_alias_stubs_and_legacy_copies(firebase):
+    documents = firebase.get_opportunities(['legacy1', 'legacy2', firebase.canonical_id, 'nope'])
+
+    assert set(documents) == {'legacy1', 'legacy2', firebase.canonical_id}
+    for data in documents.values():
+        assert data['opportunity_id'] == firebase.canonical_id
+        assert data['title'] == 'Robotics Challenge 2027'
+        assert 'alias_of' not in data
+
+
+def test_get_opportunities_keeps_projection(firebase):
+    documents = firebase.get_opportunities(['legacy1'], fields=['title'])
+
+    assert documents == {'legacy1': {'title': 'Robotics Challenge 2027', 'opportunity_id': firebase.canonical_id}}
+
+
+def test_analyze_batch_analyzes_legacy_ids_under_canonical_id(firebase, monkeypatch):
+    profile = firebase.create_student_profile({'personal_info': {'name': 'Asha'}})
+    reasoning = ReasoningService(firebase)
+    analyzed = []
+    monkeypatch.setattr(reasoning, '_perform_gemini_reasoning',
+                        lambda profile_data, opportunity: analyzed.append(opportunity) or {'eligible': True})
+
+    results = reasoning.analyze_batch(profile['profile_id'], ['legacy1'])
+
+    assert analyzed[0]['title'] == 'Robotics Challenge 2027'
+    stored = firebase.reasoning_collection.document(results[0]['analysis']['reasoning_id']).get().to_dict()
+    assert stored['opportunity_id'] == firebase.canonical_id
+    # The canonical ID's cached result now answers the legacy ID too
+    assert reasoning.analyze_batch(profile['profile_id'], ['legacy1'])[0]['cached']
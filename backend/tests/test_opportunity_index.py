@@ -0,0 +1,67 @@
+"""
+Tests for the in-process opportunity index
+"""
+
+import time
+
+import pytest
+
+from services.firebase_service import FirebaseService
+
+
+URL = 'https://unstop.com/hackathons/robotics-challenge-2027'
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def firebase(monkeypatch):
+    monkeypatch.setenv('DATASTORE_BACKEND', 'memory')
+    service = FirebaseService()
+    yield service
+    service.opportunity_index.stop()
+
+
+def _start(service):
+    index = service.opportunity_index
+    index.start()
+    _wait_until(lambda: index.ready)
+    return index
+
+
+def test_search_returns_each_opportunity_once_under_its_canonical_id(firebase):
+    [stored] = firebase.upsert_opportunities([{'title': 'Robotics Challenge 2027', 'url': URL, 'type': 'hackathon'}])
+    opportunities = firebase.db.collection('opportunities')
+    opportunities.document('legacy1').set({'alias_of': stored['opportunity_id']})
+    opportunities.document('legacy2').set({'title': 'Robotics Challenge 2027 India', 'url': URL,
+                                           'type': 'hackathon'})
+    index = _start(firebase)
+
+    results = index.search('robotics challenge')
+
+    assert [result['opportunity_id'] for result in results] == [stored['opportunity_id']]
+    assert results[0]['title'] == 'Robotics Challenge 2027'
+    assert index.stats()['documents'] == 2
+
+
+def test_legacy_copy_without_canonical_record_is_still_found(firebase):
+    firebase.db.collection('opportunities').document('legacy2').set(
+        {'title': 'Drone Racing League 2027', 'url': 'https://example.com/drone-racing', 'type': 'competition'}
+    )
+    index = _start(firebase)
+
+    assert [result['opportunity_id'] for result in index.search('drone racing')] == ['legacy2']
+
+
+def test_alias_stub_added_later_is_not_indexed(firebase):
+    index = _start(firebase)
+    firebase.db.collection('opportunities').document('legacy1').set({'alias_of': 'abc', 'title': 'Robotics'})
+    _wait_until(lambda: index.stats()['changes_applied'] >= 1)
+
+    assert index.search('robotics') == []
+    assert index.stats()['documents'] == 0
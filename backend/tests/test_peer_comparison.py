@@ -0,0 +1,62 @@
+"""
+Tests for the analytics peer comparison profile lookup
+"""
+
+import asyncio
+
+import pytest
+
+from services.analytics_service import AnalyticsService
+from services.firebase_service import FirebaseService
+
+
+@pytest.fixture
+def analytics(monkeypatch):
+    monkeypatch.setenv('DATASTORE_BACKEND', 'memory')
+    firebase = FirebaseService()
+    for n in range(15):
+        user_id = f'user{n:02d}'
+        firebase.db.collection('gamification').document(user_id).set({'total_points': n * 10, 'level': 1})
+        firebase.db.collection('profiles').document(user_id).set({
+            'personal_info': {'name': f'Student {n}'},
+            'education': {'institution': 'IIT Delhi'}
+        })
+    firebase.profile_reads = []
+
+    def record(method):
+        def wrapper(collection, ids, fields=None):
+            if collection == 'profiles':
+                firebase.profile_reads.append(list(ids))
+            return method(collection, ids, fields=fields)
+        return wrapper
+
+    monkeypatch.setattr(firebase, 'get_many', record(firebase.get_many))
+    monkeypatch.setattr(firebase.async_service, 'get_many', record(firebase.async_service.get_many))
+    return AnalyticsService(firebase)
+
+
+def expected_top_ids():
+    return [f'user{n:02d}' for n in range(14, 4, -1)]
+
+
+def check_peer_comparison(peer_stats):
+    assert peer_stats['total_users'] == 15
+    assert [u['name'] for u in peer_stats['top_users']] == [f'Student {n}' for n in range(14, 4, -1)]
+    assert all(u['college'] == 'IIT Delhi' for u in peer_stats['top_users'])
+
+
+def test_sync_peer_comparison_reads_only_displayed_profiles(analytics):
+    assert not analytics.firebase.gamification_mirror.ready
+
+    peer_stats = analytics._get_peer_comparison('user03', {'total_points': 30})
+
+    check_peer_comparison(peer_stats)
+    assert analytics.firebase.profile_reads == [expected_top_ids()]
+
+
+def test_async_peer_comparison_reads_only_displayed_profiles(analytics):
+    result = asyncio.run(analytics.get_user_analytics_async('user03'))
+
+    check_peer_comparison(result['peer_comparison'])
+    assert analytics.firebase.profile_reads
+    assert all(ids == expected_top_ids() for ids in analytics.firebase.profile_reads)
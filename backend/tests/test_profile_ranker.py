@@ -0,0 +1,99 @@
+"""
+Tests for re-ranking search results by profile match
+"""
+
+import random
+
+import pytest
+
+from services import profile_ranker
+from services.profile_ranker import ProfileRanker
+
+
+PROFILE = {
+    'skills': {'technical': ['Python', 'ROS', 'computer vision']},
+    'interests': ['robotics', 'drones'],
+    'education': {'major': 'Mechanical Engineering'}
+}
+
+
+def opportunity(n, title, snippet='', relevance=50, opportunity_type='hackathon'):
+    return {'opportunity_id': f'opp{n}', 'title': title, 'snippet': snippet,
+            'relevance_score': relevance, 'type': opportunity_type}
+
+
+@pytest.fixture(params=['scipy', 'python'])
+def make_ranker(request, monkeypatch):
+    if request.param == 'scipy' and profile_ranker.sparse is None:
+        pytest.skip('NumPy/SciPy are not installed')
+    if request.param == 'python':
+        monkeypatch.setattr(profile_ranker, 'sparse', None)
+
+    def make(weight=0.4):
+        ranker = ProfileRanker(weight=weight)
+        assert ranker.engine == request.param
+        return ranker
+
+    return make
+
+
+def test_best_profile_match_ranks_first_at_equal_relevance(make_ranker):
+    opportunities = [
+        opportunity(1, 'Fintech Pitch Competition', 'Banking and payments ideas'),
+        opportunity(2, 'Autonomous Drone Robotics Challenge', 'Build with ROS, Python and computer vision'),
+        opportunity(3, 'Mechanical Design Contest', 'CAD for mechanical engineering students'),
+    ]
+
+    ranked = make_ranker().rank(PROFILE, opportunities)
+
+    assert [opp['opportunity_id'] for opp in ranked] == ['opp2', 'opp3', 'opp1']
+    assert ranked[0]['profile_match'] == 100
+    assert 0 < ranked[1]['profile_match'] < 100
+    assert ranked[2]['profile_match'] == 0
+
+
+def test_ranking_score_blends_relevance_and_profile_match(make_ranker):
+    opportunities = [
+        opportunity(1, 'Fintech Pitch Competition', relevance=90),
+        opportunity(2, 'Robotics Challenge', 'ROS and drones', relevance=60),
+    ]
+
+    for weight, expected_order in ((0.0, ['opp1', 'opp2']), (0.4, ['opp2', 'opp1']), (1.0, ['opp2', 'opp1'])):
+        ranked = make_ranker(weight).rank(PROFILE, opportunities)
+        assert [opp['opportunity_id'] for opp in ranked] == expected_order
+        for opp in ranked:
+            expected = round((1 - weight) * opp['relevance_score'] + weight * opp['profile_match'], 1)
+            assert opp['ranking_score'] == expected
+
+    # 0.6 * 60 + 0.4 * 100 beats 0.6 * 90 + 0.4 * 0
+    ranked = make_ranker(0.4).rank(PROFILE, opportunities)
+    assert [opp['ranking_score'] for opp in ranked] == [76.0, 54.0]
+    assert make_ranker(7).weight == 1.0
+
+
+def test_rank_copies_results_and_handles_empty_profiles(make_ranker):
+    opportunities = [opportunity(1, 'Robotics Challenge', relevance=80), opportunity(2, 'Drone Race', relevance=40)]
+
+    ranked = make_ranker(0.5).rank({}, opportunities)
+
+    assert [opp['ranking_score'] for opp in ranked] == [40.0, 20.0]
+    assert all(opp['profile_match'] == 0 for opp in ranked)
+    assert 'ranking_score' not in opportunities[0]
+    assert make_ranker().rank(PROFILE, []) == []
+
+
+@pytest.mark.skipif(profile_ranker.sparse is None, reason='NumPy/SciPy are not installed')
+def test_sparse_and_python_similarities_agree():
+    rng = random.Random(2027)
+    vocabulary = ['robotics', 'python', 'drone', 'vision', 'finance', 'design', 'cloud', 'ai', 'ros']
+    for _ in range(50):
+        profile_terms = {term: rng.choice([1.0, 1.5, 2.0]) for term in rng.sample(vocabulary, rng.randint(1, 4))}
+        documents = [
+            {term: rng.choice([0.5, 1.0, 2.0, 3.0]) for term in rng.sample(vocabulary, rng.randint(0, 5))}
+            for _ in range(rng.randint(1, 8))
+        ]
+
+        sparse_scores = ProfileRanker._similarities_sparse(profile_terms, documents)
+        python_scores = ProfileRanker._similarities_python(profile_terms, documents)
+
+        assert sparse_scores == pytest.approx(python_scores, abs=1e-9)
@@ -0,0 +1,27 @@
+"""
+Tests for the profile_version lookup behind reasoning cache keys
+"""
+
+from services.firebase_service import FirebaseService
+
+
+def test_profile_version_is_not_served_from_profile_cache(monkeypatch):
+    monkeypatch.setenv('DATASTORE_BACKEND', 'memory')
+    firebase = FirebaseService()
+    profile_id = firebase.create_student_profile({'personal_info': {'name': 'Asha'}})['profile_id']
+    assert firebase.get_profile_version(profile_id) == 1
+    # Warm profile_cache with the projection the old lookup used
+    assert firebase.get_student_profile(profile_id, fields=['profile_version'])['profile_version'] == 1
+
+    # Another instance bumps the version without touching this one's cache
+    firebase.students_collection.document(profile_id).update({'profile_version': 2})
+
+    assert firebase.get_profile_version(profile_id) == 2
+    assert firebase.get_cached_reasoning(profile_id, 'opp1') is None
+
+
+def test_profile_version_of_missing_profile_is_zero(monkeypatch):
+    monkeypatch.setenv('DATASTORE_BACKEND', 'memory')
+    firebase = FirebaseService()
+
+    assert firebase.get_profile_version('nope') == 0
@@ -0,0 +1,118 @@
+"""
+Tests for saved search result sets and cursor paging
+"""
+
+import time
+
+import pytest
+
+from services import search_cache
+from services.result_sets import ResultSets, opportunity_year
+from services.search_cache import create_search_cache
+
+
+class ShiftedClock:
+    """Stands in for the time module, running `offset` seconds ahead"""
+
+    def __init__(self, offset):
+        self.offset = offset
+
+    def time(self):
+        return time.time() + self.offset
+
+
+def opportunity(n, opportunity_type='hackathon', deadline='2027-03-15', title=None):
+    return {
+        'opportunity_id': f'opp{n}',
+        'title': title or f'Opportunity {n}',
+        'type': opportunity_type,
+        'deadline': deadline
+    }
+
+
+@pytest.fixture
+def result_sets():
+    return ResultSets(create_search_cache('memory', ttl=60, max_stale=0, name='result_sets'))
+
+
+def save(result_sets, opportunities, opportunity_type=None):
+    return result_sets.create({
+        'query': 'robotics', 'source': 'google', 'cache_age_seconds': 0, 'opportunities': opportunities
+    }, opportunity_type)
+
+
+def test_cursor_round_trip():
+    cursor = ResultSets.encode_cursor('abc123', 20, 10, 'hackathon', '2027')
+
+    assert ResultSets.decode_cursor(cursor) == ('abc123', 20, 10, 'hackathon', '2027')
+    assert ResultSets.decode_cursor(ResultSets.encode_cursor('abc123', 0, 5)) == ('abc123', 0, 5, None, None)
+    with pytest.raises(ValueError):
+        ResultSets.decode_cursor('not a cursor')
+
+
+def test_cursors_walk_every_result_once(result_sets):
+    opportunities = [opportunity(n) for n in range(25)]
+    search_id = save(result_sets, opportunities)
+
+    seen = []
+    page = result_sets.page(search_id, 0, 10)
+    while True:
+        assert page['total'] == 25
+        seen.extend(page['opportunities'])
+        if page['next_cursor'] is None:
+            break
+        page = result_sets.page(*ResultSets.decode_cursor(page['next_cursor']))
+
+    assert seen == opportunities
+    assert result_sets.stats()['pages_served'] == 3
+
+
+def test_type_and_year_filters_apply_before_paging(result_sets):
+    opportunities = [
+        opportunity(1, 'hackathon', '2027-03-15'),
+        opportunity(2, 'internship', '2027-04-01'),
+        opportunity(3, 'Hackathon', '2028-01-10'),
+        # No deadline: the year comes from the title
+        opportunity(4, 'hackathon', None, title='Robotics Challenge 2027'),
+        opportunity(5, 'hackathon', '2027-06-30'),
+    ]
+    search_id = save(result_sets, opportunities)
+
+    page = result_sets.page(search_id, 0, 2, 'Hackathon', 2027)
+
+    assert [opp['opportunity_id'] for opp in page['opportunities']] == ['opp1', 'opp4']
+    assert page['total'] == 3
+    # The cursor carries the filters to the next page
+    assert ResultSets.decode_cursor(page['next_cursor']) == (search_id, 2, 2, 'hackathon', '2027')
+    page = result_sets.page(*ResultSets.decode_cursor(page['next_cursor']))
+    assert [opp['opportunity_id'] for opp in page['opportunities']] == ['opp5']
+    assert page['next_cursor'] is None
+
+    assert [opp['opportunity_id'] for opp in result_sets.page(search_id, year='2028')['opportunities']] == ['opp3']
+    assert opportunity_year(opportunities[3]) == '2027'
+
+
+def test_page_of_expired_search_is_none(result_sets, monkeypatch):
+    search_id = save(result_sets, [opportunity(1)])
+    assert result_sets.page(search_id)['expires_in_seconds'] > 0
+
+    monkeypatch.setattr(search_cache, 'time', ShiftedClock(61))
+
+    assert result_sets.page(search_id) is None
+    assert result_sets.stats()['expired'] == 1
+
+
+def test_search_endpoint_pages_by_cursor_until_expiry(client, monkeypatch):
+    first = client.post('/api/opportunities/search', json={'query': 'drone racing', 'per_page': 4}).get_json()
+    assert first['count'] == 4 and first['has_more']
+
+    second = client.post('/api/opportunities/search', json={'cursor': first['next_cursor']}).get_json()
+    assert second['search_id'] == first['search_id']
+    assert second['page'] == 2
+    assert not {o['opportunity_id'] for o in first['opportunities']} & {o['opportunity_id'] for o in second['opportunities']}
+
+    assert client.post('/api/opportunities/search', json={'cursor': 'garbage'}).status_code == 400
+
+    monkeypatch.setattr(search_cache, 'time', ShiftedClock(24 * 3600))
+    response = client.post('/api/opportunities/search', json={'cursor': first['next_cursor']})
+    assert response.status_code == 410
@@ -0,0 +1,44 @@
+"""
+Tests for search cache refresh claims
+"""
+
+import time
+
+from services.search_cache import create_search_cache
+
+
+def _caches(tmp_path):
+    path = str(tmp_path / 'search_cache.sqlite3')
+    return (create_search_cache('sqlite', path, refresh_lease=60),
+            create_search_cache('sqlite', path, refresh_lease=60))
+
+
+def test_sqlite_claim_covers_uncached_keys_across_connections(tmp_path):
+    first, second = _caches(tmp_path)
+    key = ('robotics contest', None)
+
+    assert first.claim_refresh(key)
+    assert not second.claim_refresh(key)
+
+    first.store(key, [{'title': 'Robotics Challenge 2027'}])
+    assert second.claim_refresh(key)
+    second.release_refresh(key)
+    assert first.claim_refresh(key)
+
+
+def test_sqlite_claim_can_be_taken_over_after_lease(tmp_path):
+    first, second = _caches(tmp_path)
+    key = ('drone race', None)
+
+    assert first._claim(key, time.time() - 120)
+    assert second.claim_refresh(key)
+
+
+def test_memory_claim_released_by_store():
+    cache = create_search_cache('memory')
+    key = ('robotics contest', None)
+
+    assert cache.claim_refresh(key)
+    assert not cache.claim_refresh(key)
+    cache.store(key, [])
+    assert cache.claim_refresh(key)
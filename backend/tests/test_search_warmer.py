@@ -0,0 +1,41 @@
+"""
+Tests for SearchWarmer budgeting
+"""
+
+from services.search_warmer import SearchWarmer
+
+
+class FakeOpportunityService:
+    SEARCH_PAGES = (1, 11)
+    search_api_keys = ['k1']
+    search_engine_id = 'cx'
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.search_requests = 0
+        self.warmed = []
+
+    def warm_search(self, query, opportunity_type=None, fresh_for=0):
+        # User searches running at the same time also send requests
+        self.search_requests += 10
+        self.warmed.append(query)
+        return self.outcomes.get(query, ('warmed', 2))
+
+
+def test_budget_counts_only_the_warmers_requests():
+    service = FakeOpportunityService({'hackathon': ('claimed', 0), 'internship': ('fresh', 0)})
+    warmer = SearchWarmer(service, general_templates=['hackathon', 'internship', 'fellowship', 'quiz'],
+                          daily_budget=4)
+
+    assert warmer.run_once() == 2
+    assert service.warmed == ['hackathon', 'internship', 'fellowship', 'quiz']
+    assert warmer.requests_today == 4
+    assert warmer.stats()['skipped_claimed'] == 1
+
+
+def test_run_stops_at_budget():
+    service = FakeOpportunityService({})
+    warmer = SearchWarmer(service, general_templates=['hackathon', 'internship', 'fellowship'], daily_budget=4)
+
+    assert warmer.run_once() == 2
+    assert service.warmed == ['hackathon', 'internship']
@@ -0,0 +1,41 @@
+"""
+Tests for SingleFlight call coalescing
+"""
+
+import threading
+import time
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_begin_makes_later_callers_wait_for_finish():
+    flights = SingleFlight()
+    assert flights.begin('robotics') is None
+
+    results = []
+    follower = threading.Thread(target=lambda: results.append(flights.do('robotics', lambda: 'own call')))
+    follower.start()
+    # Only finish once the follower has joined the in-flight call
+    deadline = time.time() + 5
+    while flights.stats()['shared'] < 1 and time.time() < deadline:
+        time.sleep(0.001)
+    assert flights.stats()['shared'] == 1
+    flights.finish('robotics', ['shared result'])
+    follower.join(5)
+
+    assert results == [(['shared result'], True)]
+    assert flights.stats()['in_flight'] == 0
+
+
+def test_finish_with_exception_reaches_followers():
+    flights = SingleFlight()
+    assert flights.begin('robotics') is None
+    future = flights.begin('robotics')
+
+    flights.finish('robotics', exception=RuntimeError('quota'))
+
+    with pytest.raises(RuntimeError):
+        future.result()
+    assert flights.begin('robotics') is None
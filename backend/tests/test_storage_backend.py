@@ -0,0 +1,67 @@
+"""
+Tests for local storage backend query evaluation
+"""
+
+import pytest
+
+from services.storage_backend import create_storage_backend, matches_filter
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    backend = create_storage_backend(request.param, str(tmp_path / 'datastore.sqlite3'))
+    batch = backend.batch()
+    students = backend.collection('students')
+    batch.set(students.document('asha'), {'skills': ['python', 'ml'], 'year': 3, 'team': ['a', 'b']})
+    batch.set(students.document('ben'), {'skills': ['java'], 'year': 2, 'team': ['a']})
+    batch.set(students.document('chen'), {'skills': [], 'year': 3, 'team': []})
+    batch.set(students.document('dev'), {'skills': [1, 2.0], 'year': 1})
+    batch.commit()
+    yield backend
+    backend.close()
+
+
+def _ids(query):
+    return sorted(doc.id for doc in query.stream())
+
+
+def test_array_contains(backend):
+    students = backend.collection('students')
+
+    assert _ids(students.where('skills', 'array_contains', 'python')) == ['asha']
+    assert _ids(students.where('skills', 'array_contains', 2)) == ['dev']
+    assert _ids(students.where('skills', 'array_contains', 'rust')) == []
+
+
+def test_array_contains_any(backend):
+    students = backend.collection('students')
+
+    assert _ids(students.where('skills', 'array_contains_any', ['java', 'ml'])) == ['asha', 'ben']
+
+
+def test_in_and_not_in(backend):
+    students = backend.collection('students')
+
+    assert _ids(students.where('year', 'in', [1, 2])) == ['ben', 'dev']
+    assert _ids(students.where('team', 'in', [['a', 'b'], []])) == ['asha', 'chen']
+    assert _ids(students.where('team', 'not-in', [['a']])) == ['asha', 'chen']
+
+
+def test_arrays_compare_element_by_element(backend):
+    students = backend.collection('students')
+
+    assert _ids(students.where('team', '>', [])) == ['asha', 'ben']
+    assert [doc.id for doc in students.order_by('team').stream()] == ['chen', 'ben', 'asha']
+
+
+def test_matches_filter_array_equality():
+    assert matches_filter('x', {'tags': ['a', 'b']}, 'tags', '==', ['a', 'b'])
+    assert not matches_filter('x', {'tags': ['a', 'b']}, 'tags', '==', ['b', 'a'])
+    assert matches_filter('x', {'tags': ['a']}, 'tags', '<', ['a', 'b'])
+
+
+def test_matches_filter_accepts_both_operator_spellings():
+    for op in ('array_contains', 'array-contains'):
+        assert matches_filter('x', {'tags': ['a', 'b']}, 'tags', op, 'b')
+    for op in ('array_contains_any', 'array-contains-any'):
+        assert matches_filter('x', {'tags': ['a', 'b']}, 'tags', op, ['c', 'a'])